@@ -10,6 +10,17 @@ from benchmark import DATASETS_DIR
 from dataset_reader.ann_compound_reader import AnnCompoundReader
 from dataset_reader.ann_h5_reader import AnnH5Reader
 from dataset_reader.base_reader import BaseReader
+from dataset_reader.binary_cache import (
+    BinaryCacheReader,
+    build_cache,
+    get_cache_path,
+    is_cache_valid,
+)
+from dataset_reader.ground_truth_reader import (
+    GroundTruthReader,
+    ground_truth_path,
+    load_ground_truth,
+)
 from dataset_reader.json_reader import JSONReader
 from dataset_reader.sparse_reader import SparseReader
 
@@ -19,6 +30,10 @@ opener = build_opener()
 opener.addheaders = [("User-agent", "Mozilla/5.0")]
 install_opener(opener)
 
+# Dense datasets are converted into a binary, memory-mappable layout on the
+# first run, so the following runs do not need to parse them again
+USE_DATASET_CACHE = bool(int(os.getenv("USE_DATASET_CACHE", True)))
+
 
 @dataclass
 class DatasetConfig:
@@ -40,6 +55,9 @@ READER_TYPE = {
     "sparse": SparseReader,
 }
 
+# Sparse datasets are already stored in a binary CSR format
+CACHEABLE_TYPES = {"h5", "jsonl", "tar"}
+
 
 class Dataset:
     def __init__(self, config: dict):
@@ -50,6 +68,7 @@ class Dataset:
 
         if target_path.exists():
             print(f"{target_path} already exists")
+            self.build_cache()
             return
 
         if self.config.link:
@@ -71,9 +90,48 @@ class Dataset:
                 shutil.copy2(tmp_path, target_path)
                 os.remove(tmp_path)
 
-    def get_reader(self, normalize: bool) -> BaseReader:
+        self.build_cache()
+
+    def is_cacheable(self) -> bool:
+        return USE_DATASET_CACHE and self.config.type in CACHEABLE_TYPES
+
+    def build_cache(self):
+        if not self.is_cacheable():
+            return
+
+        source_path = DATASETS_DIR / self.config.path
+        cache_path = get_cache_path(source_path)
+        if is_cache_valid(source_path, cache_path):
+            return
+
+        print(f"Converting: {source_path} -> {cache_path}")
         reader_class = READER_TYPE[self.config.type]
-        return reader_class(DATASETS_DIR / self.config.path, normalize=normalize)
+        build_cache(reader_class(source_path, normalize=False), source_path, cache_path)
+
+    def get_reader(self, normalize: bool) -> BaseReader:
+        source_path = DATASETS_DIR / self.config.path
+        reader = None
+        if self.is_cacheable():
+            cache_path = get_cache_path(source_path)
+            if is_cache_valid(source_path, cache_path):
+                reader = BinaryCacheReader(cache_path, normalize=normalize)
+
+        if reader is None:
+            reader_class = READER_TYPE[self.config.type]
+            reader = reader_class(source_path, normalize=normalize)
+
+        # Built by ground_truth.py, replaces the neighbours of the dataset
+        ground_truth = (
+            load_ground_truth(
+                ground_truth_path(source_path, self.config.distance),
+                self.config.distance,
+            )
+            if self.config.distance is not None
+            else None
+        )
+        if ground_truth is not None:
+            reader = GroundTruthReader(reader, *ground_truth)
+        return reader
 
 
 if __name__ == "__main__":
@@ -0,0 +1,244 @@
+import os
+from multiprocessing import get_context
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+import numpy as np
+import tqdm
+
+from benchmark import DATASETS_DIR
+from benchmark.dataset import Dataset
+from dataset_reader.base_reader import BaseReader, Query, RecordBatch, normalize_rows
+from dataset_reader.ground_truth_reader import ground_truth_path, save_ground_truth
+from engine.base_client.distances import Distance
+from engine.base_client.selectivity import (
+    MaskConditionParser,
+    PayloadColumns,
+    condition_fields,
+    read_payload_columns,
+)
+from engine.base_client.shared import SharedMatrix
+
+# Memory for the score matrices of all the workers together, in bytes
+GROUND_TRUTH_MEMORY = int(os.getenv("GROUND_TRUTH_MEMORY", 1024 * 1024 * 1024))
+QUERY_BLOCK_SIZE = 1024
+# Every worker gets several shards of the base set, for a smoother progress
+SHARDS_PER_WORKER = 4
+
+
+def read_base_vectors(reader: BaseReader) -> np.ndarray:
+    matrix = reader.read_vectors_matrix()
+    if matrix is not None:
+        return matrix
+    batches: List[RecordBatch] = list(reader.read_data_batches(65536))
+    if any(batch.vectors is None for batch in batches):
+        raise ValueError("Ground truth can only be computed for dense vectors")
+    return np.concatenate([batch.vectors for batch in batches])
+
+
+def merge_top(
+    ids: np.ndarray, scores: np.ndarray, top: int
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Keep the `top` highest scores of every row, sorted, out of candidates
+    concatenated from several blocks. Ids may be a single row shared by all.
+    """
+    ids = np.broadcast_to(ids, scores.shape)
+    if scores.shape[1] > top:
+        selected = np.argpartition(-scores, top - 1, axis=1)[:, :top]
+        ids = np.take_along_axis(ids, selected, axis=1)
+        scores = np.take_along_axis(scores, selected, axis=1)
+    order = np.argsort(-scores, axis=1, kind="stable")
+    return np.take_along_axis(ids, order, axis=1), np.take_along_axis(
+        scores, order, axis=1
+    )
+
+
+class ExactSearch:
+    """
+    Blocked brute-force k-NN over a shard of the base set. Scores are kept
+    as "higher is better" while searching: similarities for cosine and dot,
+    negated squared distances for l2.
+    """
+
+    # State of the worker processes
+    instance: Optional["ExactSearch"] = None
+
+    def __init__(
+        self,
+        base: SharedMatrix,
+        queries: SharedMatrix,
+        conditions: List[Optional[dict]],
+        distance: Distance,
+        top: int,
+        memory: int,
+    ):
+        self.base = base
+        self.queries = queries
+        self.conditions = conditions
+        self.distance = distance
+        self.top = top
+        self.memory = memory
+
+    @classmethod
+    def init_worker(cls, *args):
+        cls.instance = cls(*args)
+
+    @classmethod
+    def run_shard(cls, shard: Tuple[int, int, PayloadColumns]):
+        return cls.instance.search(*shard)
+
+    def _queries(self) -> np.ndarray:
+        queries = self.queries.array()
+        if self.distance == Distance.COSINE:
+            return normalize_rows(queries)
+        return queries.astype(np.float32, copy=False)
+
+    def search(
+        self, start: int, end: int, columns: PayloadColumns
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        queries = self._queries()
+        query_block = min(len(queries), QUERY_BLOCK_SIZE)
+        # Scores, their negation and the selected positions of a block, about
+        # 16 bytes per query and record
+        base_block = max(self.top, self.memory // (16 * max(query_block, 1)))
+
+        ids = np.full((len(queries), self.top), -1, dtype=np.int64)
+        scores = np.full((len(queries), self.top), -np.inf, dtype=np.float32)
+        for block_start in range(start, end, base_block):
+            block_end = min(block_start + base_block, end)
+            block = self.base.rows(block_start, block_end).resolve()
+            if self.distance == Distance.COSINE:
+                block = normalize_rows(block)
+            block_columns = {
+                name: column[block_start - start : block_end - start]
+                for name, column in columns.items()
+            }
+            for query_start in range(0, len(queries), query_block):
+                rows = slice(query_start, query_start + query_block)
+                block_scores = queries[rows] @ block.T
+                if self.distance == Distance.L2:
+                    # |q - x|^2 = |q|^2 - 2 q.x + |x|^2, where |q|^2 is the
+                    # same for all the candidates of a query
+                    block_scores = 2 * block_scores - (block**2).sum(axis=1)
+                self._filter(block_scores, self.conditions[rows], block_columns)
+                block_ids, block_scores = merge_top(
+                    np.arange(block_start, block_end)[None, :], block_scores, self.top
+                )
+                ids[rows], scores[rows] = merge_top(
+                    np.concatenate([ids[rows], block_ids], axis=1),
+                    np.concatenate([scores[rows], block_scores], axis=1),
+                    self.top,
+                )
+        return ids, scores
+
+    @staticmethod
+    def _filter(
+        scores: np.ndarray,
+        conditions: List[Optional[dict]],
+        columns: PayloadColumns,
+    ):
+        """Exclude the records which do not match the conditions of a query"""
+        if not any(conditions):
+            return
+        # Masks of the repeated conditions are cached by the parser
+        parser = MaskConditionParser(columns, scores.shape[1])
+        for i, condition in enumerate(conditions):
+            if condition:
+                scores[i, ~parser.parse(condition)] = -np.inf
+
+    def finalize(
+        self, ids: np.ndarray, scores: np.ndarray
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Ids padded with -1 where fewer records match the conditions, and the
+        scores in the units of the datasets: similarity, or the l2 distance
+        """
+        scores = scores.astype(np.float32)
+        missing = np.isneginf(scores)
+        if self.distance == Distance.L2:
+            norms = (self._queries() ** 2).sum(axis=1, keepdims=True)
+            scores = np.sqrt(np.maximum(norms - scores, 0.0))
+        scores[missing] = np.nan
+        return np.where(missing, -1, ids).astype(np.int32), scores
+
+
+def compute_ground_truth(
+    reader: BaseReader, distance: Distance, top: int, parallel: int = 1
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Exact top-k neighbours of the queries of the dataset, and their scores.
+    The base set is split into shards searched by `parallel` processes, their
+    partial results are merged as they come.
+    """
+    queries: List[Query] = list(reader.read_queries())
+    if any(query.vector is None for query in queries):
+        raise ValueError("Ground truth can only be computed for dense vectors")
+    conditions = [query.meta_conditions for query in queries]
+    fields = sorted(
+        set(field for condition in conditions for field in condition_fields(condition))
+    )
+
+    base = SharedMatrix.share(read_base_vectors(reader))
+    query_vectors = SharedMatrix.share(np.stack([query.vector for query in queries]))
+    columns = read_payload_columns(reader, fields) if fields else {}
+
+    num_records = base.shape[0]
+    num_shards = max(1, min(parallel * SHARDS_PER_WORKER, num_records))
+    bounds = np.linspace(0, num_records, num_shards + 1).astype(int)
+    shards = [
+        (
+            start,
+            end,
+            {name: column[start:end] for name, column in columns.items()},
+        )
+        for start, end in zip(bounds[:-1], bounds[1:])
+    ]
+    args = (
+        base,
+        query_vectors,
+        conditions,
+        distance,
+        top,
+        GROUND_TRUTH_MEMORY // max(parallel, 1),
+    )
+
+    ids = np.full((len(queries), top), -1, dtype=np.int64)
+    scores = np.full((len(queries), top), -np.inf, dtype=np.float32)
+    try:
+        if parallel > 1:
+            with get_context().Pool(
+                processes=parallel, initializer=ExactSearch.init_worker, initargs=args
+            ) as pool:
+                results = pool.imap_unordered(ExactSearch.run_shard, shards)
+                for shard_ids, shard_scores in tqdm.tqdm(results, total=len(shards)):
+                    ids, scores = merge_top(
+                        np.concatenate([ids, shard_ids], axis=1),
+                        np.concatenate([scores, shard_scores], axis=1),
+                        top,
+                    )
+        else:
+            ExactSearch.init_worker(*args)
+            for shard in tqdm.tqdm(shards):
+                shard_ids, shard_scores = ExactSearch.run_shard(shard)
+                ids, scores = merge_top(
+                    np.concatenate([ids, shard_ids], axis=1),
+                    np.concatenate([scores, shard_scores], axis=1),
+                    top,
+                )
+        return ExactSearch(*args).finalize(ids, scores)
+    finally:
+        ExactSearch.instance = None
+        base.release()
+        query_vectors.release()
+
+
+def build_ground_truth(dataset: Dataset, top: int, parallel: int = 1) -> Path:
+    """Compute the ground truth of the dataset and store it next to it"""
+    distance = Distance.from_name(dataset.config.distance)
+    ids, scores = compute_ground_truth(
+        dataset.get_reader(normalize=False), distance, top, parallel
+    )
+    path = ground_truth_path(DATASETS_DIR / dataset.config.path, distance.value)
+    save_ground_truth(path, ids, scores, distance.value)
+    return path
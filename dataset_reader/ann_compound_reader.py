@@ -1,9 +1,15 @@
+import itertools
 import json
-from typing import Iterator, List
+from typing import Iterator, Optional
 
 import numpy as np
 
-from dataset_reader.base_reader import Query
+from dataset_reader.base_reader import (
+    Query,
+    RecordBatch,
+    normalize_rows,
+    payloads_to_columns,
+)
 from dataset_reader.json_reader import JSONReader
 
 
@@ -17,22 +23,50 @@ class AnnCompoundReader(JSONReader):
     VECTORS_FILE = "vectors.npy"
     QUERIES_FILE = "tests.jsonl"
 
-    def read_vectors(self) -> Iterator[List[float]]:
-        vectors = np.load(self.path / self.VECTORS_FILE)
+    def read_vectors(self) -> Iterator[np.ndarray]:
+        vectors = np.load(self.path / self.VECTORS_FILE, mmap_mode="r")
         for vector in vectors:
+            vector = vector.astype(np.float32, copy=False)
             if self.normalize:
                 vector = vector / np.linalg.norm(vector)
-            yield vector.tolist()
+            yield vector
+
+    def read_vectors_matrix(self) -> Optional[np.ndarray]:
+        if self.normalize:
+            return None
+        return np.load(self.path / self.VECTORS_FILE, mmap_mode="r")
+
+    def read_data_batches(
+        self, batch_size: int, offset: int = 0
+    ) -> Iterator[RecordBatch]:
+        vectors = np.load(self.path / self.VECTORS_FILE, mmap_mode="r")
+        payloads = self.read_payloads()
+        # Payloads are stored as lines of JSON, so they have to be skipped
+        next(itertools.islice(payloads, offset, offset), None)
+        for start in range(offset, len(vectors), batch_size):
+            end = min(start + batch_size, len(vectors))
+            block = vectors[start:end]
+            block = (
+                normalize_rows(block)
+                if self.normalize
+                else np.array(block, dtype=np.float32)
+            )
+            yield RecordBatch(
+                ids=np.arange(start, end),
+                vectors=block,
+                sparse_vectors=None,
+                metadata=payloads_to_columns(itertools.islice(payloads, end - start)),
+            )
 
     def read_queries(self) -> Iterator[Query]:
         with open(self.path / self.QUERIES_FILE) as payloads_fp:
             for idx, row in enumerate(payloads_fp):
                 row_json = json.loads(row)
-                vector = np.array(row_json["query"])
+                vector = np.array(row_json["query"], dtype=np.float32)
                 if self.normalize:
                     vector /= np.linalg.norm(vector)
                 yield Query(
-                    vector=vector.tolist(),
+                    vector=vector,
                     sparse_vector=None,
                     meta_conditions=row_json["conditions"],
                     expected_result=row_json["closest_ids"],
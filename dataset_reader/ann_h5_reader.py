@@ -1,27 +1,128 @@
-from typing import Iterator
+import os
+from collections import deque
+from multiprocessing import get_context
+from typing import Dict, Iterator, Optional, Tuple
 
 import h5py
 import numpy as np
 
 from benchmark import DATASETS_DIR
-from dataset_reader.base_reader import BaseReader, Query, Record
+from dataset_reader.base_reader import (
+    BaseReader,
+    Query,
+    Record,
+    RecordBatch,
+    normalize_rows,
+)
+
+# Rows are read in blocks of about this size, rounded to whole chunks
+READ_BLOCK_BYTES = 64 * 1024 * 1024
+# Processes reading and decompressing the blocks of chunked datasets
+H5_READ_WORKERS = int(os.getenv("H5_READ_WORKERS", 1))
+
+
+def mmap_h5_dataset(path, dataset: h5py.Dataset) -> Optional[np.memmap]:
+    """
+    Memory-map a contiguous, uncompressed HDF5 dataset, so its rows can be
+    read as zero-copy views. Returns None if the dataset layout does not allow
+    it, e.g. it is chunked or compressed.
+    """
+    if dataset.chunks is not None or dataset.compression is not None:
+        return None
+    offset = dataset.id.get_offset()
+    if offset is None:
+        return None
+    return np.memmap(
+        path, dtype=dataset.dtype, mode="r", offset=offset, shape=dataset.shape
+    )
+
+
+def iter_block_ranges(
+    dataset: h5py.Dataset, start: int, end: int
+) -> Iterator[Tuple[int, int]]:
+    """
+    Split the rows into blocks of about READ_BLOCK_BYTES, aligned to the
+    chunks of the dataset, so every chunk is read and decompressed once
+    """
+    row_bytes = max(dataset.dtype.itemsize * int(np.prod(dataset.shape[1:])), 1)
+    rows = max(READ_BLOCK_BYTES // row_bytes, 1)
+    if dataset.chunks is not None:
+        chunk_rows = dataset.chunks[0]
+        rows = max(rows // chunk_rows, 1) * chunk_rows
+    while start < end:
+        # The first block ends at a block boundary, if the start is not at one
+        block_end = min((start // rows + 1) * rows, end)
+        yield start, block_end
+        start = block_end
+
+
+# Files opened by the reader processes
+_open_files: Dict[str, h5py.File] = {}
+
+
+def read_block(path, name: str, start: int, end: int) -> np.ndarray:
+    path = str(path)
+    if path not in _open_files:
+        _open_files[path] = h5py.File(path, "r")
+    return _open_files[path][name][start:end]
 
 
 class AnnH5Reader(BaseReader):
-    def __init__(self, path, normalize=False):
+    def __init__(self, path, normalize=False, read_workers: int = H5_READ_WORKERS):
         self.path = path
         self.normalize = normalize
+        self.read_workers = read_workers
+
+    def _prepare_block(self, block: np.ndarray) -> np.ndarray:
+        if self.normalize:
+            return normalize_rows(block)
+        # Blocks of memory-mapped float32 datasets stay zero-copy views
+        return block.astype(np.float32, copy=False)
+
+    def _iter_blocks(
+        self, name: str, offset: int = 0
+    ) -> Iterator[Tuple[int, np.ndarray]]:
+        """
+        Read the dataset in large blocks of float32 vectors, normalized if
+        needed. Contiguous datasets are memory-mapped, chunked ones are read
+        chunk by chunk, by `read_workers` processes if there are more.
+        """
+        with h5py.File(self.path, "r") as data:
+            dataset = data[name]
+            vectors = mmap_h5_dataset(self.path, dataset)
+            ranges = list(iter_block_ranges(dataset, offset, len(dataset)))
+            if vectors is not None or self.read_workers <= 1 or len(ranges) <= 1:
+                vectors = vectors if vectors is not None else dataset
+                for start, end in ranges:
+                    yield start, self._prepare_block(vectors[start:end])
+                return
+
+        # HDF5 is not fork-safe, the processes open the file on their own
+        with get_context("spawn").Pool(self.read_workers) as pool:
+            pending = deque()
+            for start, end in ranges:
+                pending.append(
+                    (start, pool.apply_async(read_block, (self.path, name, start, end)))
+                )
+                # Keep the workers busy, but do not read too far ahead
+                if len(pending) >= 2 * self.read_workers:
+                    start, block = pending.popleft()
+                    yield start, self._prepare_block(block.get())
+            while pending:
+                start, block = pending.popleft()
+                yield start, self._prepare_block(block.get())
 
     def read_queries(self) -> Iterator[Query]:
-        data = h5py.File(self.path)
+        with h5py.File(self.path, "r") as data:
+            neighbors = data["neighbors"][:]
+            distances = data["distances"][:]
 
+        vectors = (vector for _, block in self._iter_blocks("test") for vector in block)
         for vector, expected_result, expected_scores in zip(
-            data["test"], data["neighbors"], data["distances"]
+            vectors, neighbors, distances
         ):
-            if self.normalize:
-                vector /= np.linalg.norm(vector)
             yield Query(
-                vector=vector.tolist(),
+                vector=vector,
                 sparse_vector=None,
                 meta_conditions=None,
                 expected_result=expected_result.tolist(),
@@ -29,19 +130,53 @@ class AnnH5Reader(BaseReader):
             )
 
     def read_data(self) -> Iterator[Record]:
-        data = h5py.File(self.path)
+        for start, block in self._iter_blocks("train"):
+            for idx, vector in enumerate(block, start):
+                yield Record(id=idx, vector=vector, sparse_vector=None, metadata=None)
 
-        for idx, vector in enumerate(data["train"]):
-            if self.normalize:
-                vector /= np.linalg.norm(vector)
-            yield Record(
-                id=idx, vector=vector.tolist(), sparse_vector=None, metadata=None
-            )
+    def read_vectors_matrix(self) -> Optional[np.ndarray]:
+        if self.normalize:
+            return None
+        with h5py.File(self.path, "r") as data:
+            return mmap_h5_dataset(self.path, data["train"])
 
+    def read_data_batches(
+        self, batch_size: int, offset: int = 0
+    ) -> Iterator[RecordBatch]:
+        # Batches are slices of the blocks, only the ones crossing the border
+        # of two blocks are copied
+        carry, carry_start = None, offset
+        for start, block in self._iter_blocks("train", offset):
+            if carry is not None:
+                missing = batch_size - len(carry)
+                carry = np.concatenate([carry, block[:missing]])
+                start, block = start + len(block[:missing]), block[missing:]
+                if len(carry) < batch_size:
+                    continue
+                yield self._batch(carry_start, carry)
+                carry = None
 
-if __name__ == "__main__":
-    import os
+            full = len(block) - len(block) % batch_size
+            for batch_start in range(0, full, batch_size):
+                yield self._batch(
+                    start + batch_start, block[batch_start : batch_start + batch_size]
+                )
+            if full < len(block):
+                carry, carry_start = block[full:], start + full
+        if carry is not None:
+            yield self._batch(carry_start, carry)
+
+    @staticmethod
+    def _batch(start: int, vectors: np.ndarray) -> RecordBatch:
+        return RecordBatch(
+            ids=np.arange(start, start + len(vectors)),
+            vectors=vectors,
+            sparse_vectors=None,
+            metadata=None,
+        )
 
+
+if __name__ == "__main__":
     # h5py file 4 keys:
     # `train` - float vectors (num vectors 1183514)
     # `test` - float vectors (num vectors 10000)
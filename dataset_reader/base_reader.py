@@ -1,34 +1,220 @@
+import itertools
 from dataclasses import dataclass
-from typing import Iterator, List, Optional
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence
+
+import numpy as np
 
 
 @dataclass
 class SparseVector:
-    indices: List[int]
-    values: List[float]
+    # int32 and float32 arrays, usually views of a memory-mapped CSR matrix
+    indices: np.ndarray
+    values: np.ndarray
 
 
 @dataclass
 class Record:
     id: int
-    vector: Optional[List[float]]
+    # float32 array, possibly a view of a memory-mapped matrix. Engines
+    # should convert it to a list only if their wire protocol requires it
+    vector: Optional[np.ndarray]
     sparse_vector: Optional[SparseVector]
     metadata: Optional[dict]
 
 
 @dataclass
 class Query:
-    vector: Optional[List[float]]
+    vector: Optional[np.ndarray]
     sparse_vector: Optional[SparseVector]
     meta_conditions: Optional[dict]
+    # Possibly a row of an int32 ground truth matrix
     expected_result: Optional[List[int]]
     expected_scores: Optional[List[float]] = None
 
 
+def normalize_rows(vectors: np.ndarray) -> np.ndarray:
+    """
+    Float32 copy of the vectors scaled to unit length, with a single
+    vectorized operation. Zero vectors are kept as they are.
+    """
+    vectors = np.array(vectors, dtype=np.float32)
+    norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    np.divide(vectors, norms, out=vectors, where=norms > 0)
+    return vectors
+
+
+def payloads_to_columns(
+    payloads: Iterable[Optional[dict]],
+) -> Optional[Dict[str, list]]:
+    """
+    Convert a list of per-record payloads into payload columns. Missing values
+    are represented as None. Returns None if none of the records has a payload.
+    """
+    payloads = [payload or {} for payload in payloads]
+    keys = {}
+    for payload in payloads:
+        keys.update(dict.fromkeys(payload))
+    if len(keys) == 0:
+        return None
+    return {key: [payload.get(key) for payload in payloads] for key in keys}
+
+
+@dataclass
+class RecordBatch:
+    """
+    Columnar representation of consecutive records, so uploaders which can
+    send whole columns do not need to iterate over Record objects.
+    """
+
+    ids: np.ndarray
+    # Contiguous float32 matrix of shape (len(ids), dim)
+    vectors: Optional[np.ndarray]
+    # List of the vectors, or a reference to rows of the dataset file
+    # resolved by the upload worker, see `read_data_shards`
+    sparse_vectors: Optional[Sequence[SparseVector]]
+    # Payload columns, None marks a missing value
+    metadata: Optional[Dict[str, List[Any]]]
+
+    def __len__(self):
+        return len(self.ids)
+
+    def payloads(self) -> List[dict]:
+        if not self.metadata:
+            return [{} for _ in range(len(self))]
+        return [
+            {
+                key: column[i]
+                for key, column in self.metadata.items()
+                if column[i] is not None
+            }
+            for i in range(len(self))
+        ]
+
+    def records(self) -> Iterator[Record]:
+        payloads = self.payloads() if self.metadata else itertools.repeat(None)
+        for i, payload in zip(range(len(self)), payloads):
+            yield Record(
+                id=int(self.ids[i]),
+                vector=self.vectors[i] if self.vectors is not None else None,
+                sparse_vector=(
+                    self.sparse_vectors[i] if self.sparse_vectors is not None else None
+                ),
+                metadata=payload,
+            )
+
+    @classmethod
+    def from_records(cls, records: List[Record]) -> "RecordBatch":
+        has_dense = len(records) > 0 and records[0].vector is not None
+        has_sparse = len(records) > 0 and records[0].sparse_vector is not None
+        return cls(
+            ids=np.array([record.id for record in records], dtype=np.int64),
+            vectors=(
+                np.stack([record.vector for record in records]).astype(
+                    np.float32, copy=False
+                )
+                if has_dense
+                else None
+            ),
+            sparse_vectors=(
+                [record.sparse_vector for record in records] if has_sparse else None
+            ),
+            metadata=payloads_to_columns(record.metadata for record in records),
+        )
+
+    def slice(self, start: int, end: int) -> "RecordBatch":
+        return RecordBatch(
+            ids=self.ids[start:end],
+            vectors=self.vectors[start:end] if self.vectors is not None else None,
+            sparse_vectors=(
+                self.sparse_vectors[start:end]
+                if self.sparse_vectors is not None
+                else None
+            ),
+            metadata=(
+                {key: column[start:end] for key, column in self.metadata.items()}
+                if self.metadata
+                else None
+            ),
+        )
+
+    @classmethod
+    def concat(cls, batches: List["RecordBatch"]) -> "RecordBatch":
+        keys = {}
+        for batch in batches:
+            keys.update(dict.fromkeys(batch.metadata or {}))
+        sparse_vectors = batches[0].sparse_vectors
+        if isinstance(sparse_vectors, list):
+            sparse_vectors = [
+                vector for batch in batches for vector in batch.sparse_vectors
+            ]
+        elif sparse_vectors is not None:
+            # References to rows of the dataset file join by themselves
+            sparse_vectors = type(sparse_vectors).concat(
+                [batch.sparse_vectors for batch in batches]
+            )
+        return cls(
+            ids=np.concatenate([batch.ids for batch in batches]),
+            vectors=(
+                np.concatenate([batch.vectors for batch in batches])
+                if batches[0].vectors is not None
+                else None
+            ),
+            sparse_vectors=sparse_vectors,
+            metadata=(
+                {
+                    key: [
+                        value
+                        for batch in batches
+                        for value in (
+                            (batch.metadata or {}).get(key) or [None] * len(batch)
+                        )
+                    ]
+                    for key in keys
+                }
+                if keys
+                else None
+            ),
+        )
+
+
 class BaseReader:
     def read_data(self) -> Iterator[Record]:
         raise NotImplementedError()
 
+    def read_data_batches(
+        self, batch_size: int, offset: int = 0
+    ) -> Iterator[RecordBatch]:
+        """
+        Read the data as columnar batches, starting from the record at
+        `offset`. Readers should override it if the underlying format allows
+        reading whole blocks of records at once, or seeking to the offset.
+        """
+        records = itertools.islice(self.read_data(), offset, None)
+        while True:
+            batch = list(itertools.islice(records, batch_size))
+            if len(batch) == 0:
+                break
+            yield RecordBatch.from_records(batch)
+
+    def read_vectors_matrix(self) -> Optional[np.ndarray]:
+        """
+        Dense vectors of all the records as a single, preferably memory-mapped,
+        matrix in the order of `read_data`, normalized if the reader normalizes
+        them. Returns None if the format does not store them this way.
+        """
+        return None
+
+    def read_data_shards(
+        self, batch_size: int, offset: int = 0
+    ) -> Optional[Iterator[RecordBatch]]:
+        """
+        Batches like `read_data_batches`, but with references to row ranges of
+        the dataset file instead of the vectors, which the upload workers read
+        by themselves. Returns None if the format does not allow random access
+        to the rows.
+        """
+        return None
+
     def read_queries(self) -> Iterator[Query]:
         raise NotImplementedError()
 
@@ -0,0 +1,290 @@
+import hashlib
+import json
+import os
+import pickle
+import shutil
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional
+
+import numpy as np
+
+from dataset_reader.base_reader import (
+    BaseReader,
+    Query,
+    Record,
+    RecordBatch,
+    normalize_rows,
+)
+from dataset_reader.ground_truth_reader import GROUND_TRUTH_PATTERN
+
+# Bump it whenever the layout of the cache changes
+CACHE_VERSION = 1
+
+MANIFEST_FILE = "manifest.json"
+VECTORS_FILE = "vectors.f32"
+QUERIES_FILE = "queries.f32"
+NEIGHBOURS_FILE = "neighbours.i32"
+SCORES_FILE = "scores.f32"
+PAYLOADS_FILE = "payloads.pkl"
+CONDITIONS_FILE = "conditions.pkl"
+
+CONVERSION_BATCH_SIZE = 65536
+CHECKSUM_BLOCK_SIZE = 16 * 1024 * 1024
+
+
+def normalized_file(file_name: str) -> str:
+    """Name of the file with the normalized copy of the vectors"""
+    name, extension = os.path.splitext(file_name)
+    return f"{name}.normalized{extension}"
+
+
+def write_normalized(vectors: np.ndarray, path: Path):
+    """
+    Store the normalized copy of the vectors, computed block by block, so the
+    readers can serve them without normalizing on every run
+    """
+    tmp_path = path.parent / f"{path.name}.{os.getpid()}.tmp"
+    with open(tmp_path, "wb") as fp:
+        for start in range(0, len(vectors), CONVERSION_BATCH_SIZE):
+            normalize_rows(vectors[start : start + CONVERSION_BATCH_SIZE]).tofile(fp)
+    os.replace(tmp_path, path)
+
+
+def get_cache_path(source_path: Path) -> Path:
+    """The cache is stored next to the dataset file or directory"""
+    return source_path.parent / f"{source_path.name}.cache"
+
+
+def list_source_files(source_path: Path) -> List[Path]:
+    if source_path.is_file():
+        return [source_path]
+    # The ground truth is derived from the dataset, it does not change it
+    return sorted(
+        path
+        for path in source_path.rglob("*")
+        if path.is_file() and not path.match(GROUND_TRUTH_PATTERN)
+    )
+
+
+def file_checksum(path: Path) -> str:
+    sha256 = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(CHECKSUM_BLOCK_SIZE), b""):
+            sha256.update(block)
+    return sha256.hexdigest()
+
+
+def describe_sources(source_path: Path, checksums: Dict[str, dict]) -> Dict[str, dict]:
+    """
+    Describe the source files with their size, mtime and checksum. Checksums
+    are reused from the previous description if size and mtime did not
+    change, so validating the cache does not require reading the dataset.
+    """
+    sources = {}
+    for path in list_source_files(source_path):
+        name = str(path.relative_to(source_path.parent))
+        stat = path.stat()
+        previous = checksums.get(name)
+        if (
+            previous is not None
+            and previous["size"] == stat.st_size
+            and previous["mtime"] == stat.st_mtime
+        ):
+            checksum = previous["sha256"]
+        else:
+            checksum = file_checksum(path)
+        sources[name] = {
+            "size": stat.st_size,
+            "mtime": stat.st_mtime,
+            "sha256": checksum,
+        }
+    return sources
+
+
+def read_manifest(cache_path: Path) -> Optional[dict]:
+    manifest_path = cache_path / MANIFEST_FILE
+    if not manifest_path.exists():
+        return None
+    with open(manifest_path, "r") as f:
+        return json.load(f)
+
+
+def is_cache_valid(source_path: Path, cache_path: Path) -> bool:
+    manifest = read_manifest(cache_path)
+    if manifest is None or manifest.get("version") != CACHE_VERSION:
+        return False
+
+    sources = describe_sources(source_path, manifest["sources"])
+    if any(
+        sources.get(name, {}).get("sha256") != source["sha256"]
+        for name, source in manifest["sources"].items()
+    ) or set(sources) != set(manifest["sources"]):
+        return False
+
+    if sources != manifest["sources"]:
+        # Files were touched, but the content is the same
+        manifest["sources"] = sources
+        with open(cache_path / MANIFEST_FILE, "w") as f:
+            json.dump(manifest, f, indent=2)
+    return True
+
+
+def build_cache(reader: BaseReader, source_path: Path, cache_path: Path):
+    """
+    Convert the dataset into the canonical binary layout, so it can be
+    memory-mapped on the following runs instead of being parsed again.
+    The reader has to be created with normalization disabled.
+    """
+    tmp_path = cache_path.parent / f"{cache_path.name}.tmp"
+    shutil.rmtree(tmp_path, ignore_errors=True)
+    tmp_path.mkdir(parents=True)
+
+    manifest = {"version": CACHE_VERSION}
+
+    num_vectors, dim = 0, None
+    payload_columns = {}
+    with open(tmp_path / VECTORS_FILE, "wb") as vectors_fp:
+        for batch in reader.read_data_batches(CONVERSION_BATCH_SIZE):
+            vectors = np.ascontiguousarray(batch.vectors, dtype=np.float32)
+            dim = vectors.shape[1]
+            vectors.tofile(vectors_fp)
+
+            batch_columns = batch.metadata or {}
+            for key in batch_columns:
+                payload_columns.setdefault(key, [None] * num_vectors)
+            for key, column in payload_columns.items():
+                column.extend(batch_columns.get(key, [None] * len(batch)))
+            num_vectors += len(batch)
+    manifest["vectors"] = [num_vectors, dim]
+
+    if payload_columns:
+        with open(tmp_path / PAYLOADS_FILE, "wb") as f:
+            pickle.dump(payload_columns, f, protocol=pickle.HIGHEST_PROTOCOL)
+
+    queries = list(reader.read_queries())
+    query_vectors = np.stack([query.vector for query in queries]).astype(np.float32)
+    query_vectors.tofile(tmp_path / QUERIES_FILE)
+    manifest["queries"] = list(query_vectors.shape)
+
+    if all(query.expected_result is not None for query in queries):
+        # Ground truth may have a different length per query, so it is padded
+        # with -1 ids and NaN scores
+        top = max(len(query.expected_result) for query in queries)
+        neighbours = np.full((len(queries), top), -1, dtype=np.int32)
+        scores = np.full((len(queries), top), np.nan, dtype=np.float32)
+        for i, query in enumerate(queries):
+            neighbours[i, : len(query.expected_result)] = query.expected_result
+            if query.expected_scores is not None:
+                scores[i, : len(query.expected_scores)] = query.expected_scores
+        neighbours.tofile(tmp_path / NEIGHBOURS_FILE)
+        scores.tofile(tmp_path / SCORES_FILE)
+        manifest["neighbours"] = [len(queries), top]
+
+    if any(query.meta_conditions is not None for query in queries):
+        with open(tmp_path / CONDITIONS_FILE, "wb") as f:
+            pickle.dump(
+                [query.meta_conditions for query in queries],
+                f,
+                protocol=pickle.HIGHEST_PROTOCOL,
+            )
+
+    manifest["sources"] = describe_sources(source_path, {})
+    with open(tmp_path / MANIFEST_FILE, "w") as f:
+        json.dump(manifest, f, indent=2)
+
+    shutil.rmtree(cache_path, ignore_errors=True)
+    os.rename(tmp_path, cache_path)
+
+
+class BinaryCacheReader(BaseReader):
+    """
+    Reads datasets converted with `build_cache`: vectors and queries are
+    memory-mapped float32 matrices, ground truth is an int32 matrix and
+    payloads are stored as columns.
+    """
+
+    def __init__(self, path: Path, normalize=False):
+        self.path = path
+        self.normalize = normalize
+        self.manifest = read_manifest(path)
+
+    def _mmap(self, file_name: str, dtype, shape) -> np.memmap:
+        return np.memmap(
+            self.path / file_name, dtype=dtype, mode="r", shape=tuple(shape)
+        )
+
+    def _vectors(self, file_name: str, shape) -> np.memmap:
+        """
+        Memory-map the vectors, or their normalized copy if the reader
+        normalizes them. The copy is created on the first use.
+        """
+        if not self.normalize:
+            return self._mmap(file_name, np.float32, shape)
+        if not (self.path / normalized_file(file_name)).exists():
+            write_normalized(
+                self._mmap(file_name, np.float32, shape),
+                self.path / normalized_file(file_name),
+            )
+        return self._mmap(normalized_file(file_name), np.float32, shape)
+
+    def _read_payload_columns(self) -> Optional[Dict[str, list]]:
+        if not (self.path / PAYLOADS_FILE).exists():
+            return None
+        with open(self.path / PAYLOADS_FILE, "rb") as f:
+            return pickle.load(f)
+
+    def read_data_batches(
+        self, batch_size: int, offset: int = 0
+    ) -> Iterator[RecordBatch]:
+        vectors = self._vectors(VECTORS_FILE, self.manifest["vectors"])
+        payload_columns = self._read_payload_columns()
+        for start in range(offset, len(vectors), batch_size):
+            end = min(start + batch_size, len(vectors))
+            yield RecordBatch(
+                ids=np.arange(start, end),
+                vectors=vectors[start:end],
+                sparse_vectors=None,
+                metadata=(
+                    {key: column[start:end] for key, column in payload_columns.items()}
+                    if payload_columns
+                    else None
+                ),
+            )
+
+    def read_vectors_matrix(self) -> np.memmap:
+        return self._vectors(VECTORS_FILE, self.manifest["vectors"])
+
+    def read_data(self) -> Iterator[Record]:
+        for batch in self.read_data_batches(CONVERSION_BATCH_SIZE):
+            yield from batch.records()
+
+    def read_queries(self) -> Iterator[Query]:
+        vectors = self._vectors(QUERIES_FILE, self.manifest["queries"])
+
+        neighbours, scores = None, None
+        if "neighbours" in self.manifest:
+            neighbours = self._mmap(
+                NEIGHBOURS_FILE, np.int32, self.manifest["neighbours"]
+            )
+            scores = self._mmap(SCORES_FILE, np.float32, self.manifest["neighbours"])
+
+        conditions = None
+        if (self.path / CONDITIONS_FILE).exists():
+            with open(self.path / CONDITIONS_FILE, "rb") as f:
+                conditions = pickle.load(f)
+
+        for i, vector in enumerate(vectors):
+            expected_result, expected_scores = None, None
+            if neighbours is not None:
+                size = int(np.count_nonzero(neighbours[i] >= 0))
+                expected_result = neighbours[i, :size].tolist()
+                if not np.isnan(scores[i, :size]).all():
+                    expected_scores = scores[i, :size].tolist()
+
+            yield Query(
+                vector=vector,
+                sparse_vector=None,
+                meta_conditions=conditions[i] if conditions is not None else None,
+                expected_result=expected_result,
+                expected_scores=expected_scores,
+            )
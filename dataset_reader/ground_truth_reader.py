@@ -0,0 +1,74 @@
+import os
+from pathlib import Path
+from typing import Iterator, Optional, Tuple
+
+import numpy as np
+
+from dataset_reader.base_reader import BaseReader, Query, RecordBatch
+
+# Exact neighbours computed by `ground_truth.py`, stored with the dataset. The
+# distance is a part of the name, as datasets may share their files.
+GROUND_TRUTH_PATTERN = "ground_truth-*.npz"
+
+
+def ground_truth_path(source_path: Path, distance: str) -> Path:
+    """Ground truth is stored in the directory of the dataset"""
+    directory = source_path if source_path.is_dir() else source_path.parent
+    return directory / GROUND_TRUTH_PATTERN.replace("*", distance.lower())
+
+
+def save_ground_truth(path: Path, ids: np.ndarray, scores: np.ndarray, distance: str):
+    tmp_path = path.parent / f"{path.name}.{os.getpid()}.tmp.npz"
+    np.savez(tmp_path, ids=ids, scores=scores, distance=distance)
+    os.replace(tmp_path, path)
+
+
+def load_ground_truth(
+    path: Path, distance: str
+) -> Optional[Tuple[np.ndarray, np.ndarray]]:
+    """Ground truth built for the distance, or None if there is none"""
+    if not path.exists():
+        return None
+    with np.load(path) as data:
+        if str(data["distance"]) != distance.lower():
+            print(f"Ignoring {path}, built for {data['distance']} distance")
+            return None
+        return data["ids"], data["scores"]
+
+
+class GroundTruthReader(BaseReader):
+    """
+    Reader of a dataset whose queries get the expected results of the built
+    ground truth. Ids are padded with -1 where fewer records match the
+    conditions of the query.
+    """
+
+    def __init__(self, reader: BaseReader, ids: np.ndarray, scores: np.ndarray):
+        self.reader = reader
+        self.ids = ids
+        self.scores = scores
+
+    def read_data(self):
+        return self.reader.read_data()
+
+    def read_data_batches(
+        self, batch_size: int, offset: int = 0
+    ) -> Iterator[RecordBatch]:
+        return self.reader.read_data_batches(batch_size, offset)
+
+    def read_data_shards(
+        self, batch_size: int, offset: int = 0
+    ) -> Optional[Iterator[RecordBatch]]:
+        return self.reader.read_data_shards(batch_size, offset)
+
+    def read_vectors_matrix(self) -> Optional[np.ndarray]:
+        return self.reader.read_vectors_matrix()
+
+    def read_queries(self) -> Iterator[Query]:
+        for query, ids, scores in zip(
+            self.reader.read_queries(), self.ids, self.scores
+        ):
+            found = ids >= 0
+            query.expected_result = ids[found].tolist()
+            query.expected_scores = scores[found].tolist()
+            yield query
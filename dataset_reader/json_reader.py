@@ -26,12 +26,12 @@ class JSONReader(BaseReader):
                 line = json.loads(json_line)
                 yield line
 
-    def read_vectors(self) -> Iterator[List[float]]:
+    def read_vectors(self) -> Iterator[np.ndarray]:
         with open(self.path / self.VECTORS_FILE, "r") as json_fp:
             for json_line in json_fp:
-                vector = json.loads(json_line)
+                vector = np.array(json.loads(json_line), dtype=np.float32)
                 if self.normalize:
-                    vector = vector / np.linalg.norm(vector)
+                    vector /= np.linalg.norm(vector)
                 yield vector
 
     def read_neighbours(self) -> Iterator[Optional[List[int]]]:
@@ -44,10 +44,10 @@ class JSONReader(BaseReader):
                 line = json.loads(json_line)
                 yield line
 
-    def read_query_vectors(self) -> Iterator[List[float]]:
+    def read_query_vectors(self) -> Iterator[np.ndarray]:
         with open(self.path / self.QUERIES_FILE, "r") as json_fp:
             for json_line in json_fp:
-                vector = json.loads(json_line)
+                vector = np.array(json.loads(json_line), dtype=np.float32)
                 if self.normalize:
                     vector /= np.linalg.norm(vector)
                 yield vector
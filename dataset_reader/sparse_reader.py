@@ -1,10 +1,16 @@
 import os
 from pathlib import Path
-from typing import Iterator, List, Tuple, Union
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple, Union
 
 import numpy as np
 
-from dataset_reader.base_reader import BaseReader, Query, Record, SparseVector
+from dataset_reader.base_reader import (
+    BaseReader,
+    Query,
+    Record,
+    RecordBatch,
+    SparseVector,
+)
 
 
 def read_sparse_matrix_fields(
@@ -42,19 +48,25 @@ def mmap_sparse_matrix_fields(fname):
 
 
 def csr_to_sparse_vectors(
-    values: List[float], columns: List[int], index_pointer: List[int]
+    values: np.ndarray,
+    columns: np.ndarray,
+    index_pointer: np.ndarray,
+    start: int = 0,
+    end: Optional[int] = None,
 ) -> Iterator[SparseVector]:
-    """Convert a CSR matrix to a list of SparseVectors"""
+    """
+    Convert the rows of a CSR matrix to SparseVectors, whose indices and
+    values are slices of the fields, so views of the memmaps if mapped
+    """
     num_rows = len(index_pointer) - 1
+    end = num_rows if end is None else min(end, num_rows)
+    # Row boundaries are read at once rather than element by element
+    bounds = np.asarray(index_pointer[start : end + 1]).tolist()
 
-    for i in range(num_rows):
-        start = index_pointer[i]
-        end = index_pointer[i + 1]
-        row_values, row_indices = [], []
-        for j in range(start, end):
-            row_values.append(values[j])
-            row_indices.append(columns[j])
-        yield SparseVector(indices=row_indices, values=row_values)
+    for row_start, row_end in zip(bounds[:-1], bounds[1:]):
+        yield SparseVector(
+            indices=columns[row_start:row_end], values=values[row_start:row_end]
+        )
 
 
 def read_csr_matrix(filename: Union[Path, str], do_mmap=True) -> Iterator[SparseVector]:
@@ -67,15 +79,68 @@ def read_csr_matrix(filename: Union[Path, str], do_mmap=True) -> Iterator[Sparse
     yield from csr_to_sparse_vectors(values, columns, index_pointer)
 
 
-def knn_result_read(
-    filename: Union[Path, str]
-) -> Tuple[List[List[int]], List[List[float]]]:
+def read_sparse_matrix_shape(filename: Union[Path, str]) -> Tuple[int, int, int]:
+    """Number of rows, columns and non-zero elements of a CSR matrix"""
+    n_row, n_col, n_non_zero = np.fromfile(filename, dtype="int64", count=3)
+    return int(n_row), int(n_col), int(n_non_zero)
+
+
+# CSR matrices already mapped by the current process
+_mapped: Dict[str, Tuple[np.ndarray, np.ndarray, np.ndarray]] = {}
+
+
+class CsrRows(Sequence[SparseVector]):
+    """
+    Reference to a range of rows of a CSR matrix file, sent to the upload
+    workers instead of the vectors. Every process maps the file on its own and
+    slices the rows at the offsets of its `index_pointer`.
+    """
+
+    def __init__(self, path: Union[Path, str], start: int, end: int):
+        self.path = str(path)
+        self.start = start
+        self.end = end
+
+    def __len__(self):
+        return self.end - self.start
+
+    def __getitem__(self, item):
+        if isinstance(item, slice):
+            start, end, step = item.indices(len(self))
+            assert step == 1, "Only contiguous rows can be referenced"
+            return CsrRows(self.path, self.start + start, self.start + max(start, end))
+        row = range(self.start, self.end)[item]
+        return CsrRows(self.path, row, row + 1).resolve()[0]
+
+    def __iter__(self):
+        return iter(self.resolve())
+
+    @classmethod
+    def concat(cls, rows: List["CsrRows"]) -> Sequence[SparseVector]:
+        """Join consecutive references, other ones are resolved"""
+        if all(
+            current.path == rows[0].path and current.start == previous.end
+            for previous, current in zip(rows, rows[1:])
+        ):
+            return cls(rows[0].path, rows[0].start, rows[-1].end)
+        return [vector for current in rows for vector in current]
+
+    def resolve(self) -> List[SparseVector]:
+        """Sparse vectors of the rows, as views of the mapped file"""
+        fields = _mapped.get(self.path)
+        if fields is None:
+            fields = _mapped[self.path] = mmap_sparse_matrix_fields(self.path)
+        return list(csr_to_sparse_vectors(*fields, self.start, self.end))
+
+
+def knn_result_read(filename: Union[Path, str]) -> Tuple[np.ndarray, np.ndarray]:
+    """Read the ground truth as int32 ids and float32 scores matrices"""
     n, d = map(int, np.fromfile(filename, dtype="uint32", count=2))
     assert os.stat(filename).st_size == 8 + n * d * (4 + 4)
     with open(filename, "rb") as f:
         f.seek(4 + 4)
-        ids = np.fromfile(f, dtype="int32", count=n * d).reshape(n, d).tolist()
-        scores = np.fromfile(f, dtype="float32", count=n * d).reshape(n, d).tolist()
+        ids = np.fromfile(f, dtype="int32", count=n * d).reshape(n, d)
+        scores = np.fromfile(f, dtype="float32", count=n * d).reshape(n, d)
     return ids, scores
 
 
@@ -106,14 +171,47 @@ class SparseReader(BaseReader):
         for i, sparse_vector in enumerate(X):
             yield Record(id=i, vector=None, sparse_vector=sparse_vector, metadata=None)
 
+    def read_data_batches(
+        self, batch_size: int, offset: int = 0
+    ) -> Iterator[RecordBatch]:
+        values, columns, index_pointer = mmap_sparse_matrix_fields(
+            self.path / "data.csr"
+        )
+        num_rows = len(index_pointer) - 1
+        for start in range(offset, num_rows, batch_size):
+            end = min(start + batch_size, num_rows)
+            yield RecordBatch(
+                ids=np.arange(start, end),
+                vectors=None,
+                sparse_vectors=list(
+                    csr_to_sparse_vectors(values, columns, index_pointer, start, end)
+                ),
+                metadata=None,
+            )
+
+    def read_data_shards(
+        self, batch_size: int, offset: int = 0
+    ) -> Iterator[RecordBatch]:
+        data_path = self.path / "data.csr"
+        num_rows, _, _ = read_sparse_matrix_shape(data_path)
+        for start in range(offset, num_rows, batch_size):
+            end = min(start + batch_size, num_rows)
+            yield RecordBatch(
+                ids=np.arange(start, end),
+                vectors=None,
+                sparse_vectors=CsrRows(data_path, start, end),
+                metadata=None,
+            )
+
 
 if __name__ == "__main__":
-    vals = [1, 3, 2, 3, 6, 4, 5]
-    cols = [0, 2, 2, 1, 3, 0, 2]
-    pointers = [0, 2, 3, 5, 7]
+    vals = np.array([1, 3, 2, 3, 6, 4, 5], dtype=np.float32)
+    cols = np.array([0, 2, 2, 1, 3, 0, 2], dtype=np.int32)
+    pointers = np.array([0, 2, 3, 5, 7])
     vecs = [vec for vec in csr_to_sparse_vectors(vals, cols, pointers)]
 
-    assert vecs[0] == SparseVector(indices=[0, 2], values=[1, 3])
-    assert vecs[1] == SparseVector(indices=[2], values=[2])
-    assert vecs[2] == SparseVector(indices=[1, 3], values=[3, 6])
-    assert vecs[3] == SparseVector(indices=[0, 2], values=[4, 5])
+    for vec, (indices, values) in zip(
+        vecs, [([0, 2], [1, 3]), ([2], [2]), ([1, 3], [3, 6]), ([0, 2], [4, 5])]
+    ):
+        assert vec.indices.tolist() == indices
+        assert vec.values.tolist() == values
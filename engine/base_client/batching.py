@@ -0,0 +1,164 @@
+import json
+import threading
+import time
+from typing import Iterable, Iterator, List, Optional
+
+from dataset_reader.base_reader import Record, RecordBatch
+
+# Batch latency the adaptive batching aims for, unless `target_batch_latency`
+# is set
+TARGET_BATCH_LATENCY = 1.0
+MIN_BATCH_SIZE = 16
+MAX_BATCH_SIZE = 65536
+# Decrease factor applied when a batch is slower than the target
+BATCH_SIZE_DECREASE = 0.5
+
+
+def estimate_record_bytes(batch: RecordBatch) -> float:
+    """Approximate size of a single record of the batch in a request"""
+    if len(batch) == 0:
+        return 0.0
+    size = batch.ids.nbytes
+    if batch.vectors is not None:
+        size += batch.vectors.nbytes
+    if batch.sparse_vectors is not None:
+        # 4 byte index and 4 byte value per non-zero element
+        size += 8 * sum(len(vector.indices) for vector in batch.sparse_vectors)
+    if batch.metadata:
+        size += sum(
+            len(json.dumps(column, default=str)) for column in batch.metadata.values()
+        )
+    return size / len(batch)
+
+
+class BatchSizeController:
+    """
+    Adjusts the upload batch size to the observed batch latency, the same way
+    TCP adjusts its congestion window: the size doubles while batches are
+    faster than `target_latency` (slow start), then grows by the initial size
+    per fast batch and halves on every slow one (AIMD).
+
+    Batches are read ahead of the upload, so the results of batches of another
+    size than the current one were read before the last resize, and are
+    ignored: a slow period halves the size once, not once per prefetched batch.
+    """
+
+    def __init__(
+        self,
+        batch_size: int,
+        target_latency: float = TARGET_BATCH_LATENCY,
+        min_size: int = MIN_BATCH_SIZE,
+        max_size: int = MAX_BATCH_SIZE,
+        max_bytes: Optional[int] = None,
+    ):
+        self.min_size = min_size
+        self.max_size = max_size
+        self.max_bytes = max_bytes
+        self.step = max(batch_size, min_size)
+        self.target_latency = target_latency
+        self.slow_start = True
+        self.record_bytes = 0.0
+        self.lock = threading.Lock()
+        self.start = time.perf_counter()
+        self.size = self._clamp(batch_size)
+        self.trajectory = [(0.0, self.size)]
+
+    @classmethod
+    def from_params(cls, upload_params: dict) -> Optional["BatchSizeController"]:
+        if not upload_params.get("adaptive_batch_size", False):
+            return None
+        return cls(
+            batch_size=upload_params.get("batch_size", 64),
+            target_latency=upload_params.get(
+                "target_batch_latency", TARGET_BATCH_LATENCY
+            ),
+            min_size=upload_params.get("min_batch_size", MIN_BATCH_SIZE),
+            max_size=upload_params.get("max_batch_size", MAX_BATCH_SIZE),
+            max_bytes=upload_params.get("max_batch_bytes"),
+        )
+
+    def _clamp(self, size: float) -> int:
+        max_size = self.max_size
+        if self.max_bytes is not None and self.record_bytes > 0:
+            max_size = min(max_size, int(self.max_bytes // self.record_bytes))
+        return max(self.min_size, min(max_size, int(size)))
+
+    def _resize(self, size: float):
+        size = self._clamp(size)
+        if size != self.size:
+            self.size = size
+            self.trajectory.append((time.perf_counter() - self.start, size))
+
+    def observe_batch(self, batch: RecordBatch):
+        """Track the size of the records to respect `max_bytes`"""
+        if self.max_bytes is None or len(batch) == 0:
+            return
+        with self.lock:
+            self.record_bytes = max(self.record_bytes, estimate_record_bytes(batch))
+            self._resize(self.size)
+
+    def update(self, size: int, latency: float):
+        with self.lock:
+            if size != self.size:
+                return
+            if latency > self.target_latency:
+                self.slow_start = False
+                self._resize(self.size * BATCH_SIZE_DECREASE)
+            elif self.slow_start:
+                self._resize(self.size * 2)
+            else:
+                self._resize(self.size + self.step)
+
+    def stats(self) -> dict:
+        return {
+            "target_latency": self.target_latency,
+            "final_batch_size": self.size,
+            "trajectory": [
+                {"time": offset, "batch_size": size} for offset, size in self.trajectory
+            ],
+        }
+
+
+def iter_adaptive_records(
+    records: Iterable[Record], controller: BatchSizeController
+) -> Iterator[List[Record]]:
+    records = iter(records)
+    while True:
+        batch = []
+        for record in records:
+            batch.append(record)
+            if len(batch) >= controller.size:
+                break
+        if len(batch) == 0:
+            break
+        if controller.max_bytes is not None:
+            controller.observe_batch(RecordBatch.from_records(batch))
+        yield batch
+
+
+def iter_adaptive_batches(
+    batches: Iterable[RecordBatch], controller: BatchSizeController
+) -> Iterator[RecordBatch]:
+    """
+    Re-slice the batches of the reader to the current size of the
+    controller, joining them if they are too small
+    """
+    pending: List[RecordBatch] = []
+    pending_size = 0
+    batches = iter(batches)
+    while True:
+        while pending_size < controller.size:
+            batch = next(batches, None)
+            if batch is None:
+                break
+            controller.observe_batch(batch)
+            pending.append(batch)
+            pending_size += len(batch)
+        if pending_size == 0:
+            break
+
+        joined = pending[0] if len(pending) == 1 else RecordBatch.concat(pending)
+        size = min(controller.size, pending_size)
+        yield joined.slice(0, size)
+        pending = [joined.slice(size, pending_size)] if size < pending_size else []
+        pending_size -= size
@@ -0,0 +1,78 @@
+import json
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Callable, Dict
+
+# Minimal number of seconds between the writes of the checkpoint file
+CHECKPOINT_INTERVAL = float(os.getenv("UPLOAD_CHECKPOINT_INTERVAL", 10.0))
+
+
+class UploadCheckpoint:
+    """
+    Tracks the number of leading records of the dataset acknowledged by the
+    engine, so an interrupted upload can continue from there.
+
+    Batches are acknowledged out of order, so only the end of the contiguous
+    acknowledged range is stored. Records after it may have been uploaded
+    as well, and are uploaded again on resume. Once the upload returns, the
+    checkpoint is marked complete, so it is not resumed again.
+    """
+
+    def __init__(self, path: Path, offset: int = 0, complete: bool = False):
+        self.path = Path(path)
+        self.offset = offset
+        self.complete = complete
+        self.submitted = offset
+        # End offsets of the acknowledged batches after the contiguous range
+        self.pending: Dict[int, int] = {}
+        self.lock = threading.Lock()
+        self.saved_at = time.perf_counter()
+
+    @classmethod
+    def load(cls, path: Path) -> "UploadCheckpoint":
+        path = Path(path)
+        if not path.exists():
+            return cls(path)
+        with open(path) as f:
+            state = json.load(f)
+        return cls(path, offset=state["offset"], complete=state.get("complete", False))
+
+    def track(self, submit: Callable) -> Callable:
+        """
+        Wrap the `submit` function of the upload pipeline, which is called
+        with the batches in the order of the dataset
+        """
+
+        def tracked(batch, callback: Callable, error_callback: Callable):
+            start, size = self.submitted, len(batch)
+            self.submitted += size
+
+            def acknowledged(result):
+                self.acknowledge(start, size)
+                callback(result)
+
+            submit(batch, acknowledged, error_callback)
+
+        return tracked
+
+    def acknowledge(self, start: int, size: int):
+        with self.lock:
+            self.pending[start] = start + size
+            while self.offset in self.pending:
+                self.offset = self.pending.pop(self.offset)
+        if time.perf_counter() - self.saved_at >= CHECKPOINT_INTERVAL:
+            self.save()
+
+    def finish(self):
+        self.complete = True
+        self.save()
+
+    def save(self):
+        with self.lock:
+            self.saved_at = time.perf_counter()
+            tmp_path = self.path.with_suffix(".tmp")
+            with open(tmp_path, "w") as f:
+                json.dump({"offset": self.offset, "complete": self.complete}, f)
+            os.replace(tmp_path, self.path)
@@ -3,16 +3,22 @@ import os
 from datetime import datetime
 from typing import List, Optional
 
+import numpy as np
+
 from benchmark import ROOT_DIR
 from benchmark.dataset import Dataset
+from engine.base_client.checkpoint import UploadCheckpoint
 from engine.base_client.configure import BaseConfigurator
 from engine.base_client.search import BaseSearcher
+from engine.base_client.selectivity import compute_selectivity
 from engine.base_client.upload import BaseUploader
 
 RESULTS_DIR = ROOT_DIR / "results"
 RESULTS_DIR.mkdir(exist_ok=True)
 
 DETAILED_RESULTS = bool(int(os.getenv("DETAILED_RESULTS", False)))
+# Report the search results by the selectivity of the query conditions
+FILTER_ANALYSIS = bool(int(os.getenv("FILTER_ANALYSIS", False)))
 
 
 class BaseClient:
@@ -85,6 +91,7 @@ class BaseClient:
         skip_search: bool = False,
         skip_if_exists: bool = True,
         skip_configure: Optional[bool] = False,
+        resume_upload: bool = False,
     ):
         execution_params = self.configurator.execution_params(
             distance=dataset.config.distance, vector_size=dataset.config.vector_size
@@ -102,30 +109,65 @@ class BaseClient:
                 return
 
         if not skip_upload:
-            if not skip_configure:
-                print("Experiment stage: Configure")
-                self.configurator.configure(dataset)
-
-            print("Experiment stage: Upload")
-            upload_stats = self.uploader.upload(
-                distance=dataset.config.distance, records=reader.read_data()
+            checkpoint_path = (
+                RESULTS_DIR / f"{self.name}-{dataset.config.name}-upload.checkpoint"
             )
+            if resume_upload and not checkpoint_path.exists():
+                # Nothing was uploaded yet, the collection may be missing
+                print(
+                    f"No upload checkpoint of {dataset.config.name}, "
+                    "uploading from the start"
+                )
+                resume_upload = False
+            if resume_upload:
+                # Continue the interrupted upload into the existing collection
+                checkpoint = UploadCheckpoint.load(checkpoint_path)
+                if checkpoint.complete:
+                    # Resuming would overwrite the results of the finished upload
+                    print(
+                        f"Upload of {dataset.config.name} is already complete, "
+                        "not resuming it"
+                    )
+            else:
+                checkpoint = UploadCheckpoint(checkpoint_path)
+                if not skip_configure:
+                    print("Experiment stage: Configure")
+                    self.configurator.configure(dataset)
+
+            if not checkpoint.complete:
+                print("Experiment stage: Upload")
+                upload_stats = self.uploader.upload(
+                    distance=dataset.config.distance,
+                    reader=reader,
+                    checkpoint=checkpoint,
+                )
+                checkpoint.finish()
 
-            if not DETAILED_RESULTS:
-                # Remove verbose stats from upload results
-                upload_stats.pop("latencies", None)
-
-            self.save_upload_results(
-                dataset.config.name,
-                upload_stats,
-                upload_params={
-                    **self.uploader.upload_params,
-                    **self.configurator.collection_params,
-                },
-            )
+                if not DETAILED_RESULTS:
+                    # Remove verbose stats from upload results
+                    upload_stats.pop("latencies", None)
+
+                self.save_upload_results(
+                    dataset.config.name,
+                    upload_stats,
+                    upload_params={
+                        **self.uploader.upload_params,
+                        **self.configurator.collection_params,
+                    },
+                )
 
         if not skip_search:
             print("Experiment stage: Search")
+            # Engine requests built for the previous searcher, reused if the
+            # next one has the same top and search config
+            prepared_cache = {}
+            selectivity = None
+            if FILTER_ANALYSIS:
+                print("Computing the selectivity of the query conditions")
+                selectivity = compute_selectivity(reader)
+                if np.isnan(selectivity).all():
+                    # None of the queries has conditions
+                    selectivity = None
             for search_id, searcher in enumerate(self.searchers):
 
                 if skip_if_exists:
@@ -142,11 +184,13 @@ class BaseClient:
 
                 search_params = {**searcher.search_params}
                 search_stats = searcher.search_all(
-                    dataset.config.distance, reader.read_queries()
+                    dataset.config.distance,
+                    reader.read_queries(),
+                    prepared_cache=prepared_cache,
+                    selectivity=selectivity,
                 )
                 if not DETAILED_RESULTS:
                     # Remove verbose stats from search results
-                    search_stats.pop("latencies", None)
                     search_stats.pop("precisions", None)
 
                 self.save_search_results(
@@ -0,0 +1,143 @@
+import base64
+import math
+import zlib
+
+import numpy as np
+
+# Values are recorded in microseconds. Each power of two range is split into
+# 2 ** (SUB_BUCKET_BITS - 1) linear buckets, which keeps the relative error
+# below 0.1% (3 significant digits), as in HdrHistogram.
+SUB_BUCKET_BITS = 11
+SUB_BUCKET_COUNT = 1 << SUB_BUCKET_BITS
+SUB_BUCKET_HALF_COUNT = SUB_BUCKET_COUNT >> 1
+UNITS_PER_SECOND = 1_000_000
+# One hour, longer values are clamped
+HIGHEST_TRACKABLE_VALUE = 3600 * UNITS_PER_SECOND
+
+
+def to_units(value: float) -> int:
+    """Seconds to the recorded units, clamped to the trackable range"""
+    return min(max(int(value * UNITS_PER_SECOND), 0), HIGHEST_TRACKABLE_VALUE)
+
+
+def bucket_index(value: int) -> int:
+    if value < SUB_BUCKET_COUNT:
+        return value
+    shift = value.bit_length() - SUB_BUCKET_BITS
+    return (
+        SUB_BUCKET_COUNT
+        + (shift - 1) * SUB_BUCKET_HALF_COUNT
+        + ((value >> shift) - SUB_BUCKET_HALF_COUNT)
+    )
+
+
+def highest_equivalent_value(index: int) -> int:
+    if index < SUB_BUCKET_COUNT:
+        return index
+    shift, sub_bucket = divmod(index - SUB_BUCKET_COUNT, SUB_BUCKET_HALF_COUNT)
+    shift += 1
+    return ((sub_bucket + SUB_BUCKET_HALF_COUNT + 1) << shift) - 1
+
+
+BUCKETS = bucket_index(HIGHEST_TRACKABLE_VALUE) + 1
+
+
+class LatencyHistogram:
+    """
+    Log-linear histogram of latencies with constant memory. Histograms
+    recorded in different processes are combined with `merge`. Count, sum,
+    min and max are tracked exactly, percentiles within 0.1%.
+    """
+
+    def __init__(self):
+        self.counts = np.zeros(BUCKETS, dtype=np.int64)
+        self.count = 0
+        self.total = 0.0
+        self.total_squares = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+
+    def record(self, value: float):
+        """Record the value given in seconds"""
+        self.counts[bucket_index(to_units(value))] += 1
+        self.count += 1
+        self.total += value
+        self.total_squares += value * value
+        self.min = min(self.min, value)
+        self.max = max(self.max, value)
+
+    def merge(self, other: "LatencyHistogram") -> "LatencyHistogram":
+        self.counts += other.counts
+        self.count += other.count
+        self.total += other.total
+        self.total_squares += other.total_squares
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        return self
+
+    @property
+    def mean(self) -> float:
+        return self.total / self.count if self.count else math.nan
+
+    @property
+    def std(self) -> float:
+        if not self.count:
+            return math.nan
+        return math.sqrt(max(self.total_squares / self.count - self.mean**2, 0.0))
+
+    def percentile(self, q: float) -> float:
+        """Value in seconds below which `q` percent of the values fall"""
+        if not self.count:
+            return math.nan
+        rank = max(math.ceil(q / 100 * self.count), 1)
+        index = int(np.searchsorted(np.cumsum(self.counts), rank))
+        value = highest_equivalent_value(index) / UNITS_PER_SECOND
+        return min(max(value, self.min), self.max)
+
+    def to_dict(self) -> dict:
+        """Compact form stored in the results: counts are zlib-compressed"""
+        used = np.flatnonzero(self.counts)
+        size = int(used[-1]) + 1 if len(used) else 0
+        return {
+            "unit": "us",
+            "sub_bucket_bits": SUB_BUCKET_BITS,
+            "count": self.count,
+            "total": self.total,
+            "total_squares": self.total_squares,
+            "min": self.min if self.count else None,
+            "max": self.max if self.count else None,
+            "counts": base64.b64encode(
+                zlib.compress(self.counts[:size].astype("<i8").tobytes())
+            ).decode(),
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "LatencyHistogram":
+        if data["sub_bucket_bits"] != SUB_BUCKET_BITS:
+            raise ValueError(
+                f"Unsupported histogram precision: {data['sub_bucket_bits']} bits"
+            )
+        histogram = cls()
+        counts = np.frombuffer(
+            zlib.decompress(base64.b64decode(data["counts"])), dtype="<i8"
+        )
+        histogram.counts[: len(counts)] = counts
+        histogram.count = data["count"]
+        histogram.total = data["total"]
+        histogram.total_squares = data["total_squares"]
+        histogram.min = data["min"] if data["min"] is not None else math.inf
+        histogram.max = data["max"] if data["max"] is not None else -math.inf
+        return histogram
+
+
+def summarize(histogram: LatencyHistogram, name: str = "time") -> dict:
+    """Mean and percentiles of the histogram, named as in the search results"""
+    return {
+        f"mean_{name}": histogram.mean,
+        f"p50_{name}": histogram.percentile(50),
+        f"p90_{name}": histogram.percentile(90),
+        f"p95_{name}": histogram.percentile(95),
+        f"p99_{name}": histogram.percentile(99),
+        f"p999_{name}": histogram.percentile(99.9),
+        f"p9999_{name}": histogram.percentile(99.99),
+    }
@@ -0,0 +1,108 @@
+import time
+from typing import Callable, List, Optional
+
+# Polling starts with short intervals, so a quick index build is not
+# reported as taking the whole interval, and backs off for the long ones
+MIN_POLL_INTERVAL = 0.05
+MAX_POLL_INTERVAL = 1.0
+POLL_BACKOFF = 1.5
+# Progress samples kept in the results, they are thinned out evenly over the
+# whole build once there are more
+MAX_PROGRESS_SAMPLES = 100
+
+
+class IndexBuild:
+    """
+    Post-upload phase of the engine: building the index, merging segments,
+    loading the collection, until it is ready to be searched. Uploaders
+    mark the start of the build and report the progress from `post_upload`,
+    the phase ends when it returns.
+
+    Times are in seconds since the end of the data upload.
+    """
+
+    def __init__(self):
+        self.origin = time.perf_counter()
+        self.start: Optional[float] = None
+        self.end: Optional[float] = None
+        self.samples: List[dict] = []
+        self.sample_count = 0
+        self.last_sample: Optional[dict] = None
+        # Only every `stride`-th sample is kept
+        self.stride = 1
+
+    def _now(self) -> float:
+        return time.perf_counter() - self.origin
+
+    def started(self):
+        """Mark the start of the build, after the preparation steps"""
+        if self.start is None:
+            self.start = self._now()
+
+    def progress(
+        self,
+        done: Optional[float] = None,
+        total: Optional[float] = None,
+        status: Optional[str] = None,
+    ):
+        """Sample the progress of the build, as reported by the engine"""
+        self.started()
+        sample = {"time": self._now(), "done": done, "total": total, "status": status}
+        if self.sample_count % self.stride == 0:
+            self.samples.append(sample)
+            if len(self.samples) > MAX_PROGRESS_SAMPLES:
+                self.samples = self.samples[::2]
+                self.stride *= 2
+        self.sample_count += 1
+        self.last_sample = sample
+
+    def finished(self):
+        self.started()
+        if self.end is None:
+            self.end = self._now()
+
+    def to_dict(self) -> dict:
+        return {
+            "start": self.start,
+            "end": self.end,
+            "build_time": (
+                self.end - self.start
+                if self.start is not None and self.end is not None
+                else None
+            ),
+            # Time from the last acknowledged record until the collection
+            # can be searched
+            "time_to_searchable": self.end,
+            "samples": self.samples,
+            "sample_count": self.sample_count,
+            "last_sample": self.last_sample,
+        }
+
+
+def wait_until(
+    condition: Callable[[], bool],
+    timeout: Optional[float] = None,
+    settle: float = 0.0,
+    min_interval: float = MIN_POLL_INTERVAL,
+    max_interval: float = MAX_POLL_INTERVAL,
+) -> float:
+    """
+    Poll the condition with exponentially growing intervals, from
+    `min_interval` up to `max_interval`. With `settle`, the condition
+    has to hold again after that many seconds, for the engines whose status
+    may flap before the background work starts. Returns the waiting time.
+    """
+    start = time.perf_counter()
+    interval = min_interval
+    while True:
+        if condition():
+            if settle <= 0:
+                break
+            time.sleep(settle)
+            if condition():
+                break
+        if timeout is not None and time.perf_counter() - start > timeout:
+            raise TimeoutError(f"Condition not met within {timeout} seconds")
+        time.sleep(interval)
+        interval = min(interval * POLL_BACKOFF, max_interval)
+    return time.perf_counter() - start
@@ -0,0 +1,145 @@
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+RECALL_AT = (1, 10, 100)
+
+
+def pad_rows(
+    rows: Sequence[Optional[Sequence]], dtype, fill, width: Optional[int] = None
+) -> np.ndarray:
+    """Stack rows of different lengths into a matrix, padded with `fill`"""
+    if width is None:
+        width = max((len(row) for row in rows if row is not None), default=0)
+    matrix = np.full((len(rows), width), fill, dtype=dtype)
+    for i, row in enumerate(rows):
+        if row is not None and len(row) > 0:
+            size = min(len(row), width)
+            matrix[i, :size] = np.asarray(row[:size], dtype=dtype)
+    return matrix
+
+
+def result_ids(search_res: List[Tuple[int, float]], top: int) -> np.ndarray:
+    """Returned ids as an array of length `top`, padded with -1"""
+    ids = np.full(top, -1, dtype=np.int64)
+    size = min(len(search_res), top)
+    if size > 0:
+        ids[:size] = [int(hit[0]) for hit in search_res[:size]]
+    return ids
+
+
+def ground_truth_positions(ids: np.ndarray, expected_ids: np.ndarray) -> np.ndarray:
+    """
+    Position of every returned id in the ground truth of its query, -1 if it
+    is not there. Rows are searched at once by offsetting the ids of each row.
+    """
+    n, m = expected_ids.shape
+    positions = np.full(ids.shape, -1, dtype=np.int64)
+    if n == 0 or m == 0 or ids.size == 0:
+        return positions
+
+    span = int(max(ids.max(), expected_ids.max(), 0)) + 2
+    offsets = np.arange(n, dtype=np.int64)[:, None] * span
+    expected_keys = (expected_ids + 1 + offsets).ravel()
+    order = np.argsort(expected_keys, kind="stable")
+    sorted_keys = expected_keys[order]
+
+    keys = (ids + 1 + offsets).ravel()
+    found = np.searchsorted(sorted_keys, keys).clip(max=len(sorted_keys) - 1)
+    matched = (sorted_keys[found] == keys) & (ids.ravel() >= 0)
+    positions.ravel()[matched] = order[found[matched]] % m
+    return positions
+
+
+def relevance(
+    positions: np.ndarray, expected_scores: Optional[np.ndarray], k: np.ndarray
+) -> np.ndarray:
+    """
+    Whether a returned id belongs to the true top-k of its query. Neighbours
+    ranked below k with the same expected score as the k-th one are ties and
+    count as relevant as well.
+    """
+    k = k[:, None]
+    relevant = (positions >= 0) & (positions < k)
+    if expected_scores is not None and expected_scores.shape[1] > 0:
+        rows = np.arange(len(positions))[:, None]
+        width = expected_scores.shape[1]
+        boundary = expected_scores[rows, np.minimum(k, width) - 1]
+        scores = expected_scores[rows, positions.clip(0, width - 1)]
+        ties = (positions >= k) & np.isclose(scores, boundary, equal_nan=False)
+        relevant |= ties
+    return relevant
+
+
+def compute_metrics(
+    ids: np.ndarray,
+    tops: np.ndarray,
+    expected_ids: np.ndarray,
+    expected_scores: Optional[np.ndarray],
+) -> Dict[str, object]:
+    """
+    Compute the quality metrics of the whole search run in a single pass.
+
+    `ids` holds the returned ids of every query padded with -1, `tops` the
+    number of requested results of each query. Ground truth is given as
+    matrices padded with -1 ids and NaN scores. Queries without the ground
+    truth get the precision of 1.0 and are skipped by the other metrics.
+    """
+    has_truth = (expected_ids >= 0).any(axis=1)
+    positions = ground_truth_positions(ids, expected_ids)
+    columns = np.arange(ids.shape[1])[None, :]
+    in_top = columns < tops[:, None]
+
+    relevant = relevance(positions, expected_scores, tops) & in_top
+    precisions = np.where(has_truth, relevant.sum(axis=1) / tops, 1.0)
+    metrics = {"precisions": precisions}
+
+    if not has_truth.any():
+        return metrics
+    positions, tops = positions[has_truth], tops[has_truth]
+    expected_ids = expected_ids[has_truth]
+    if expected_scores is not None:
+        expected_scores = expected_scores[has_truth]
+    relevant, in_top = relevant[has_truth], in_top[has_truth]
+    truth_size = (expected_ids >= 0).sum(axis=1)
+
+    for k in RECALL_AT:
+        if k > tops.min() or k > truth_size.min():
+            continue
+        at_k = np.full(len(positions), k)
+        hits = relevance(positions[:, :k], expected_scores, at_k)
+        metrics[f"mean_recall@{k}"] = float(hits.sum(axis=1).mean() / k)
+
+    # Reciprocal rank of the true nearest neighbour (or a tie of it)
+    first = relevance(positions, expected_scores, np.ones(len(positions), int))
+    first &= in_top
+    ranks = np.where(first.any(axis=1), first.argmax(axis=1) + 1, np.inf)
+    metrics["mrr"] = float(np.mean(1.0 / ranks))
+
+    discounts = 1.0 / np.log2(np.arange(ids.shape[1]) + 2)
+    dcg = (relevant * discounts).sum(axis=1)
+    ideal_size = np.minimum(tops, truth_size)
+    idcg = np.concatenate([[0.0], np.cumsum(discounts)])[ideal_size]
+    metrics["mean_ndcg"] = float(np.mean(dcg / np.where(idcg > 0, idcg, 1.0)))
+
+    if expected_scores is not None and not np.isnan(expected_scores).all():
+        # Ratio of the expected score of the returned neighbour to the one of
+        # the true neighbour of the same rank, 1.0 for the exact results.
+        # Neighbours outside the ground truth are given the score of its last
+        # element, so the ratio is a bound of the real one.
+        rows = np.arange(len(positions))[:, None]
+        last = expected_scores[rows[:, 0], truth_size - 1][:, None]
+        width = min(ids.shape[1], expected_scores.shape[1])
+        returned = np.where(
+            positions[:, :width] >= 0,
+            expected_scores[rows, positions[:, :width].clip(0)],
+            last,
+        )
+        expected = expected_scores[:, :width]
+        valid = in_top[:, :width] & (columns[:, :width] < truth_size[:, None])
+        valid &= np.isfinite(expected) & (expected != 0)
+        if valid.any():
+            ratios = returned[valid] / expected[valid]
+            metrics["mean_distance_ratio"] = float(np.mean(ratios))
+
+    return metrics
@@ -1,3 +1,5 @@
+import json
+import time
 from enum import Enum
 from typing import Any, Dict, List, Optional, Union
 
@@ -13,6 +15,13 @@ MetaConditions = Dict[str, List[Any]]
 
 
 class BaseConditionParser:
+    def __init__(self):
+        # Engine filters by the canonical form of the conditions, as queries
+        # of the filtered datasets often repeat them
+        self.translated: Dict[str, Any] = {}
+        self.cache_hits = 0
+        self.translation_time = 0.0
+
     def parse(self, meta_conditions: Optional[MetaConditions]) -> Optional[Any]:
         """
         The parse method accepts the meta conditions stored in a dict-like
@@ -34,10 +43,26 @@ class BaseConditionParser:
         """
         if meta_conditions is None or 0 == len(meta_conditions):
             return None
-        return self.build_condition(
+        key = json.dumps(meta_conditions, sort_keys=True)
+        if key in self.translated:
+            self.cache_hits += 1
+            return self.translated[key]
+
+        start = time.perf_counter()
+        condition = self.build_condition(
             and_subfilters=self.create_condition_subfilters(meta_conditions.get("and")),
             or_subfilters=self.create_condition_subfilters(meta_conditions.get("or")),
         )
+        self.translation_time += time.perf_counter() - start
+        self.translated[key] = condition
+        return condition
+
+    def translation_stats(self) -> dict:
+        return {
+            "translated": len(self.translated),
+            "cache_hits": self.cache_hits,
+            "translation_time": self.translation_time,
+        }
 
     def build_condition(
         self, and_subfilters: Optional[List[Any]], or_subfilters: Optional[List[Any]]
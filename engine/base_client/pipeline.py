@@ -0,0 +1,197 @@
+import functools
+import queue
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, Optional
+
+# Marks the end of the read stage
+_DONE = object()
+
+
+class StageStats:
+    """Work done by a single stage of the upload pipeline"""
+
+    def __init__(self, workers: int = 1):
+        self.workers = workers
+        self.batches = 0
+        self.records = 0
+        # Time spent doing the work, summed over the workers
+        self.busy_time = 0.0
+
+    def add(self, records: int, busy_time: float):
+        self.batches += 1
+        self.records += records
+        self.busy_time += busy_time
+
+    def to_dict(self, elapsed: float) -> dict:
+        return {
+            "batches": self.batches,
+            "records": self.records,
+            "records_per_second": self.records / elapsed if elapsed > 0 else None,
+            "busy_time": self.busy_time,
+            # Fraction of time the workers of the stage were busy
+            "utilization": (
+                self.busy_time / (elapsed * self.workers) if elapsed > 0 else None
+            ),
+        }
+
+
+class DepthStats:
+    """Depth of a queue between two stages, sampled on every batch"""
+
+    def __init__(self, limit: int):
+        self.limit = limit
+        self.samples = 0
+        self.total = 0
+        self.max = 0
+        # Time the previous stage was blocked on the full queue (backpressure)
+        self.blocked_time = 0.0
+
+    def sample(self, depth: int):
+        self.samples += 1
+        self.total += depth
+        self.max = max(self.max, depth)
+
+    def to_dict(self) -> dict:
+        return {
+            "limit": self.limit,
+            "mean": self.total / self.samples if self.samples else 0.0,
+            "max": self.max,
+            "blocked_time": self.blocked_time,
+        }
+
+
+class UploadPipeline:
+    """
+    Upload in stages connected by bounded queues:
+
+    * read - a thread reading and decoding the batches ahead, up to
+      `prefetch` batches
+    * upload - workers converting the batches into engine requests and
+      sending them, with at most `max_in_flight` batches submitted at once
+
+    A full queue blocks the previous stage, so memory stays bounded. Queue
+    depths and stage utilization show whether the client (empty upload
+    queue) or the engine (full queues, busy upload workers) is the
+    bottleneck.
+    """
+
+    def __init__(
+        self,
+        batches: Iterable,
+        prefetch: int,
+        max_in_flight: int,
+        upload_workers: int,
+    ):
+        self.batches = batches
+        self.read_queue = queue.Queue(maxsize=prefetch)
+        self.in_flight = threading.BoundedSemaphore(max_in_flight)
+        self.in_flight_count = 0
+        self.lock = threading.Lock()
+        # Errors by the position of the failed batch, so the reported one does
+        # not depend on the order in which the concurrent uploads fail
+        self.errors: Dict[int, BaseException] = {}
+
+        self.read_stats = StageStats()
+        self.upload_stats = StageStats(workers=upload_workers)
+        self.read_depth = DepthStats(prefetch)
+        self.in_flight_depth = DepthStats(max_in_flight)
+        self.start = None
+        self.end = None
+
+    @property
+    def error(self) -> Optional[BaseException]:
+        if len(self.errors) == 0:
+            return None
+        return self.errors[min(self.errors)]
+
+    def _read(self):
+        try:
+            batches = iter(self.batches)
+            while self.error is None:
+                start = time.perf_counter()
+                batch = next(batches, _DONE)
+                if batch is _DONE:
+                    break
+                self.read_stats.add(len(batch), time.perf_counter() - start)
+
+                start = time.perf_counter()
+                self.read_queue.put(batch)
+                self.read_depth.blocked_time += time.perf_counter() - start
+        except BaseException as ex:
+            with self.lock:
+                self.errors[self.read_stats.batches] = ex
+        finally:
+            self.read_queue.put(_DONE)
+
+    def _complete(self, result: Any, on_result: Callable[[Any], None]):
+        with self.lock:
+            self.in_flight_count -= 1
+            size, _, latency = result[:3]
+            self.upload_stats.add(size, latency)
+            on_result(result)
+        self.in_flight.release()
+
+    def _fail(self, position: int, ex: BaseException):
+        with self.lock:
+            self.errors[position] = ex
+            self.in_flight_count -= 1
+        self.in_flight.release()
+
+    def run(
+        self,
+        submit: Callable[[Any, Callable, Callable], None],
+        on_result: Callable[[Any], None],
+    ):
+        """
+        Feed the batches to `submit(batch, callback, error_callback)`, which
+        has to call one of the callbacks once the batch is uploaded, with the
+        `(size, started_at, latency, ...)` tuple in the case of success.
+        """
+        self.start = time.perf_counter()
+        reader = threading.Thread(target=self._read, daemon=True)
+        reader.start()
+
+        position = 0
+        while True:
+            self.read_depth.sample(self.read_queue.qsize())
+            batch = self.read_queue.get()
+            if batch is _DONE or self.error is not None:
+                break
+
+            start = time.perf_counter()
+            self.in_flight.acquire()
+            self.in_flight_depth.blocked_time += time.perf_counter() - start
+            with self.lock:
+                self.in_flight_count += 1
+                self.in_flight_depth.sample(self.in_flight_count)
+
+            submit(
+                batch,
+                lambda result: self._complete(result, on_result),
+                functools.partial(self._fail, position),
+            )
+            position += 1
+
+        # Unblock the read stage if it stopped early
+        while batch is not _DONE:
+            batch = self.read_queue.get()
+
+        # Wait for the batches in flight
+        for _ in range(self.in_flight_depth.limit):
+            self.in_flight.acquire()
+        self.end = time.perf_counter()
+        reader.join()
+
+        if self.error is not None:
+            raise self.error
+
+    def stats(self) -> dict:
+        elapsed = (self.end or time.perf_counter()) - self.start
+        return {
+            "read": self.read_stats.to_dict(elapsed),
+            "upload": self.upload_stats.to_dict(elapsed),
+            "read_queue": self.read_depth.to_dict(),
+            "in_flight": self.in_flight_depth.to_dict(),
+            "failed_batches": len(self.errors),
+        }
@@ -0,0 +1,207 @@
+import collections
+import os
+import pickle
+import signal
+import time
+from multiprocessing import current_process, util
+from typing import Any, Dict, Optional
+
+from benchmark import ROOT_DIR
+
+# Splits every search and upload call into phases, measuring the wall and the
+# CPU time the client spends in each of them
+PROFILE_CLIENT = bool(int(os.getenv("PROFILE_CLIENT", False)))
+# Seconds of CPU time between the stack samples of every process, 0 disables
+# the sampling profiler
+PROFILE_SAMPLING_INTERVAL = float(os.getenv("PROFILE_SAMPLING_INTERVAL", 0.0))
+PROFILES_DIR = ROOT_DIR / "results" / "profiles"
+# Seconds between the writes of the sampled stacks
+SAMPLES_DUMP_INTERVAL = 5.0
+
+
+class PhaseTimer:
+    """
+    Wall and CPU time of the consecutive phases of a single call. CPU time is
+    measured for the calling thread, so the time the engine call spends
+    waiting for the network is its wall time minus its CPU time.
+    """
+
+    def __init__(self):
+        self.phases: Dict[str, list] = {}
+        self._wall = time.perf_counter()
+        self._cpu = time.thread_time()
+
+    def lap(self, phase: str):
+        """End the current phase, measured since the previous lap"""
+        wall, cpu = time.perf_counter(), time.thread_time()
+        times = self.phases.setdefault(phase, [0.0, 0.0])
+        times[0] += wall - self._wall
+        times[1] += cpu - self._cpu
+        self._wall, self._cpu = wall, cpu
+
+    def ipc(self, *items: Any):
+        """
+        Pickle the items sent through the pool once more, as the pool itself
+        can not be instrumented. Nothing is sent by the main process.
+        """
+        if current_process().name != "MainProcess":
+            for item in items:
+                pickle.loads(pickle.dumps(item))
+        self.lap("ipc")
+
+    def to_dict(self) -> dict:
+        phases = {
+            phase: {"wall": wall, "cpu": cpu}
+            for phase, (wall, cpu) in self.phases.items()
+        }
+        call = phases.pop("engine_call", None)
+        if call is not None:
+            phases["engine_call_cpu"] = {"wall": call["cpu"], "cpu": call["cpu"]}
+            phases["network_wait"] = {"wall": call["wall"] - call["cpu"], "cpu": 0.0}
+        return {
+            "worker": os.getpid(),
+            # Cumulative CPU time of the process, to report it per worker
+            "process_cpu": time.process_time(),
+            "phases": phases,
+        }
+
+
+class ClientProfile:
+    """Phase times of the calls, aggregated per worker process"""
+
+    def __init__(self):
+        self.workers: Dict[int, dict] = {}
+
+    def record(self, profile: Optional[dict], latency: float):
+        if profile is None:
+            return
+        worker = self.workers.setdefault(
+            profile["worker"],
+            {
+                "calls": 0,
+                "wall_time": 0.0,
+                "cpu_time": 0.0,
+                "first_process_cpu": profile["process_cpu"],
+                "last_process_cpu": profile["process_cpu"],
+                "phases": collections.defaultdict(lambda: [0.0, 0.0]),
+            },
+        )
+        worker["calls"] += 1
+        worker["wall_time"] += latency
+        worker["last_process_cpu"] = max(
+            worker["last_process_cpu"], profile["process_cpu"]
+        )
+        for phase, times in profile["phases"].items():
+            worker["phases"][phase][0] += times["wall"]
+            worker["phases"][phase][1] += times["cpu"]
+            worker["cpu_time"] += times["cpu"]
+
+    def to_dict(self) -> Optional[dict]:
+        if not self.workers:
+            return None
+        workers = {}
+        phases = collections.defaultdict(lambda: {"wall": 0.0, "cpu": 0.0})
+        for pid, worker in self.workers.items():
+            workers[str(pid)] = {
+                "calls": worker["calls"],
+                "wall_time": worker["wall_time"],
+                "cpu_time": worker["cpu_time"],
+                # CPU time of the whole process, including the pool machinery
+                "process_cpu_time": worker["last_process_cpu"]
+                - worker["first_process_cpu"],
+                "phases": {
+                    phase: {"wall": wall, "cpu": cpu}
+                    for phase, (wall, cpu) in worker["phases"].items()
+                },
+            }
+            for phase, (wall, cpu) in worker["phases"].items():
+                phases[phase]["wall"] += wall
+                phases[phase]["cpu"] += cpu
+        calls = sum(worker["calls"] for worker in workers.values())
+        return {
+            "calls": calls,
+            "wall_time": sum(worker["wall_time"] for worker in workers.values()),
+            "cpu_time": sum(worker["cpu_time"] for worker in workers.values()),
+            "phases": {
+                phase: {**times, "mean_wall": times["wall"] / calls}
+                for phase, times in phases.items()
+            },
+            "workers": workers,
+        }
+
+
+class StackSampler:
+    """
+    Sampling profiler of the main thread of a process, driven by the CPU time
+    timer, so the idle waiting is not sampled. Stacks are written in the folded
+    format of flame graph tools, to `PROFILES_DIR/<name>-<pid>.folded`.
+    """
+
+    def __init__(self, name: str, interval: float):
+        self.pid = os.getpid()
+        self.path = PROFILES_DIR / f"{name}-{self.pid}.folded"
+        self.interval = interval
+        self.stacks: Dict[str, int] = collections.Counter()
+        self.dumped_at = time.perf_counter()
+        self.finalizer: Optional[util.Finalize] = None
+        self.sigterm_handler = None
+
+    def start(self) -> "StackSampler":
+        PROFILES_DIR.mkdir(parents=True, exist_ok=True)
+        signal.signal(signal.SIGPROF, self._sample)
+        signal.setitimer(signal.ITIMER_PROF, self.interval, self.interval)
+        # Worker processes exit without running the atexit handlers, or are
+        # terminated by the pool
+        self.finalizer = util.Finalize(self, self.dump, exitpriority=0)
+        self.sigterm_handler = signal.signal(signal.SIGTERM, self._terminate)
+        return self
+
+    def _terminate(self, signum, frame):
+        self.dump()
+        signal.signal(signal.SIGTERM, signal.SIG_DFL)
+        os.kill(os.getpid(), signal.SIGTERM)
+
+    def _sample(self, signum, frame):
+        stack = []
+        while frame is not None:
+            code = frame.f_code
+            stack.append(f"{code.co_name} ({code.co_filename}:{code.co_firstlineno})")
+            frame = frame.f_back
+        self.stacks[";".join(reversed(stack))] += 1
+        if time.perf_counter() - self.dumped_at > SAMPLES_DUMP_INTERVAL:
+            self.dump()
+
+    def dump(self):
+        self.dumped_at = time.perf_counter()
+        tmp_path = self.path.with_suffix(".tmp")
+        with open(tmp_path, "w") as f:
+            for stack, count in self.stacks.items():
+                f.write(f"{stack} {count}\n")
+        os.replace(tmp_path, self.path)
+
+    def stop(self):
+        signal.setitimer(signal.ITIMER_PROF, 0, 0)
+        signal.signal(signal.SIGPROF, signal.SIG_DFL)
+        signal.signal(signal.SIGTERM, self.sigterm_handler)
+        self.finalizer.cancel()
+        self.dump()
+
+
+_sampler: Optional[StackSampler] = None
+
+
+def start_sampling(name: str):
+    """Start the sampling profiler of the process, if it is enabled"""
+    global _sampler
+    # Forked processes inherit the sampler, but not its timer
+    if PROFILE_SAMPLING_INTERVAL > 0 and (
+        _sampler is None or _sampler.pid != os.getpid()
+    ):
+        _sampler = StackSampler(name, PROFILE_SAMPLING_INTERVAL).start()
+
+
+def stop_sampling():
+    global _sampler
+    if _sampler is not None and _sampler.pid == os.getpid():
+        _sampler.stop()
+        _sampler = None
@@ -1,18 +1,144 @@
+import asyncio
+import dataclasses
 import functools
+import json
+import math
 import time
 from multiprocessing import get_context
-from typing import Iterable, List, Optional, Tuple
+from multiprocessing.synchronize import Barrier
+from typing import Any, Callable, Dict, Iterable, List, NamedTuple, Optional, Tuple
 
 import numpy as np
 import tqdm
 
 from dataset_reader.base_reader import Query
+from engine.base_client.errors import IncompatibilityError
+from engine.base_client.histogram import LatencyHistogram, summarize
+from engine.base_client.metrics import compute_metrics, pad_rows, result_ids
+from engine.base_client.parser import BaseConditionParser
+from engine.base_client.profiling import (
+    PROFILE_CLIENT,
+    ClientProfile,
+    PhaseTimer,
+    start_sampling,
+    stop_sampling,
+)
+from engine.base_client.selectivity import (
+    SELECTIVITY_BUCKETS,
+    selectivity_buckets,
+    selectivity_report,
+)
+from engine.base_client.shared import SharedMatrix
+from engine.base_client.timeline import Timeline
+from engine.base_client.utils import iter_arrival_offsets
+from engine.base_client.warmup import WarmUp, merge_warmup_stats
 
 DEFAULT_TOP = 10
+# Seconds to wait for the worker processes to initialize their clients
+WORKER_START_TIMEOUT = 300
+# Errors which would fail every query, they stop the search instead of being
+# counted as failed queries
+FATAL_SEARCH_ERRORS = (IncompatibilityError, NotImplementedError)
+
+
+class SearchTask(NamedTuple):
+    # Position of the query, as the results may be collected out of order
+    index: int
+    query: Query
+    # Engine request built by `prepare_query` outside of the timed region
+    prepared: Any = None
+    # Absolute send time (as of time.perf_counter) in the open-loop mode
+    scheduled_at: Optional[float] = None
+
+
+class SearchResult(NamedTuple):
+    index: int
+    # Returned ids padded with -1 to the requested top
+    ids: np.ndarray
+    latency: float
+    queue_delay: float
+    service_time: float
+    # Scheduled time in the open-loop mode, send time otherwise
+    started_at: float
+    error: bool = False
+    # Phases of the call, with PROFILE_CLIENT enabled
+    profile: Optional[dict] = None
+
+
+class SearchRecorder:
+    """Collects the results of the search tasks as they are completed"""
+
+    def __init__(self, origin: float, buckets: Optional[np.ndarray] = None):
+        self.ids: Dict[int, np.ndarray] = {}
+        self.histograms = self._new_histograms()
+        self.timeline = Timeline(origin)
+        self.errors = 0
+        self.profile = ClientProfile()
+        # Selectivity bucket of every query, the histograms and the errors are
+        # also recorded per bucket if given
+        self.buckets = buckets
+        self.bucket_histograms: Dict[int, Dict[str, LatencyHistogram]] = {}
+        self.bucket_errors: Dict[int, int] = {}
+
+    @staticmethod
+    def _new_histograms() -> Dict[str, LatencyHistogram]:
+        return {
+            "time": LatencyHistogram(),
+            "queue_time": LatencyHistogram(),
+            "service_time": LatencyHistogram(),
+        }
+
+    @staticmethod
+    def _record_histograms(
+        histograms: Dict[str, LatencyHistogram], result: SearchResult
+    ):
+        histograms["time"].record(result.latency)
+        histograms["queue_time"].record(result.queue_delay)
+        histograms["service_time"].record(result.service_time)
+
+    def record(self, result: SearchResult):
+        self.ids[result.index] = result.ids
+        self._record_histograms(self.histograms, result)
+        self.timeline.record(
+            result.started_at, result.started_at + result.latency, result.error
+        )
+        self.errors += int(result.error)
+        self.profile.record(result.profile, result.service_time)
+        if self.buckets is not None:
+            bucket = int(self.buckets[result.index])
+            if bucket not in self.bucket_histograms:
+                self.bucket_histograms[bucket] = self._new_histograms()
+            self._record_histograms(self.bucket_histograms[bucket], result)
+            self.bucket_errors[bucket] = self.bucket_errors.get(bucket, 0) + int(
+                result.error
+            )
+
+    def merge(self, other: "SearchRecorder") -> "SearchRecorder":
+        self.ids.update(other.ids)
+        for name, histogram in other.histograms.items():
+            self.histograms[name].merge(histogram)
+        for bucket, histograms in other.bucket_histograms.items():
+            merged = self.bucket_histograms.setdefault(bucket, self._new_histograms())
+            for name, histogram in histograms.items():
+                merged[name].merge(histogram)
+            self.bucket_errors[bucket] = (
+                self.bucket_errors.get(bucket, 0) + other.bucket_errors[bucket]
+            )
+        self.timeline.merge(other.timeline)
+        self.errors += other.errors
+        self.profile.workers.update(other.profile.workers)
+        return self
 
 
 class BaseSearcher:
     MP_CONTEXT = None
+    _error_reported = False
+    # Query vectors shared with the worker processes, see `_share_queries`
+    shared_queries: Optional[SharedMatrix] = None
+    # Searchers implementing `prepare_query` and `search_prepared`
+    PREPARED_QUERY_SUPPORT: bool = False
+    # Translates the conditions of the queries into the engine filters
+    parser: Optional[BaseConditionParser] = None
 
     def __init__(self, host, connection_params, search_params):
         self.host = host
@@ -34,30 +160,420 @@ class BaseSearcher:
         raise NotImplementedError()
 
     @classmethod
-    def _search_one(cls, query: Query, top: Optional[int] = None):
-        if top is None:
-            top = (
-                len(query.expected_result)
-                if query.expected_result is not None and len(query.expected_result) > 0
-                else DEFAULT_TOP
-            )
+    async def async_init_client(
+        cls, host: str, distance, connection_params: dict, search_params: dict
+    ):
+        """
+        Initialize the asyncio client of the engine. It is called inside the
+        event loop of every process running in the async mode.
+        """
+        raise NotImplementedError(f"{cls.__name__} does not support async search")
+
+    @classmethod
+    async def async_search_one(
+        cls, query: Query, top: Optional[int]
+    ) -> List[Tuple[int, float]]:
+        raise NotImplementedError()
+
+    @classmethod
+    async def async_delete_client(cls):
+        pass
+
+    @classmethod
+    def _get_top(cls, query: Query, top: Optional[int]) -> int:
+        if top is not None:
+            return top
+        return (
+            len(query.expected_result)
+            if query.expected_result is not None and len(query.expected_result) > 0
+            else DEFAULT_TOP
+        )
+
+    @classmethod
+    def prepare_query(cls, query: Query, top: int) -> Any:
+        """
+        Build the engine request for the query, so it does not have to be
+        serialized inside the timed region. Only called if the searcher sets
+        `PREPARED_QUERY_SUPPORT`; the result is passed to `search_prepared`.
+        It has to be picklable and must not depend on the search config other
+        than `config`, as it is reused by the searchers with the same one.
+        """
+        raise NotImplementedError()
+
+    @classmethod
+    def search_prepared(cls, prepared: Any, top: int) -> List[Tuple[int, float]]:
+        raise NotImplementedError()
+
+    @classmethod
+    async def async_search_prepared(
+        cls, prepared: Any, top: int
+    ) -> List[Tuple[int, float]]:
+        raise NotImplementedError()
+
+    @classmethod
+    def _report_error(cls, ex: Exception):
+        # Failed queries are counted, but only the first error is printed
+        if not cls._error_reported:
+            print(f"Search failed: {ex!r}")
+            cls._error_reported = True
+
+    @classmethod
+    def _search_one(
+        cls,
+        query: Query,
+        top: Optional[int] = None,
+        prepared=None,
+        timer: Optional[PhaseTimer] = None,
+    ):
+        top = cls._get_top(query, top)
+
+        start = time.perf_counter()
+        try:
+            if prepared is None and timer is not None and cls.PREPARED_QUERY_SUPPORT:
+                # Measure building the request separately from sending it
+                prepared = cls.prepare_query(query, top)
+                timer.lap("prepare")
+            if prepared is None:
+                search_res = cls.search_one(query, top)
+            else:
+                search_res = cls.search_prepared(prepared, top)
+            error = False
+        except FATAL_SEARCH_ERRORS:
+            raise
+        except Exception as ex:
+            cls._report_error(ex)
+            search_res, error = [], True
+        end = time.perf_counter()
+
+        if timer is None:
+            return result_ids(search_res, top), start, end - start, error
+        timer.lap("engine_call")
+        ids = result_ids(search_res, top)
+        timer.lap("results")
+        return ids, start, end - start, error
+
+    @classmethod
+    async def _async_search_one(
+        cls, query: Query, top: Optional[int] = None, prepared=None
+    ):
+        top = cls._get_top(query, top)
 
         start = time.perf_counter()
-        search_res = cls.search_one(query, top)
+        try:
+            if prepared is None:
+                search_res = await cls.async_search_one(query, top)
+            else:
+                search_res = await cls.async_search_prepared(prepared, top)
+            error = False
+        except FATAL_SEARCH_ERRORS:
+            raise
+        except Exception as ex:
+            cls._report_error(ex)
+            search_res, error = [], True
         end = time.perf_counter()
 
-        precision = 1.0
-        if query.expected_result:
-            ids = set(x[0] for x in search_res)
-            precision = len(ids.intersection(query.expected_result[:top])) / top
+        return result_ids(search_res, top), start, end - start, error
+
+    @classmethod
+    def _init_worker(
+        cls,
+        started: Barrier,
+        shared_queries: Optional[SharedMatrix],
+        *init_args,
+    ):
+        cls.init_client(*init_args)
+        cls.shared_queries = shared_queries
+        start_sampling("search")
+        started.wait(timeout=WORKER_START_TIMEOUT)
+
+    def _share_queries(
+        self, tasks: List[SearchTask]
+    ) -> Tuple[List[SearchTask], Optional[SharedMatrix]]:
+        """
+        Move the query vectors into shared memory, so the tasks sent to the
+        workers only carry the index of the query. Prepared requests already
+        contain the vectors, and sparse queries are sent as they are.
+        """
+        if len(tasks) == 0 or any(
+            task.prepared is not None or task.query.vector is None for task in tasks
+        ):
+            return tasks, None
+
+        shared_queries = SharedMatrix.share(
+            np.stack([task.query.vector for task in tasks])
+        )
+        tasks = [
+            task._replace(query=dataclasses.replace(task.query, vector=None))
+            for task in tasks
+        ]
+        return tasks, shared_queries
+
+    @classmethod
+    def _search_task(cls, task: SearchTask, top: Optional[int] = None) -> SearchResult:
+        """
+        In the open-loop mode the query is sent at its scheduled time (or as
+        soon as a worker is free, if it is already late), and the latency is
+        measured from the scheduled time, so the time spent waiting for a free
+        worker is not hidden (coordinated omission).
+        """
+        if cls.shared_queries is not None and task.query.vector is None:
+            vector = cls.shared_queries.array()[task.index]
+            task = task._replace(query=dataclasses.replace(task.query, vector=vector))
+
+        queue_delay = 0.0
+        if task.scheduled_at is not None:
+            delay = task.scheduled_at - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            queue_delay = max(time.perf_counter() - task.scheduled_at, 0.0)
+
+        timer = None
+        if PROFILE_CLIENT:
+            timer = PhaseTimer()
+            timer.ipc(task)
+        ids, sent_at, service_time, error = cls._search_one(
+            task.query, top, task.prepared, timer
+        )
+        if timer is not None:
+            timer.ipc(ids)
+        return SearchResult(
+            index=task.index,
+            ids=ids,
+            latency=queue_delay + service_time,
+            queue_delay=queue_delay,
+            service_time=service_time,
+            started_at=sent_at - queue_delay,
+            error=error,
+            profile=timer.to_dict() if timer is not None else None,
+        )
 
-        return precision, end - start
+    @classmethod
+    async def _async_search_task(
+        cls, task: SearchTask, top: Optional[int] = None
+    ) -> SearchResult:
+        queue_delay = 0.0
+        if task.scheduled_at is not None:
+            delay = task.scheduled_at - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            queue_delay = max(time.perf_counter() - task.scheduled_at, 0.0)
+
+        ids, sent_at, service_time, error = await cls._async_search_one(
+            task.query, top, task.prepared
+        )
+        return SearchResult(
+            index=task.index,
+            ids=ids,
+            latency=queue_delay + service_time,
+            queue_delay=queue_delay,
+            service_time=service_time,
+            started_at=sent_at - queue_delay,
+            error=error,
+        )
+
+    @classmethod
+    def _schedule(
+        cls, tasks: Iterable[SearchTask], rps: Optional[float], arrival: str
+    ) -> Iterable[SearchTask]:
+        if rps is None:
+            return tasks
+        # perf_counter is system-wide monotonic, so the absolute send times
+        # are valid in the worker processes as well
+        scheduled_start = time.perf_counter()
+        return (
+            task._replace(scheduled_at=scheduled_start + offset)
+            for task, offset in zip(tasks, iter_arrival_offsets(rps, arrival))
+        )
+
+    @classmethod
+    async def _async_search_shard(
+        cls,
+        tasks: List[SearchTask],
+        host: str,
+        distance,
+        connection_params: dict,
+        search_params: dict,
+        rps: Optional[float],
+        origin: float,
+        buckets: Optional[np.ndarray] = None,
+    ):
+        top = search_params.get("top", None)
+        concurrency = search_params.get("concurrency", 1)
+        arrival = search_params.get("arrival", "poisson")
+
+        await cls.async_init_client(host, distance, connection_params, search_params)
+
+        warmup = WarmUp(tasks, search_params, workers=concurrency)
+        while True:
+            warmup_tasks = warmup.next_round()
+            if warmup_tasks is None:
+                break
+            warmup_start = time.perf_counter()
+            await cls._async_run_tasks(warmup_tasks, top, concurrency)
+            warmup.finish_round(len(warmup_tasks), time.perf_counter() - warmup_start)
+
+        start = time.perf_counter()
+        scheduled_tasks = iter(cls._schedule(tasks, rps, arrival))
+        recorder = SearchRecorder(origin, buckets)
+
+        async def worker():
+            # All the coroutines share the same iterator, so each query is
+            # sent exactly once and at most `concurrency` are in flight
+            for task in scheduled_tasks:
+                recorder.record(await cls._async_search_task(task, top))
+
+        try:
+            await asyncio.gather(*(worker() for _ in range(concurrency)))
+        finally:
+            end = time.perf_counter()
+            await cls.async_delete_client()
+
+        return recorder, warmup.stats(), start, end
+
+    @classmethod
+    async def _async_run_tasks(cls, tasks: List[SearchTask], top, concurrency: int):
+        """Run the tasks with the results discarded"""
+        remaining = iter(tasks)
+
+        async def worker():
+            for task in remaining:
+                await cls._async_search_task(task, top)
+
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+
+    @classmethod
+    def _run_async_shard(cls, tasks: List[SearchTask], **kwargs):
+        # Phases of the coroutines are interleaved, only the sampling
+        # profiler is available in the async mode
+        start_sampling("search")
+        return asyncio.run(cls._async_search_shard(tasks, **kwargs))
+
+    def _search_all_async(
+        self,
+        distance,
+        tasks: Iterable[SearchTask],
+        origin: float,
+        buckets: Optional[np.ndarray] = None,
+    ) -> Tuple[SearchRecorder, Optional[dict], float]:
+        """
+        Run the queries with `concurrency` coroutines in each of the `parallel`
+        processes. Queries are split into one shard per process upfront, so
+        they are not sent one by one through the pool.
+        """
+        parallel = self.search_params.get("parallel", 1)
+        target_rps = self.search_params.get("rps", None)
+        shard_rps = None if target_rps is None else target_rps / parallel
+        warmup_queries = self.search_params.get("warmup_queries", 0)
+
+        tasks = list(tasks)
+        shards = [tasks[i::parallel] for i in range(parallel)]
+        run_shard = functools.partial(
+            self.__class__._run_async_shard,
+            host=self.host,
+            distance=distance,
+            connection_params=self.connection_params,
+            search_params={
+                **self.search_params,
+                "warmup_queries": math.ceil(warmup_queries / parallel),
+            },
+            rps=shard_rps,
+            origin=origin,
+            buckets=buckets,
+        )
+
+        if parallel == 1:
+            shard_results = [run_shard(shards[0])]
+        else:
+            ctx = get_context(self.get_mp_start_method())
+            with ctx.Pool(processes=parallel) as pool:
+                shard_results = pool.map(run_shard, shards)
+
+        recorder = SearchRecorder(origin, buckets)
+        for shard_recorder, _, _, _ in shard_results:
+            recorder.merge(shard_recorder)
+        warmup = merge_warmup_stats(
+            [shard_warmup for _, shard_warmup, _, _ in shard_results]
+        )
+        start = min(shard_start for _, _, shard_start, _ in shard_results)
+        end = max(shard_end for _, _, _, shard_end in shard_results)
+        return recorder, warmup, end - start
+
+    def _prepare_tasks(
+        self, queries: Iterable[Query], prepared_cache: Optional[dict]
+    ) -> Tuple[Iterable[SearchTask], float]:
+        """
+        Pair the queries with the engine requests built upfront. Requests are
+        cached per `top` and search config, so the searchers of the same
+        experiment reuse them.
+        """
+        if not self.PREPARED_QUERY_SUPPORT or not self.search_params.get(
+            "prepare_queries", True
+        ):
+            tasks = (SearchTask(index, query) for index, query in enumerate(queries))
+            return tasks, 0.0
+
+        start = time.perf_counter()
+        top = self.search_params.get("top", None)
+        queries = list(queries)
+        cache_key = (
+            top,
+            json.dumps(self.search_params.get("config", {}), sort_keys=True),
+        )
+        prepared = None if prepared_cache is None else prepared_cache.get(cache_key)
+        if prepared is None:
+            prepared = [
+                self.prepare_query(query, self._get_top(query, top))
+                for query in tqdm.tqdm(queries, desc="Preparing queries")
+            ]
+            if prepared_cache is not None:
+                prepared_cache.clear()
+                prepared_cache[cache_key] = prepared
+
+        tasks = [
+            SearchTask(index, query, request)
+            for index, (query, request) in enumerate(zip(queries, prepared))
+        ]
+        return tasks, time.perf_counter() - start
+
+    def _translation_stats(self) -> Optional[dict]:
+        """
+        Filters translated by this process: while preparing the queries, or
+        during the search if it is not parallel
+        """
+        if self.parser is None:
+            return None
+        return self.parser.translation_stats()
+
+    @staticmethod
+    def _run_warmup(warmup: WarmUp, run_tasks: Callable[[List[SearchTask]], Any]):
+        while True:
+            warmup_tasks = warmup.next_round()
+            if warmup_tasks is None:
+                break
+            start = time.perf_counter()
+            run_tasks(warmup_tasks)
+            warmup.finish_round(len(warmup_tasks), time.perf_counter() - start)
+
+    @staticmethod
+    def _collect_ground_truth(
+        queries: Iterable[Query], ground_truth: list
+    ) -> Iterable[Query]:
+        for query in queries:
+            ground_truth.append((query.expected_result, query.expected_scores))
+            yield query
 
     def search_all(
         self,
         distance,
         queries: Iterable[Query],
+        prepared_cache: Optional[dict] = None,
+        selectivity: Optional[np.ndarray] = None,
     ):
+        """
+        Run the queries and report the latency, throughput and precision.
+        Given the fraction of the records matching the conditions of every
+        query, they are also reported by the buckets of the selectivity.
+        """
         parallel = self.search_params.get("parallel", 1)
         top = self.search_params.get("top", None)
 
@@ -67,50 +583,165 @@ class BaseSearcher:
         )
         self.setup_search()
 
-        search_one = functools.partial(self.__class__._search_one, top=top)
+        # Ground truth stays in this process, workers only return the ids
+        ground_truth = []
+        queries = self._collect_ground_truth(queries, ground_truth)
+        translation = self._translation_stats()
+        query_buckets = None
+        if selectivity is not None:
+            query_buckets = selectivity_buckets(
+                selectivity,
+                self.search_params.get("selectivity_buckets", SELECTIVITY_BUCKETS),
+            )
+        tasks, prepare_time = self._prepare_tasks(queries, prepared_cache)
 
-        if parallel == 1:
-            start = time.perf_counter()
-            precisions, latencies = list(
-                zip(*[search_one(query) for query in tqdm.tqdm(queries)])
+        # Open-loop mode is enabled by setting the target arrival rate
+        target_rps = self.search_params.get("rps", None)
+        arrival = self.search_params.get("arrival", "poisson")
+        search_task = functools.partial(self.__class__._search_task, top=top)
+
+        shared_queries = None
+        if (
+            self.search_params.get("shared_vectors", False)
+            and parallel > 1
+            and self.search_params.get("concurrency") is None
+        ):
+            tasks, shared_queries = self._share_queries(list(tasks))
+
+        if WarmUp.is_enabled(self.search_params):
+            # Warm-up reuses the queries, so they have to be kept
+            tasks = list(tasks)
+        warmup = WarmUp(tasks, self.search_params, workers=parallel)
+
+        if self.search_params.get("concurrency") is not None:
+            recorder, warmup_stats, total_time = self._search_all_async(
+                distance,
+                tqdm.tqdm(tasks),
+                origin=time.perf_counter(),
+                buckets=query_buckets,
             )
+        elif parallel == 1:
+            self._run_warmup(
+                warmup, lambda warmup_tasks: list(map(search_task, warmup_tasks))
+            )
+            warmup_stats = warmup.stats()
+            start_sampling("search")
+            start = time.perf_counter()
+            recorder = SearchRecorder(origin=start, buckets=query_buckets)
+            for task in self._schedule(tqdm.tqdm(tasks), target_rps, arrival):
+                recorder.record(search_task(task))
+            total_time = time.perf_counter() - start
         else:
             ctx = get_context(self.get_mp_start_method())
+            started = ctx.Barrier(parallel + 1)
 
             with ctx.Pool(
                 processes=parallel,
-                initializer=self.__class__.init_client,
+                initializer=self.__class__._init_worker,
                 initargs=(
+                    started,
+                    shared_queries,
                     self.host,
                     distance,
                     self.connection_params,
                     self.search_params,
                 ),
             ) as pool:
-                if parallel > 10:
-                    time.sleep(15)  # Wait for all processes to start
-                start = time.perf_counter()
-                precisions, latencies = list(
-                    zip(*pool.imap_unordered(search_one, iterable=tqdm.tqdm(queries)))
+                # Wait for all the processes to initialize their clients
+                started.wait(timeout=WORKER_START_TIMEOUT)
+                self._run_warmup(
+                    warmup,
+                    lambda warmup_tasks: list(
+                        pool.imap_unordered(search_task, warmup_tasks)
+                    ),
                 )
+                warmup_stats = warmup.stats()
+                start = time.perf_counter()
+                recorder = SearchRecorder(origin=start, buckets=query_buckets)
+                for result in pool.imap_unordered(
+                    search_task,
+                    iterable=self._schedule(tqdm.tqdm(tasks), target_rps, arrival),
+                ):
+                    recorder.record(result)
+                total_time = time.perf_counter() - start
 
-        total_time = time.perf_counter() - start
-
+        stop_sampling()
+        if shared_queries is not None:
+            shared_queries.release()
         self.__class__.delete_client()
 
-        return {
+        if recorder.errors > 0 and recorder.errors == len(recorder.ids):
+            raise RuntimeError(
+                f"All {recorder.errors} queries failed, see the first error above"
+            )
+        if recorder.errors > 0:
+            print(f"{recorder.errors} of {len(recorder.ids)} queries failed")
+
+        ids = [recorder.ids[index] for index in range(len(recorder.ids))]
+        expected_ids, expected_scores = zip(*ground_truth)
+        metrics = compute_metrics(
+            ids=pad_rows(ids, np.int64, -1),
+            tops=np.array([len(row) for row in ids]),
+            expected_ids=pad_rows(expected_ids, np.int64, -1),
+            expected_scores=(
+                pad_rows(expected_scores, np.float64, np.nan)
+                if any(scores is not None for scores in expected_scores)
+                else None
+            ),
+        )
+        precisions = metrics.pop("precisions").tolist()
+
+        histograms = recorder.histograms
+        latency = histograms["time"]
+        stats = {
             "total_time": total_time,
-            "mean_time": np.mean(latencies),
+            "prepare_time": prepare_time,
             "mean_precisions": np.mean(precisions),
-            "std_time": np.std(latencies),
-            "min_time": np.min(latencies),
-            "max_time": np.max(latencies),
-            "rps": len(latencies) / total_time,
-            "p95_time": np.percentile(latencies, 95),
-            "p99_time": np.percentile(latencies, 99),
+            **metrics,
+            **summarize(latency),
+            "std_time": latency.std,
+            "min_time": latency.min,
+            "max_time": latency.max,
+            "rps": latency.count / total_time,
+            "errors": recorder.errors,
+            "warmup": warmup_stats,
             "precisions": precisions,
-            "latencies": latencies,
+            "latency_histogram": latency.to_dict(),
+            "timeline": recorder.timeline.to_list(),
         }
+        if query_buckets is not None:
+            stats["selectivity_buckets"] = selectivity_report(
+                selectivity,
+                query_buckets,
+                recorder.bucket_histograms,
+                recorder.bucket_errors,
+                precisions=np.array(precisions),
+                workers=parallel * self.search_params.get("concurrency", 1),
+                buckets=self.search_params.get(
+                    "selectivity_buckets", SELECTIVITY_BUCKETS
+                ),
+                open_loop=target_rps is not None,
+            )
+        if translation is not None:
+            stats["filter_translation"] = {
+                key: value - translation[key]
+                for key, value in self._translation_stats().items()
+            }
+        if PROFILE_CLIENT:
+            # Client time next to the latency, per worker process
+            stats["client_profile"] = recorder.profile.to_dict()
+        if target_rps is not None:
+            stats.update(
+                {
+                    "target_rps": target_rps,
+                    "arrival": arrival,
+                    **summarize(histograms["queue_time"], "queue_time"),
+                    **summarize(histograms["service_time"], "service_time"),
+                    "queue_time_histogram": histograms["queue_time"].to_dict(),
+                    "service_time_histogram": histograms["service_time"].to_dict(),
+                }
+            )
+        return stats
 
     def setup_search(self):
         pass
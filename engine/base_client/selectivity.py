@@ -0,0 +1,226 @@
+import json
+from typing import Any, Dict, Iterator, List, Optional, Sequence
+
+import numpy as np
+
+from dataset_reader.base_reader import BaseReader
+from engine.base_client.histogram import LatencyHistogram, summarize
+from engine.base_client.parser import BaseConditionParser, FieldValue
+
+# Upper bounds of the buckets of the queries, by the fraction of the records
+# which match their conditions
+SELECTIVITY_BUCKETS = (0.001, 0.01, 0.1, 0.5, 1.0)
+
+EARTH_RADIUS = 6371000.0
+
+PayloadColumns = Dict[str, np.ndarray]
+
+
+def payload_column(values: List[Any]) -> np.ndarray:
+    """
+    Convert the values of a payload field into an array the filters can be
+    evaluated on: floats with NaN for missing numbers, (lon, lat) pairs for
+    geo points, objects for anything else
+    """
+    present = [value for value in values if value is not None]
+    if all(
+        isinstance(value, (int, float)) and not isinstance(value, bool)
+        for value in present
+    ):
+        return np.array(
+            [np.nan if value is None else value for value in values], dtype=np.float64
+        )
+    if all(isinstance(value, dict) and "lat" in value for value in present):
+        return np.array(
+            [
+                (np.nan, np.nan) if value is None else (value["lon"], value["lat"])
+                for value in values
+            ],
+            dtype=np.float64,
+        )
+    column = np.empty(len(values), dtype=object)
+    column[:] = values
+    return column
+
+
+class MaskConditionParser(BaseConditionParser):
+    """
+    Evaluates the conditions of a query on the payload columns of a range of
+    records, as a boolean mask of the records which match them
+    """
+
+    def __init__(self, columns: PayloadColumns, size: int):
+        super().__init__()
+        self.columns = columns
+        self.size = size
+
+    def _column(self, field_name: str) -> Optional[np.ndarray]:
+        return self.columns.get(field_name)
+
+    def build_condition(
+        self,
+        and_subfilters: Optional[List[np.ndarray]],
+        or_subfilters: Optional[List[np.ndarray]],
+    ) -> np.ndarray:
+        mask = np.ones(self.size, dtype=bool)
+        if and_subfilters:
+            mask &= np.logical_and.reduce(and_subfilters)
+        if or_subfilters:
+            mask &= np.logical_or.reduce(or_subfilters)
+        return mask
+
+    def build_exact_match_filter(
+        self, field_name: str, value: FieldValue
+    ) -> np.ndarray:
+        column = self._column(field_name)
+        if column is None:
+            return np.zeros(self.size, dtype=bool)
+        if column.dtype != object:
+            return column == value
+        # Arrays of values match if any of them does
+        match = np.frompyfunc(
+            lambda item: item == value or (isinstance(item, list) and value in item),
+            1,
+            1,
+        )
+        return match(column).astype(bool)
+
+    def build_range_filter(
+        self,
+        field_name: str,
+        lt: Optional[FieldValue],
+        gt: Optional[FieldValue],
+        lte: Optional[FieldValue],
+        gte: Optional[FieldValue],
+    ) -> np.ndarray:
+        column = self._column(field_name)
+        if column is None or column.dtype != np.float64 or column.ndim != 1:
+            return np.zeros(self.size, dtype=bool)
+        # Comparisons with NaN are false, so missing values never match
+        mask = ~np.isnan(column)
+        for bound, compare in ((lt, np.less), (gt, np.greater)):
+            if bound is not None:
+                mask &= compare(column, bound)
+        for bound, compare in ((lte, np.less_equal), (gte, np.greater_equal)):
+            if bound is not None:
+                mask &= compare(column, bound)
+        return mask
+
+    def build_geo_filter(
+        self, field_name: str, lat: float, lon: float, radius: float
+    ) -> np.ndarray:
+        column = self._column(field_name)
+        if column is None or column.ndim != 2:
+            return np.zeros(self.size, dtype=bool)
+        # Haversine distance in meters
+        lon1, lat1 = np.radians(column[:, 0]), np.radians(column[:, 1])
+        lon2, lat2 = np.radians(lon), np.radians(lat)
+        a = (
+            np.sin((lat2 - lat1) / 2) ** 2
+            + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+        )
+        distance = 2 * EARTH_RADIUS * np.arcsin(np.sqrt(np.clip(a, 0.0, 1.0)))
+        return distance <= radius
+
+
+def condition_fields(meta_conditions: Optional[dict]) -> Iterator[str]:
+    for entries in (meta_conditions or {}).values():
+        for entry in entries or []:
+            yield from entry
+
+
+def read_payload_columns(reader: BaseReader, fields: List[str]) -> PayloadColumns:
+    """Columns of the payload fields the query conditions refer to"""
+    values: Dict[str, list] = {field: [] for field in fields}
+    for batch in reader.read_data_batches(65536):
+        metadata = batch.metadata or {}
+        for field in fields:
+            values[field].extend(metadata.get(field) or [None] * len(batch))
+    return {field: payload_column(column) for field, column in values.items()}
+
+
+def compute_selectivity(reader: BaseReader) -> np.ndarray:
+    """
+    Fraction of the records matching the conditions of every query, NaN for
+    the queries without conditions
+    """
+    conditions = [query.meta_conditions for query in reader.read_queries()]
+    selectivity = np.full(len(conditions), np.nan)
+    fields = sorted(
+        set(field for condition in conditions for field in condition_fields(condition))
+    )
+    if not fields:
+        return selectivity
+
+    columns = read_payload_columns(reader, fields)
+    size = len(columns[fields[0]])
+    matched: Dict[str, float] = {}
+    for i, condition in enumerate(conditions):
+        if not condition:
+            continue
+        key = json.dumps(condition, sort_keys=True)
+        if key not in matched:
+            # A parser per condition, so the masks are not all kept in memory
+            mask = MaskConditionParser(columns, size).parse(condition)
+            matched[key] = mask.sum() / max(size, 1)
+        selectivity[i] = matched[key]
+    return selectivity
+
+
+def selectivity_buckets(
+    selectivity: np.ndarray, buckets: Sequence[float] = SELECTIVITY_BUCKETS
+) -> np.ndarray:
+    """Bucket of every query, -1 for the queries without conditions"""
+    unfiltered = np.isnan(selectivity)
+    positions = np.searchsorted(buckets, np.where(unfiltered, 0.0, selectivity))
+    return np.where(unfiltered, -1, np.minimum(positions, len(buckets) - 1))
+
+
+def selectivity_report(
+    selectivity: np.ndarray,
+    positions: np.ndarray,
+    histograms: Dict[int, Dict[str, LatencyHistogram]],
+    errors: Dict[int, int],
+    precisions: np.ndarray,
+    workers: int,
+    buckets: Sequence[float] = SELECTIVITY_BUCKETS,
+    open_loop: bool = False,
+) -> List[dict]:
+    """
+    Latency, throughput and precision of the queries of every bucket, the
+    queries without conditions are reported with no bounds. Queries of the
+    buckets are mixed within the run, so their `rps` is estimated from the
+    service time, as if `workers` were sending only them.
+    """
+    report = []
+    for position in sorted(histograms):
+        rows = positions == position
+        bucket = histograms[position]
+        service_time = bucket["service_time"]
+        stats = dict.fromkeys(
+            ["min_selectivity", "max_selectivity", "mean_selectivity"]
+        )
+        if position >= 0:
+            stats = {
+                "min_selectivity": buckets[position - 1] if position > 0 else 0.0,
+                "max_selectivity": buckets[position],
+                "mean_selectivity": float(selectivity[rows].mean()),
+            }
+        stats.update(
+            {
+                "queries": bucket["time"].count,
+                "errors": errors.get(position, 0),
+                "mean_precisions": float(precisions[rows].mean()),
+                **summarize(bucket["time"]),
+                "rps": workers * service_time.count / max(service_time.total, 1e-9),
+            }
+        )
+        if open_loop:
+            stats.update(
+                {
+                    **summarize(bucket["queue_time"], "queue_time"),
+                    **summarize(service_time, "service_time"),
+                }
+            )
+        report.append(stats)
+    return report
@@ -0,0 +1,112 @@
+from multiprocessing import shared_memory
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+
+# Matrices already attached by the current process
+_attached: Dict[Tuple, Tuple[np.ndarray, Optional[shared_memory.SharedMemory]]] = {}
+
+
+class SharedMatrix:
+    """
+    Matrix shared with the worker processes without copying it through the
+    pipes: either a memory-mapped file, or a block of shared memory. Only its
+    location is pickled, workers attach to it on the first use.
+    """
+
+    def __init__(
+        self,
+        shape: Tuple[int, ...],
+        dtype: str,
+        path: Optional[str] = None,
+        offset: int = 0,
+        shm_name: Optional[str] = None,
+    ):
+        self.shape = tuple(shape)
+        self.dtype = dtype
+        self.path = path
+        self.offset = offset
+        self.shm_name = shm_name
+        self._shm: Optional[shared_memory.SharedMemory] = None
+
+    @classmethod
+    def share(cls, array: np.ndarray) -> "SharedMatrix":
+        """
+        Memory-mapped arrays are shared by their file, the other ones are
+        copied into shared memory once.
+        """
+        if (
+            isinstance(array, np.memmap)
+            and array.filename is not None
+            and array.flags.c_contiguous
+        ):
+            return cls(array.shape, array.dtype.str, array.filename, array.offset)
+
+        shm = shared_memory.SharedMemory(create=True, size=max(array.nbytes, 1))
+        matrix = cls(array.shape, array.dtype.str, shm_name=shm.name)
+        matrix._shm = shm
+        np.ndarray(array.shape, dtype=array.dtype, buffer=shm.buf)[:] = array
+        return matrix
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state["_shm"] = None
+        return state
+
+    @property
+    def _key(self) -> Tuple:
+        return self.path, self.offset, self.shm_name, self.shape, self.dtype
+
+    def array(self) -> np.ndarray:
+        attached = _attached.get(self._key)
+        if attached is not None:
+            return attached[0]
+
+        shm = None
+        if self.path is not None:
+            array = np.memmap(
+                self.path,
+                dtype=self.dtype,
+                mode="r",
+                offset=self.offset,
+                shape=self.shape,
+            )
+        else:
+            # Workers share the resource tracker of the parent, which unlinks
+            # the block in `release`
+            shm = self._shm or shared_memory.SharedMemory(name=self.shm_name)
+            array = np.ndarray(self.shape, dtype=self.dtype, buffer=shm.buf)
+        _attached[self._key] = (array, shm)
+        return array
+
+    def rows(self, start: int, end: int) -> "MatrixRows":
+        return MatrixRows(self, start, end)
+
+    def release(self):
+        """Free the shared memory, called by the process which shared it"""
+        _attached.pop(self._key, None)
+        if self._shm is not None:
+            try:
+                self._shm.close()
+            except BufferError:
+                # Views of the block are still alive, it is freed with them
+                pass
+            self._shm.unlink()
+            self._shm = None
+
+
+class MatrixRows:
+    """Reference to a range of rows of a shared matrix, sent instead of them"""
+
+    def __init__(self, matrix: SharedMatrix, start: int, end: int):
+        self.matrix = matrix
+        self.start = start
+        self.end = end
+
+    def __len__(self):
+        return self.end - self.start
+
+    def resolve(self) -> np.ndarray:
+        """Float32 rows, a zero-copy view if they are stored as float32"""
+        rows = self.matrix.array()[self.start : self.end]
+        return rows.astype(np.float32, copy=False)
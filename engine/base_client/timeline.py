@@ -0,0 +1,104 @@
+import math
+import os
+from collections import Counter
+from typing import Dict, List, Optional
+
+from engine.base_client.histogram import (
+    UNITS_PER_SECOND,
+    bucket_index,
+    highest_equivalent_value,
+    to_units,
+)
+
+TIMELINE_WINDOW = float(os.getenv("TIMELINE_WINDOW", 1.0))
+
+
+class TimelineWindow:
+    """Requests finished within a single window of the timeline"""
+
+    __slots__ = ("started", "completed", "errors", "items", "buckets")
+
+    def __init__(self):
+        self.started = 0
+        self.completed = 0
+        self.errors = 0
+        # Records in the case of upload batches
+        self.items = 0
+        # Sparse latency histogram, as most of the buckets are empty
+        self.buckets = Counter()
+
+    def merge(self, other: "TimelineWindow"):
+        self.started += other.started
+        self.completed += other.completed
+        self.errors += other.errors
+        self.items += other.items
+        self.buckets.update(other.buckets)
+
+    def percentile(self, q: float) -> Optional[float]:
+        if not self.completed:
+            return None
+        rank = max(math.ceil(q / 100 * self.completed), 1)
+        seen = 0
+        for index in sorted(self.buckets):
+            seen += self.buckets[index]
+            if seen >= rank:
+                break
+        return highest_equivalent_value(index) / UNITS_PER_SECOND
+
+
+class Timeline:
+    """
+    Throughput and latency of a run in fixed windows (TIMELINE_WINDOW seconds
+    by default). Timestamps are absolute time.perf_counter values, which are
+    comparable between processes, and windows are counted from `origin`, so
+    timelines recorded by different processes can be merged.
+    """
+
+    def __init__(self, origin: float, window: float = TIMELINE_WINDOW):
+        self.origin = origin
+        self.window = window
+        self.windows: Dict[int, TimelineWindow] = {}
+
+    def _get_window(self, timestamp: float) -> TimelineWindow:
+        index = max(int((timestamp - self.origin) // self.window), 0)
+        window = self.windows.get(index)
+        if window is None:
+            window = self.windows[index] = TimelineWindow()
+        return window
+
+    def record(
+        self, started_at: float, finished_at: float, error: bool = False, items=1
+    ):
+        self._get_window(started_at).started += 1
+        window = self._get_window(finished_at)
+        window.completed += 1
+        window.errors += int(error)
+        window.items += items
+        window.buckets[bucket_index(to_units(finished_at - started_at))] += 1
+
+    def merge(self, other: "Timeline") -> "Timeline":
+        for index, window in other.windows.items():
+            self.windows.setdefault(index, TimelineWindow()).merge(window)
+        return self
+
+    def to_list(self) -> List[dict]:
+        """Windows in the order of time, including the empty ones"""
+        timeline = []
+        in_flight = 0
+        for index in range(max(self.windows, default=-1) + 1):
+            window = self.windows.get(index, TimelineWindow())
+            in_flight += window.started - window.completed
+            timeline.append(
+                {
+                    "time": index * self.window,
+                    "rps": window.items / self.window,
+                    "completed": window.completed,
+                    "errors": window.errors,
+                    "in_flight": in_flight,
+                    "p50_time": window.percentile(50),
+                    "p95_time": window.percentile(95),
+                    "p99_time": window.percentile(99),
+                    "max_time": window.percentile(100),
+                }
+            )
+        return timeline
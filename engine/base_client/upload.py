@@ -1,15 +1,45 @@
+import dataclasses
+import itertools
 import time
+from concurrent.futures import ThreadPoolExecutor
 from multiprocessing import get_context
-from typing import Iterable, List
+from typing import Iterable, Iterator, List, Optional, Tuple
 
 import tqdm
 
-from dataset_reader.base_reader import Record
+from dataset_reader.base_reader import BaseReader, Record, RecordBatch
+from dataset_reader.sparse_reader import CsrRows
+from engine.base_client.batching import (
+    BatchSizeController,
+    iter_adaptive_batches,
+    iter_adaptive_records,
+)
+from engine.base_client.checkpoint import UploadCheckpoint
+from engine.base_client.index_build import IndexBuild
+from engine.base_client.pipeline import UploadPipeline
+from engine.base_client.profiling import (
+    PROFILE_CLIENT,
+    ClientProfile,
+    PhaseTimer,
+    start_sampling,
+    stop_sampling,
+)
+from engine.base_client.shared import MatrixRows, SharedMatrix
+from engine.base_client.timeline import Timeline
 from engine.base_client.utils import iter_batches
+from engine.base_client.workers import ThreadedProcessPool
 
 
 class BaseUploader:
+    # Uploaders which implement `upload_record_batch` receive whole columnar
+    # batches instead of lists of records
+    COLUMNAR_BATCH_SUPPORT: bool = False
+    # Uploaders whose client can send batches from several threads at once,
+    # see `inflight_per_worker`
+    CONCURRENT_UPLOAD_SUPPORT: bool = False
     client = None
+    # Post-upload phase, reported by `post_upload`
+    index_build: Optional[IndexBuild] = None
 
     def __init__(self, host, connection_params, upload_params):
         self.host = host
@@ -24,13 +54,21 @@ class BaseUploader:
     def init_client(cls, host, distance, connection_params: dict, upload_params: dict):
         raise NotImplementedError()
 
+    @classmethod
+    def _init_worker(cls, *init_args):
+        cls.init_client(*init_args)
+        start_sampling("upload")
+
     def upload(
         self,
         distance,
-        records: Iterable[Record],
+        reader: BaseReader,
+        checkpoint: Optional[UploadCheckpoint] = None,
     ) -> dict:
         latencies = []
+        client_profile = ClientProfile()
         start = time.perf_counter()
+        timeline = Timeline(origin=start)
         parallel = self.upload_params.get("parallel", 1)
         batch_size = self.upload_params.get("batch_size", 64)
 
@@ -38,33 +76,161 @@ class BaseUploader:
             self.host, distance, self.connection_params, self.upload_params
         )
 
-        if parallel == 1:
-            for batch in iter_batches(tqdm.tqdm(records), batch_size):
-                latencies.append(self._upload_batch(batch))
+        offset = checkpoint.offset if checkpoint is not None else 0
+        if offset > 0:
+            print(f"Resuming upload from record {offset}")
+            records = itertools.chain.from_iterable(
+                batch.records()
+                for batch in reader.read_data_batches(batch_size, offset)
+            )
         else:
-            ctx = get_context(self.get_mp_start_method())
-            with ctx.Pool(
-                processes=int(parallel),
-                initializer=self.__class__.init_client,
-                initargs=(
-                    self.host,
-                    distance,
-                    self.connection_params,
-                    self.upload_params,
+            records = reader.read_data()
+
+        share = (
+            self.upload_params.get("shared_vectors", False)
+            and parallel > 1
+            and self.COLUMNAR_BATCH_SUPPORT
+        )
+        batch_sizes = BatchSizeController.from_params(self.upload_params)
+        shards = None
+        if self.COLUMNAR_BATCH_SUPPORT:
+            if share:
+                # Workers read the rows of the shards from the dataset file
+                shards = reader.read_data_shards(batch_size, offset)
+            batches = tqdm.tqdm(
+                (
+                    shards
+                    if shards is not None
+                    else reader.read_data_batches(batch_size, offset)
                 ),
-            ) as pool:
-                latencies = list(
-                    pool.imap(
-                        self.__class__._upload_batch,
-                        iter_batches(tqdm.tqdm(records), batch_size),
-                    )
+                unit="batch",
+            )
+            if batch_sizes is not None:
+                batches = iter_adaptive_batches(batches, batch_sizes)
+            upload_batch = self.__class__._upload_record_batch
+        elif batch_sizes is not None:
+            batches = iter_adaptive_records(tqdm.tqdm(records), batch_sizes)
+            upload_batch = self.__class__._upload_batch
+        else:
+            batches = iter_batches(tqdm.tqdm(records), batch_size)
+            upload_batch = self.__class__._upload_batch
+
+        shared_vectors = None
+        if share and shards is None:
+            matrix = reader.read_vectors_matrix()
+            if matrix is not None:
+                shared_vectors = SharedMatrix.share(matrix)
+                batches = self._share_vectors(batches, shared_vectors, offset)
+
+        def record(result):
+            size, started_at, latency, profile = result
+            latencies.append(latency)
+            client_profile.record(profile, latency)
+            timeline.record(started_at, started_at + latency, items=size)
+            if batch_sizes is not None:
+                batch_sizes.update(size, latency)
+
+        inflight_per_worker = self.upload_params.get("inflight_per_worker", 1)
+        if inflight_per_worker > 1 and not self.CONCURRENT_UPLOAD_SUPPORT:
+            print(
+                f"{self.__class__.__name__} does not support concurrent batches, "
+                "ignoring inflight_per_worker"
+            )
+            inflight_per_worker = 1
+
+        pipeline = UploadPipeline(
+            batches,
+            prefetch=self.upload_params.get("prefetch", 2 * parallel),
+            # One batch queued for every upload, while it sends the current one
+            max_in_flight=self.upload_params.get(
+                "max_in_flight", 2 * parallel * inflight_per_worker
+            ),
+            upload_workers=parallel * inflight_per_worker,
+        )
+
+        def run_pipeline(submit):
+            if checkpoint is not None:
+                submit = checkpoint.track(submit)
+            try:
+                pipeline.run(submit, record)
+            finally:
+                if checkpoint is not None:
+                    checkpoint.save()
+
+        start_sampling("upload")
+        if parallel == 1 and inflight_per_worker == 1:
+
+            def submit(batch, callback, error_callback):
+                try:
+                    result = upload_batch(batch)
+                except Exception as ex:
+                    error_callback(ex)
+                else:
+                    callback(result)
+
+            run_pipeline(submit)
+        elif parallel == 1:
+            with ThreadPoolExecutor(max_workers=inflight_per_worker) as executor:
+
+                def submit(batch, callback, error_callback):
+                    def done(future):
+                        if future.exception() is not None:
+                            error_callback(future.exception())
+                        else:
+                            callback(future.result())
+
+                    executor.submit(upload_batch, batch).add_done_callback(done)
+
+                run_pipeline(submit)
+        else:
+            ctx = get_context(self.get_mp_start_method())
+            initargs = (
+                self.host,
+                distance,
+                self.connection_params,
+                self.upload_params,
+            )
+            if inflight_per_worker > 1:
+                pool = ThreadedProcessPool(
+                    ctx,
+                    processes=parallel,
+                    threads=inflight_per_worker,
+                    function=upload_batch,
+                    initializer=self.__class__._init_worker,
+                    initargs=initargs,
+                )
+                submit = pool.submit
+            else:
+                pool = ctx.Pool(
+                    processes=parallel,
+                    initializer=self.__class__._init_worker,
+                    initargs=initargs,
                 )
 
+                def submit(batch, callback, error_callback):
+                    pool.apply_async(
+                        upload_batch,
+                        (batch,),
+                        callback=callback,
+                        error_callback=error_callback,
+                    )
+
+            with pool:
+                try:
+                    run_pipeline(submit)
+                finally:
+                    if shared_vectors is not None:
+                        shared_vectors.release()
+
         upload_time = time.perf_counter() - start
+        stop_sampling()
 
         print("Upload time: {}".format(upload_time))
 
+        index_build = IndexBuild()
+        self.__class__.index_build = index_build
         post_upload_stats = self.post_upload(distance)
+        index_build.finished()
 
         total_time = time.perf_counter() - start
 
@@ -74,25 +240,91 @@ class BaseUploader:
 
         return {
             "post_upload": post_upload_stats,
+            "index_build": index_build.to_dict(),
             "upload_time": upload_time,
             "total_time": total_time,
             "latencies": latencies,
+            "timeline": timeline.to_list(),
+            "pipeline": pipeline.stats(),
+            "batch_size": batch_sizes.stats() if batch_sizes is not None else None,
+            "resumed_from": offset if checkpoint is not None else None,
+            "client_profile": client_profile.to_dict(),
         }
 
     @classmethod
-    def _upload_batch(cls, batch: List[Record]) -> float:
+    def _upload_batch(
+        cls, batch: List[Record]
+    ) -> Tuple[int, float, float, Optional[dict]]:
+        timer = cls._start_timer(batch)
         start = time.perf_counter()
         cls.upload_batch(batch)
-        return time.perf_counter() - start
+        return len(batch), start, time.perf_counter() - start, cls._profile(timer)
+
+    @staticmethod
+    def _start_timer(batch) -> Optional[PhaseTimer]:
+        if not PROFILE_CLIENT:
+            return None
+        timer = PhaseTimer()
+        timer.ipc(batch)
+        return timer
+
+    @staticmethod
+    def _profile(timer: Optional[PhaseTimer]) -> Optional[dict]:
+        if timer is None:
+            return None
+        timer.lap("engine_call")
+        return timer.to_dict()
+
+    @staticmethod
+    def _share_vectors(
+        batches: Iterable[RecordBatch],
+        matrix: SharedMatrix,
+        start: int = 0,
+    ) -> Iterator[RecordBatch]:
+        """
+        Replace the vectors of the batches with references to the rows of the
+        shared matrix, so only the row ranges are sent to the workers
+        """
+        for batch in batches:
+            end = start + len(batch)
+            yield dataclasses.replace(batch, vectors=matrix.rows(start, end))
+            start = end
+
+    @classmethod
+    def _upload_record_batch(
+        cls, batch: RecordBatch
+    ) -> Tuple[int, float, float, Optional[dict]]:
+        timer = cls._start_timer(batch)
+        if isinstance(batch.vectors, MatrixRows):
+            batch = dataclasses.replace(batch, vectors=batch.vectors.resolve())
+        if isinstance(batch.sparse_vectors, CsrRows):
+            batch = dataclasses.replace(
+                batch, sparse_vectors=batch.sparse_vectors.resolve()
+            )
+        if timer is not None:
+            timer.lap("prepare")
+
+        start = time.perf_counter()
+        cls.upload_record_batch(batch)
+        return len(batch), start, time.perf_counter() - start, cls._profile(timer)
 
     @classmethod
     def post_upload(cls, distance):
+        """
+        Finish the upload, e.g. build the index, and wait until the collection
+        can be searched. Implementations report the build through
+        `cls.index_build` and poll the engine with `wait_until`.
+        """
         return {}
 
     @classmethod
     def upload_batch(cls, batch: List[Record]):
         raise NotImplementedError()
 
+    @classmethod
+    def upload_record_batch(cls, batch: RecordBatch):
+        raise NotImplementedError()
+
     @classmethod
     def delete_client(cls):
         pass
@@ -1,4 +1,5 @@
-from typing import Iterable, List
+import random
+from typing import Iterable, Iterator, List
 
 from dataset_reader.base_reader import Record
 
@@ -14,3 +15,26 @@ def iter_batches(records: Iterable[Record], n: int) -> Iterable[List[Record]]:
             batch = []
     if len(batch) > 0:
         yield batch
+
+
+def iter_arrival_offsets(rps: float, arrival: str = "poisson") -> Iterator[float]:
+    """
+    Yield send offsets (in seconds, relative to the start of the run) of an
+    open-loop load generator with the target arrival rate.
+
+    :param rps: target number of requests per second
+    :param arrival: "poisson" for exponentially distributed inter-arrival
+        times, "constant" for a fixed 1 / rps interval
+    """
+    if rps <= 0:
+        raise ValueError(f"Target rps has to be positive, got {rps}")
+    if arrival not in ("poisson", "constant"):
+        raise ValueError(f"Unknown arrival process: <{arrival}>")
+
+    offset = 0.0
+    while True:
+        yield offset
+        if arrival == "poisson":
+            offset += random.expovariate(rps)
+        else:
+            offset += 1.0 / rps
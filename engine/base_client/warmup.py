@@ -0,0 +1,129 @@
+import itertools
+import time
+from collections import deque
+from typing import List, Optional
+
+from engine.base_client.timeline import TIMELINE_WINDOW
+
+# Limit of the warm-up waiting for the steady state, unless
+# `steady_state_timeout` is set
+STEADY_STATE_TIMEOUT = 60.0
+# Number of consecutive windows with a stable throughput
+STEADY_STATE_WINDOWS = 3
+# Maximum relative deviation of the throughput of the windows from their mean
+STEADY_STATE_TOLERANCE = 0.05
+# Queries per worker in the first warm-up round
+FIRST_ROUND_QUERIES = 10
+
+
+class SteadyStateDetector:
+    """Throughput is stable if the last windows deviate little from their mean"""
+
+    def __init__(
+        self,
+        windows: int = STEADY_STATE_WINDOWS,
+        tolerance: float = STEADY_STATE_TOLERANCE,
+    ):
+        self.rates = deque(maxlen=windows)
+        self.tolerance = tolerance
+
+    def add(self, rate: float) -> bool:
+        self.rates.append(rate)
+        if len(self.rates) < self.rates.maxlen:
+            return False
+        mean = sum(self.rates) / len(self.rates)
+        return mean > 0 and all(
+            abs(rate - mean) <= self.tolerance * mean for rate in self.rates
+        )
+
+
+class WarmUp:
+    """
+    Yields rounds of warm-up queries, which are run the same way as the
+    measured ones, with the results discarded. Warm-up runs at least
+    `warmup_queries` queries for at least `warmup_time` seconds and, with
+    `steady_state` enabled, until the throughput of the rounds is stable
+    (or `steady_state_timeout` passes).
+
+    Rounds are sized to take about one timeline window, so the process
+    pool never gets more than a round ahead of the deadline.
+    """
+
+    def __init__(self, tasks: list, search_params: dict, workers: int):
+        # Queries are cycled if the warm-up needs more of them
+        self.tasks = itertools.cycle(tasks)
+        self.workers = workers
+        self.queries = search_params.get("warmup_queries", 0)
+        self.duration = search_params.get("warmup_time", 0.0)
+        self.detector = (
+            SteadyStateDetector() if search_params.get("steady_state") else None
+        )
+        self.timeout = search_params.get("steady_state_timeout", STEADY_STATE_TIMEOUT)
+        self.round_size = workers * FIRST_ROUND_QUERIES
+        self.sent = 0
+        self.steady = False
+        self.start = None
+        self.end = None
+
+    @staticmethod
+    def is_enabled(search_params: dict) -> bool:
+        return (
+            search_params.get("warmup_queries", 0) > 0
+            or search_params.get("warmup_time", 0.0) > 0
+            or bool(search_params.get("steady_state"))
+        )
+
+    @property
+    def enabled(self) -> bool:
+        return self.queries > 0 or self.duration > 0 or self.detector is not None
+
+    def _is_done(self, elapsed: float) -> bool:
+        if self.sent < self.queries or elapsed < self.duration:
+            return False
+        return self.detector is None or self.steady or elapsed >= self.timeout
+
+    def next_round(self) -> Optional[list]:
+        if self.start is None:
+            self.start = time.perf_counter()
+        if not self.enabled or self._is_done(time.perf_counter() - self.start):
+            self.end = time.perf_counter()
+            return None
+
+        size = self.round_size
+        if self.duration == 0 and self.detector is None:
+            size = self.queries - self.sent
+        warmup_tasks = list(itertools.islice(self.tasks, size))
+        if len(warmup_tasks) == 0:
+            self.end = time.perf_counter()
+            return None
+        return warmup_tasks
+
+    def finish_round(self, size: int, elapsed: float):
+        self.sent += size
+        if elapsed <= 0:
+            return
+        if self.detector is not None:
+            self.steady = self.detector.add(size / elapsed)
+        self.round_size = max(self.workers, int(size * TIMELINE_WINDOW / elapsed))
+
+    def stats(self) -> Optional[dict]:
+        if not self.enabled:
+            return None
+        return {
+            "queries": self.sent,
+            "time": (self.end or time.perf_counter()) - self.start,
+            "steady_state": self.steady if self.detector is not None else None,
+        }
+
+
+def merge_warmup_stats(stats: List[Optional[dict]]) -> Optional[dict]:
+    """Combine the warm-up stats of the processes running in parallel"""
+    stats = [item for item in stats if item is not None]
+    if len(stats) == 0:
+        return None
+    steady_states = [item["steady_state"] for item in stats]
+    return {
+        "queries": sum(item["queries"] for item in stats),
+        "time": max(item["time"] for item in stats),
+        "steady_state": None if None in steady_states else all(steady_states),
+    }
@@ -0,0 +1,149 @@
+import itertools
+import pickle
+import queue
+import threading
+from typing import Callable, Dict, Optional, Tuple
+
+# Tells the worker threads to exit
+_STOP = None
+
+
+def _picklable(ex: BaseException) -> BaseException:
+    try:
+        pickle.dumps(ex)
+        return ex
+    except Exception:
+        return RuntimeError(repr(ex))
+
+
+def _run_worker(
+    tasks, results, threads: int, initializer: Callable, initargs: tuple, function
+):
+    initializer(*initargs)
+
+    def run():
+        while True:
+            task = tasks.get()
+            if task is _STOP:
+                break
+            position, item = task
+            try:
+                results.put((position, function(item), None))
+            except Exception as ex:
+                results.put((position, None, _picklable(ex)))
+
+    workers = [threading.Thread(target=run) for _ in range(threads)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+
+
+class ThreadedProcessPool:
+    """
+    Processes running `threads` calls of the function at once each, sharing
+    the client of the process. It keeps several requests in flight per
+    connection for the engines which accept concurrent requests, while the
+    processes avoid the contention on the GIL.
+
+    Calls are submitted the same way as to the upload pipeline, with the
+    callbacks called from a thread of the parent process.
+    """
+
+    def __init__(
+        self,
+        ctx,
+        processes: int,
+        threads: int,
+        function: Callable,
+        initializer: Callable,
+        initargs: tuple,
+    ):
+        self.threads = threads
+        self.tasks = ctx.Queue()
+        self.results = ctx.Queue()
+        self.callbacks: Dict[int, Tuple[Callable, Callable]] = {}
+        self.positions = itertools.count()
+        self.lock = threading.Lock()
+        self.broken: Optional[BaseException] = None
+        self.processes = [
+            ctx.Process(
+                target=_run_worker,
+                args=(
+                    self.tasks,
+                    self.results,
+                    threads,
+                    initializer,
+                    initargs,
+                    function,
+                ),
+                daemon=True,
+            )
+            for _ in range(processes)
+        ]
+        for process in self.processes:
+            process.start()
+        self.collector = threading.Thread(target=self._collect, daemon=True)
+        self.collector.start()
+
+    def _pop_callbacks(self, position: int) -> Optional[Tuple[Callable, Callable]]:
+        with self.lock:
+            # Pending calls are dropped once the pool is broken
+            return self.callbacks.pop(position, None)
+
+    def _fail_pending(self, ex: BaseException):
+        with self.lock:
+            self.broken = ex
+            callbacks, self.callbacks = self.callbacks, {}
+        for _, error_callback in callbacks.values():
+            error_callback(ex)
+
+    def _collect(self):
+        while True:
+            try:
+                item = self.results.get(timeout=1.0)
+            except queue.Empty:
+                if not all(process.is_alive() for process in self.processes):
+                    self._fail_pending(RuntimeError("Upload worker process died"))
+                    return
+                continue
+            if item is _STOP:
+                return
+            position, result, error = item
+            callbacks = self._pop_callbacks(position)
+            if callbacks is None:
+                # Late result of a call which already failed
+                continue
+            callback, error_callback = callbacks
+            if error is None:
+                callback(result)
+            else:
+                error_callback(error)
+
+    def submit(self, item, callback: Callable, error_callback: Callable):
+        position = next(self.positions)
+        with self.lock:
+            broken = self.broken
+            if broken is None:
+                self.callbacks[position] = (callback, error_callback)
+        if broken is not None:
+            error_callback(broken)
+            return
+        self.tasks.put((position, item))
+
+    def close(self):
+        """Wait for the submitted calls and stop the processes"""
+        for _ in range(len(self.processes) * self.threads):
+            self.tasks.put(_STOP)
+        for process in self.processes:
+            process.join()
+        if self.broken is not None:
+            self.tasks.cancel_join_thread()
+        self.results.put(_STOP)
+        self.collector.join()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
@@ -44,7 +44,7 @@ class CassandraSearcher(BaseSearcher):
     @classmethod
     def search_one(cls, query: Query, top) -> List[Tuple[int, float]]:
         # TODO: Use query.metaconditions for datasets with filtering
-        result = cls.conn.execute(cls.select_query.bind([query.vector, top]))
+        result = cls.conn.execute(cls.select_query.bind([query.vector.tolist(), top]))
         
         return result
 
@@ -1,4 +1,3 @@
-import time
 from typing import List
 
 import numpy as np
@@ -8,11 +7,16 @@ from cassandra.concurrent import execute_concurrent_with_args
 from dataset_reader.base_reader import Record
 from engine.base_client import IncompatibilityError
 from engine.base_client.distances import Distance
+from engine.base_client.index_build import wait_until
 from engine.base_client.upload import BaseUploader
 from engine.clients.cassandra.config import get_db_config
 
 from time import sleep
 
+# Seconds between the probe queries of the index build
+INDEX_PROBE_MIN_INTERVAL = 1.0
+INDEX_PROBE_MAX_INTERVAL = 10.0
+
 
 class CassandraUploader(BaseUploader):
     conn = None
@@ -42,7 +46,7 @@ class CassandraUploader(BaseUploader):
         try:
             data = []
             for record in batch:
-                data.append((record.id, record.vector))
+                data.append((record.id, record.vector.tolist()))
 
             execute_concurrent_with_args(cls.conn, cls.insert_query, data, concurrency=100)
         except Exception as e:
@@ -51,19 +55,29 @@ class CassandraUploader(BaseUploader):
 
     @classmethod
     def post_upload(cls, distance):
+        cls.index_build.started()
+
+        def is_searchable():
+            try:
+                cls.conn.execute(f"""
+                    SELECT * FROM {cls.keyspace_name}.{cls.data_table_name}
+                    ORDER BY embedding ANN OF {np.ones(100).tolist()}
+                    LIMIT 1
+                """)
+                return True
+            except Exception as e:
+                # TODO: Catch only INDEX_NOT_AVAILABLE error
+                cls.index_build.progress(status=str(e))
+                return False
+
         try:
-            while True:
-                try:
-                    cls.conn.execute(f"""
-                        SELECT * FROM {cls.keyspace_name}.{cls.data_table_name}
-                        ORDER BY embedding ANN OF {np.ones(100).tolist()}
-                        LIMIT 1
-                    """)
-                    break
-                except Exception as e:
-                    # TODO: Catch only INDEX_NOT_AVAILABLE error
-                    print(e)
-                    time.sleep(10)
+            # Every poll is an ANN query, which would load the node while the
+            # index is still being built
+            wait_until(
+                is_searchable,
+                min_interval=INDEX_PROBE_MIN_INTERVAL,
+                max_interval=INDEX_PROBE_MAX_INTERVAL,
+            )
             print(f"Index '{cls.index_name}' created (if not exists).")
         except Exception as e:
             print(e)
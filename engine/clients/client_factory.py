@@ -12,6 +12,7 @@ from engine.clients.elasticsearch import (
     ElasticSearcher,
     ElasticUploader,
 )
+from engine.clients.local import LocalConfigurator, LocalSearcher, LocalUploader
 from engine.clients.milvus import MilvusConfigurator, MilvusSearcher, MilvusUploader
 from engine.clients.opensearch import (
     OpenSearchConfigurator,
@@ -43,6 +44,7 @@ ENGINE_CONFIGURATORS = {
     "pgvector": PgVectorConfigurator,
     "scylladb": ScyllaDbConfigurator,
     "cassandra": CassandraConfigurator,
+    "local": LocalConfigurator,
 }
 
 ENGINE_UPLOADERS = {
@@ -55,6 +57,7 @@ ENGINE_UPLOADERS = {
     "pgvector": PgVectorUploader,
     "scylladb": ScyllaDbUploader,
     "cassandra": CassandraUploader,
+    "local": LocalUploader,
 }
 
 ENGINE_SEARCHERS = {
@@ -67,6 +70,7 @@ ENGINE_SEARCHERS = {
     "pgvector": PgVectorSearcher,
     "scylladb": ScyllaDbSearcher,
     "cassandra": CassandraSearcher,
+    "local": LocalSearcher,
 }
 
 
@@ -1,6 +1,6 @@
 import os
 
-from elasticsearch import Elasticsearch
+from elasticsearch import AsyncElasticsearch, Elasticsearch
 
 ELASTIC_PORT = int(os.getenv("ELASTIC_PORT", 9200))
 ELASTIC_INDEX = os.getenv("ELASTIC_INDEX", "bench")
@@ -8,13 +8,17 @@ ELASTIC_USER = os.getenv("ELASTIC_USER", "elastic")
 ELASTIC_PASSWORD = os.getenv("ELASTIC_PASSWORD", "passwd")
 
 
-def get_es_client(host, connection_params):
-    init_params = {
+def _get_init_params(connection_params):
+    return {
         "verify_certs": False,
         "retry_on_timeout": True,
         "ssl_show_warn": False,
         **connection_params,
     }
+
+
+def get_es_client(host, connection_params):
+    init_params = _get_init_params(connection_params)
     client = Elasticsearch(
         f"http://{host}:{ELASTIC_PORT}",
         basic_auth=(ELASTIC_USER, ELASTIC_PASSWORD),
@@ -22,3 +26,12 @@ def get_es_client(host, connection_params):
     )
     assert client.ping()
     return client
+
+
+def get_async_es_client(host, connection_params):
+    init_params = _get_init_params(connection_params)
+    return AsyncElasticsearch(
+        f"http://{host}:{ELASTIC_PORT}",
+        basic_auth=(ELASTIC_USER, ELASTIC_PASSWORD),
+        **init_params,
+    )
@@ -2,11 +2,15 @@ import multiprocessing as mp
 import uuid
 from typing import List, Tuple
 
-from elasticsearch import Elasticsearch
+from elasticsearch import AsyncElasticsearch, Elasticsearch
 
 from dataset_reader.base_reader import Query
 from engine.base_client.search import BaseSearcher
-from engine.clients.elasticsearch.config import ELASTIC_INDEX, get_es_client
+from engine.clients.elasticsearch.config import (
+    ELASTIC_INDEX,
+    get_async_es_client,
+    get_es_client,
+)
 from engine.clients.elasticsearch.parser import ElasticConditionParser
 
 
@@ -16,8 +20,10 @@ class ClosableElastic(Elasticsearch):
 
 
 class ElasticSearcher(BaseSearcher):
+    PREPARED_QUERY_SUPPORT = True
     search_params = {}
     client: Elasticsearch = None
+    async_client: AsyncElasticsearch = None
     parser = ElasticConditionParser()
 
     @classmethod
@@ -30,10 +36,17 @@ class ElasticSearcher(BaseSearcher):
         cls.search_params = search_params
 
     @classmethod
-    def search_one(cls, query: Query, top: int) -> List[Tuple[int, float]]:
+    async def async_init_client(
+        cls, host, _distance, connection_params: dict, search_params: dict
+    ):
+        cls.async_client = get_async_es_client(host, connection_params)
+        cls.search_params = search_params
+
+    @classmethod
+    def prepare_query(cls, query: Query, top: int) -> dict:
         knn = {
             "field": "vector",
-            "query_vector": query.vector,
+            "query_vector": query.vector.tolist(),
             "k": top,
             **cls.search_params["config"],
         }
@@ -41,13 +54,45 @@ class ElasticSearcher(BaseSearcher):
         meta_conditions = cls.parser.parse(query.meta_conditions)
         if meta_conditions:
             knn["filter"] = meta_conditions
+        return knn
 
-        res = cls.client.search(
-            index=ELASTIC_INDEX,
-            knn=knn,
-            size=top,
-        )
+    @classmethod
+    def _parse_response(cls, res) -> List[Tuple[int, float]]:
         return [
             (uuid.UUID(hex=hit["_id"]).int, hit["_score"])
             for hit in res["hits"]["hits"]
         ]
+
+    @classmethod
+    def search_one(cls, query: Query, top: int) -> List[Tuple[int, float]]:
+        return cls.search_prepared(cls.prepare_query(query, top), top)
+
+    @classmethod
+    def search_prepared(cls, prepared: dict, top: int) -> List[Tuple[int, float]]:
+        res = cls.client.search(
+            index=ELASTIC_INDEX,
+            knn=prepared,
+            size=top,
+        )
+        return cls._parse_response(res)
+
+    @classmethod
+    async def async_search_one(cls, query: Query, top: int) -> List[Tuple[int, float]]:
+        return await cls.async_search_prepared(cls.prepare_query(query, top), top)
+
+    @classmethod
+    async def async_search_prepared(
+        cls, prepared: dict, top: int
+    ) -> List[Tuple[int, float]]:
+        res = await cls.async_client.search(
+            index=ELASTIC_INDEX,
+            knn=prepared,
+            size=top,
+        )
+        return cls._parse_response(res)
+
+    @classmethod
+    async def async_delete_client(cls):
+        if cls.async_client is not None:
+            await cls.async_client.close()
+            cls.async_client = None
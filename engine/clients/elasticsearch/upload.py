@@ -15,6 +15,7 @@ class ClosableElastic(Elasticsearch):
 
 
 class ElasticUploader(BaseUploader):
+    CONCURRENT_UPLOAD_SUPPORT = True
     client: Elasticsearch = None
     upload_params = {}
 
@@ -33,7 +34,9 @@ class ElasticUploader(BaseUploader):
         for record in batch:
             vector_id = uuid.UUID(int=record.id).hex
             operations.append({"index": {"_id": vector_id}})
-            operations.append({"vector": record.vector, **(record.metadata or {})})
+            operations.append(
+                {"vector": record.vector.tolist(), **(record.metadata or {})}
+            )
 
         cls.client.bulk(
             index=ELASTIC_INDEX,
@@ -42,6 +45,8 @@ class ElasticUploader(BaseUploader):
 
     @classmethod
     def post_upload(cls, _distance):
+        # Segments are merged into one, for the HNSW graph to cover all the data
+        cls.index_build.started()
         cls.client.indices.forcemerge(
             index=ELASTIC_INDEX, wait_for_completion=True, max_num_segments=1
         )
@@ -0,0 +1,9 @@
+from engine.clients.local.configure import LocalConfigurator
+from engine.clients.local.search import LocalSearcher
+from engine.clients.local.upload import LocalUploader
+
+__all__ = [
+    "LocalConfigurator",
+    "LocalSearcher",
+    "LocalUploader",
+]
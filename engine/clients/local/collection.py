@@ -0,0 +1,124 @@
+import fcntl
+import json
+import shutil
+import threading
+from pathlib import Path
+from typing import Optional, Tuple
+
+import numpy as np
+
+META_FILE = "meta.json"
+VECTORS_FILE = "vectors.f32"
+# One byte per row of the arena, set once the row is written
+PRESENT_FILE = "present.u8"
+LOCK_FILE = "lock"
+HNSW_FILE = "hnsw.bin"
+
+# Rows of the arena allocated up front, unless `capacity` is configured
+DEFAULT_CAPACITY = 65536
+
+
+class LocalCollection:
+    """
+    Vectors of the local engine, in a preallocated float32 arena backed by a
+    file, so the upload and search processes share it through the page cache.
+    The id of a record is its row in the arena. The arena doubles whenever a
+    batch does not fit, under a lock on the file shared by the processes.
+    """
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        with open(self.path / META_FILE) as f:
+            self.meta = json.load(f)
+        self.dim = self.meta["dim"]
+        self.lock = threading.Lock()
+        self.capacity = 0
+        self.vectors: Optional[np.ndarray] = None
+        self.present: Optional[np.ndarray] = None
+        self._map()
+
+    @classmethod
+    def create(
+        cls, path: Path, dim: int, distance: str, capacity: int, **meta
+    ) -> "LocalCollection":
+        path = Path(path)
+        shutil.rmtree(path, ignore_errors=True)
+        path.mkdir(parents=True)
+        with open(path / META_FILE, "w") as f:
+            json.dump({"dim": dim, "distance": distance, **meta}, f)
+        # Files are extended without writing them, so they stay sparse
+        # until the rows are uploaded
+        for name, row_size in ((VECTORS_FILE, 4 * dim), (PRESENT_FILE, 1)):
+            with open(path / name, "wb") as f:
+                f.truncate(capacity * row_size)
+        return cls(path)
+
+    @staticmethod
+    def delete(path: Path):
+        shutil.rmtree(path, ignore_errors=True)
+
+    def _map(self):
+        capacity = (self.path / PRESENT_FILE).stat().st_size
+        if capacity == self.capacity:
+            return
+        self.capacity = capacity
+        self.vectors = np.memmap(
+            self.path / VECTORS_FILE,
+            dtype=np.float32,
+            mode="r+",
+            shape=(capacity, self.dim),
+        )
+        self.present = np.memmap(
+            self.path / PRESENT_FILE, dtype=np.uint8, mode="r+", shape=(capacity,)
+        )
+
+    def reserve(self, size: int):
+        """Make sure the arena holds `size` rows, growing it if needed"""
+        with self.lock:
+            if size <= self.capacity:
+                return
+            with open(self.path / LOCK_FILE, "a") as lock:
+                fcntl.flock(lock, fcntl.LOCK_EX)
+                capacity = (self.path / PRESENT_FILE).stat().st_size
+                if size > capacity:
+                    capacity = max(size, 2 * capacity)
+                    for name, row_size in (
+                        (VECTORS_FILE, 4 * self.dim),
+                        (PRESENT_FILE, 1),
+                    ):
+                        with open(self.path / name, "r+b") as f:
+                            f.truncate(capacity * row_size)
+                self._map()
+
+    def write(self, ids: np.ndarray, vectors: np.ndarray):
+        if len(ids) == 0:
+            return
+        self.reserve(int(ids.max()) + 1)
+        start = int(ids[0])
+        if np.array_equal(ids, np.arange(start, start + len(ids))):
+            # Batches of consecutive records are copied as a single block
+            rows = slice(start, start + len(ids))
+        else:
+            rows = ids
+        self.vectors[rows] = vectors
+        self.present[rows] = 1
+
+    def flush(self):
+        self.vectors.flush()
+        self.present.flush()
+
+    def read(self) -> Tuple[np.ndarray, Optional[np.ndarray]]:
+        """
+        Uploaded vectors and their ids. If the ids are the consecutive rows
+        from 0, the vectors are a view of the arena and the ids are None.
+        """
+        self._map()
+        rows = np.flatnonzero(self.present)
+        size = int(rows[-1]) + 1 if len(rows) > 0 else 0
+        if len(rows) == size:
+            return self.vectors[:size], None
+        return np.ascontiguousarray(self.vectors[rows]), rows
+
+    @property
+    def index_path(self) -> Path:
+        return self.path / HNSW_FILE
@@ -0,0 +1,16 @@
+import os
+import tempfile
+from pathlib import Path
+
+LOCAL_STORAGE_PATH = os.getenv(
+    "LOCAL_STORAGE_PATH",
+    os.path.join(tempfile.gettempdir(), "vector-db-benchmark-local"),
+)
+LOCAL_COLLECTION_NAME = os.getenv("LOCAL_COLLECTION_NAME", "benchmark")
+
+
+def get_collection_path(connection_params: dict) -> Path:
+    """The collection is stored in a local directory instead of a server"""
+    return Path(connection_params.get("path", LOCAL_STORAGE_PATH)) / (
+        LOCAL_COLLECTION_NAME
+    )
@@ -0,0 +1,40 @@
+from benchmark.dataset import Dataset
+from engine.base_client import IncompatibilityError
+from engine.base_client.configure import BaseConfigurator
+from engine.base_client.distances import Distance
+from engine.clients.local.collection import DEFAULT_CAPACITY, LocalCollection
+from engine.clients.local.config import get_collection_path
+from engine.clients.local.hnsw import import_hnswlib
+
+
+class LocalConfigurator(BaseConfigurator):
+    """
+    In-process reference engine, storing the collection in a local directory.
+    Searches are exact, unless `hnsw_config` is set in `collection_params`.
+    """
+
+    def __init__(self, host, collection_params: dict, connection_params: dict):
+        super().__init__(host, collection_params, connection_params)
+        self.path = get_collection_path(connection_params)
+
+    def clean(self):
+        LocalCollection.delete(self.path)
+
+    def recreate(self, dataset: Dataset, collection_params):
+        if dataset.config.type == "sparse" or dataset.config.schema:
+            # Neither sparse vectors nor payloads are stored
+            raise IncompatibilityError
+        hnsw_config = collection_params.get("hnsw_config")
+        if hnsw_config is not None:
+            import_hnswlib()
+
+        LocalCollection.create(
+            self.path,
+            dim=dataset.config.vector_size,
+            distance=Distance.from_name(dataset.config.distance).value,
+            capacity=collection_params.get("capacity", DEFAULT_CAPACITY),
+            hnsw_config=hnsw_config,
+        )
+
+    def execution_params(self, distance, vector_size) -> dict:
+        return {"normalize": distance == Distance.COSINE}
@@ -0,0 +1,63 @@
+from typing import Callable, Optional
+
+import numpy as np
+
+from engine.base_client import IncompatibilityError
+from engine.base_client.distances import Distance
+
+# Vectors are added to the index in blocks, to report the progress
+INDEX_BLOCK_SIZE = 65536
+
+
+def import_hnswlib():
+    """hnswlib is optional, it is only needed for the HNSW index"""
+    try:
+        import hnswlib
+    except ImportError:
+        raise IncompatibilityError("HNSW index of the local engine requires hnswlib")
+    return hnswlib
+
+
+def index_space(distance) -> str:
+    # Cosine vectors are normalized by the reader, so they are compared by
+    # their inner product as well
+    return "l2" if distance == Distance.L2 else "ip"
+
+
+def build_index(
+    path,
+    vectors: np.ndarray,
+    ids: Optional[np.ndarray],
+    distance,
+    m: int,
+    ef_construct: int,
+    threads: int = -1,
+    progress: Optional[Callable[[int, int], None]] = None,
+):
+    hnswlib = import_hnswlib()
+    index = hnswlib.Index(space=index_space(distance), dim=vectors.shape[1])
+    index.init_index(max_elements=len(vectors), M=m, ef_construction=ef_construct)
+    for start in range(0, len(vectors), INDEX_BLOCK_SIZE):
+        end = min(start + INDEX_BLOCK_SIZE, len(vectors))
+        index.add_items(
+            vectors[start:end],
+            ids[start:end] if ids is not None else np.arange(start, end),
+            num_threads=threads,
+        )
+        if progress is not None:
+            progress(end, len(vectors))
+    index.save_index(str(path))
+
+
+def load_index(path, distance, dim: int):
+    hnswlib = import_hnswlib()
+    index = hnswlib.Index(space=index_space(distance), dim=dim)
+    index.load_index(str(path))
+    return index
+
+
+def to_scores(distances: np.ndarray, distance) -> np.ndarray:
+    """Convert the hnswlib distances into the scores of the engine"""
+    if distance == Distance.L2:
+        return np.sqrt(np.maximum(distances, 0.0))
+    return 1.0 - distances
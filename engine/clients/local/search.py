@@ -0,0 +1,64 @@
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+from dataset_reader.base_reader import Query
+from engine.base_client import IncompatibilityError
+from engine.base_client.distances import Distance
+from engine.base_client.search import BaseSearcher
+from engine.clients.local.collection import LocalCollection
+from engine.clients.local.config import get_collection_path
+from engine.clients.local.hnsw import load_index, to_scores
+
+
+class LocalSearcher(BaseSearcher):
+    distance = None
+    vectors: np.ndarray = None
+    # Ids of the rows of `vectors`, None if they are the row numbers
+    ids: Optional[np.ndarray] = None
+    # Squared norms of the vectors, for the l2 distance
+    norms: Optional[np.ndarray] = None
+    index = None
+
+    @classmethod
+    def init_client(cls, host, distance, connection_params: dict, search_params: dict):
+        collection = LocalCollection(get_collection_path(connection_params))
+        cls.distance = Distance.from_name(distance)
+        cls.vectors, cls.ids = collection.read()
+        cls.norms = (
+            np.einsum("ij,ij->i", cls.vectors, cls.vectors)
+            if cls.distance == Distance.L2
+            else None
+        )
+        cls.index = None
+        if collection.meta.get("hnsw_config") is not None:
+            cls.index = load_index(collection.index_path, cls.distance, collection.dim)
+            cls.index.set_ef(search_params.get("config", {}).get("hnsw_ef", 100))
+            cls.index.set_num_threads(1)
+
+    @classmethod
+    def search_one(cls, query: Query, top: int) -> List[Tuple[int, float]]:
+        if query.meta_conditions:
+            raise IncompatibilityError("Local engine does not support filters")
+        if cls.index is not None:
+            ids, distances = cls.index.knn_query(query.vector, k=top)
+            return list(zip(ids[0].tolist(), to_scores(distances[0], cls.distance)))
+
+        scores = cls.vectors @ query.vector
+        if cls.distance == Distance.L2:
+            # Negated squared distance without the norm of the query, which
+            # is the same for all the vectors
+            scores = 2 * scores - cls.norms
+        top = min(top, len(scores))
+        selected = np.argpartition(-scores, top - 1)[:top]
+        selected = selected[np.argsort(-scores[selected])]
+        scores = scores[selected]
+        if cls.distance == Distance.L2:
+            norm = float(np.dot(query.vector, query.vector))
+            scores = np.sqrt(np.maximum(norm - scores, 0.0))
+        ids = selected if cls.ids is None else cls.ids[selected]
+        return list(zip(ids.tolist(), scores.tolist()))
+
+    @classmethod
+    def delete_client(cls):
+        cls.vectors = cls.ids = cls.norms = cls.index = None
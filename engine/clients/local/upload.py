@@ -0,0 +1,53 @@
+from typing import List
+
+from dataset_reader.base_reader import Record, RecordBatch
+from engine.base_client.upload import BaseUploader
+from engine.clients.local.collection import LocalCollection
+from engine.clients.local.config import get_collection_path
+from engine.clients.local.hnsw import build_index
+
+
+class LocalUploader(BaseUploader):
+    COLUMNAR_BATCH_SUPPORT = True
+    # Batches write disjoint rows of the arena
+    CONCURRENT_UPLOAD_SUPPORT = True
+    collection: LocalCollection = None
+    upload_params = {}
+
+    @classmethod
+    def init_client(cls, host, distance, connection_params, upload_params):
+        cls.collection = LocalCollection(get_collection_path(connection_params))
+        cls.upload_params = upload_params
+
+    @classmethod
+    def upload_batch(cls, batch: List[Record]):
+        cls.upload_record_batch(RecordBatch.from_records(batch))
+
+    @classmethod
+    def upload_record_batch(cls, batch: RecordBatch):
+        cls.collection.write(batch.ids, batch.vectors)
+
+    @classmethod
+    def post_upload(cls, distance):
+        cls.collection.flush()
+        hnsw_config = cls.collection.meta.get("hnsw_config")
+        if hnsw_config is None:
+            return {}
+
+        cls.index_build.started()
+        vectors, ids = cls.collection.read()
+        build_index(
+            cls.collection.index_path,
+            vectors,
+            ids,
+            distance,
+            m=hnsw_config.get("m", 16),
+            ef_construct=hnsw_config.get("ef_construct", 100),
+            threads=cls.upload_params.get("index_threads", -1),
+            progress=lambda done, total: cls.index_build.progress(done, total),
+        )
+        return {}
+
+    @classmethod
+    def delete_client(cls):
+        cls.collection = None
@@ -1,5 +1,5 @@
 import multiprocessing as mp
-from typing import List, Tuple
+from typing import List, Optional, Tuple
 
 from pymilvus import Collection, connections
 
@@ -15,6 +15,7 @@ from engine.clients.milvus.parser import MilvusConditionParser
 
 
 class MilvusSearcher(BaseSearcher):
+    PREPARED_QUERY_SUPPORT = True
     search_params = {}
     client: connections = None
     collection: Collection = None
@@ -37,16 +38,25 @@ class MilvusSearcher(BaseSearcher):
     def get_mp_start_method(cls):
         return "forkserver" if "forkserver" in mp.get_all_start_methods() else "spawn"
 
+    @classmethod
+    def prepare_query(cls, query: Query, top: int) -> Tuple[list, Optional[str]]:
+        return query.vector.tolist(), cls.parser.parse(query.meta_conditions)
+
     @classmethod
     def search_one(cls, query: Query, top: int) -> List[Tuple[int, float]]:
+        return cls.search_prepared(cls.prepare_query(query, top), top)
+
+    @classmethod
+    def search_prepared(cls, prepared, top: int) -> List[Tuple[int, float]]:
+        vector, expr = prepared
         param = {"metric_type": cls.distance, "params": cls.search_params["config"]}
         try:
             res = cls.collection.search(
-                data=[query.vector],
+                data=[vector],
                 anns_field="vector",
                 param=param,
                 limit=top,
-                expr=cls.parser.parse(query.meta_conditions),
+                expr=expr,
             )
         except Exception as e:
             import ipdb
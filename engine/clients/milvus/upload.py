@@ -1,5 +1,4 @@
 import multiprocessing as mp
-from typing import List
 
 from pymilvus import (
     Collection,
@@ -8,7 +7,7 @@ from pymilvus import (
     wait_for_index_building_complete,
 )
 
-from dataset_reader.base_reader import Record
+from dataset_reader.base_reader import RecordBatch
 from engine.base_client.upload import BaseUploader
 from engine.clients.milvus.config import (
     DISTANCE_MAPPING,
@@ -20,6 +19,7 @@ from engine.clients.milvus.config import (
 
 
 class MilvusUploader(BaseUploader):
+    COLUMNAR_BATCH_SUPPORT = True
     client = None
     upload_params = {}
     collection: Collection = None
@@ -35,21 +35,21 @@ class MilvusUploader(BaseUploader):
             alias=MILVUS_DEFAULT_ALIAS,
             host=host,
             port=str(connection_params.get("port", MILVUS_DEFAULT_PORT)),
-            **connection_params
+            **connection_params,
         )
         cls.collection = Collection(MILVUS_COLLECTION_NAME, using=MILVUS_DEFAULT_ALIAS)
         cls.upload_params = upload_params
         cls.distance = DISTANCE_MAPPING[distance]
 
     @classmethod
-    def upload_batch(cls, batch: List[Record]):
-        has_metadata = any(record.metadata for record in batch)
-        if has_metadata:
+    def upload_record_batch(cls, batch: RecordBatch):
+        if batch.metadata:
             field_values = [
                 [
-                    record.metadata.get(field_schema.name)
-                    or DTYPE_DEFAULT[field_schema.dtype]
-                    for record in batch
+                    value or DTYPE_DEFAULT[field_schema.dtype]
+                    for value in batch.metadata.get(
+                        field_schema.name, [None] * len(batch)
+                    )
                 ]
                 for field_schema in cls.collection.schema.fields
                 if field_schema.name not in ["id", "vector"]
@@ -57,12 +57,9 @@ class MilvusUploader(BaseUploader):
         else:
             field_values = []
 
-        ids, vectors = [], []
-        for record in batch:
-            ids.append(record.id)
-            vectors.append(record.vector)
-
-        cls.collection.insert([ids, vectors] + field_values)
+        cls.collection.insert(
+            [batch.ids.tolist(), batch.vectors.tolist()] + field_values
+        )
 
     @classmethod
     def post_upload(cls, distance):
@@ -72,6 +69,7 @@ class MilvusUploader(BaseUploader):
             "params": {**cls.upload_params.get("index_params", {})},
         }
         cls.collection.flush()
+        cls.index_build.started()
         cls.collection.create_index(field_name="vector", index_params=index_params)
         for field_schema in cls.collection.schema.fields:
             if field_schema.name in ["id", "vector"]:
@@ -91,6 +89,8 @@ class MilvusUploader(BaseUploader):
                 index_name=index.index_name,
                 using=MILVUS_DEFAULT_ALIAS,
             )
+            cls.index_build.progress(status=f"built {index.index_name}")
 
         cls.collection.load()
+        cls.index_build.progress(status="loaded")
         return {}
@@ -1,3 +1,4 @@
+import json
 import multiprocessing as mp
 import uuid
 from typing import List, Tuple
@@ -21,8 +22,10 @@ class ClosableOpenSearch(OpenSearch):
 
 
 class OpenSearchSearcher(BaseSearcher):
+    PREPARED_QUERY_SUPPORT = True
     search_params = {}
     client: OpenSearch = None
+    async_client = None
     parser = OpenSearchConditionParser()
 
     @classmethod
@@ -30,8 +33,8 @@ class OpenSearchSearcher(BaseSearcher):
         return "forkserver" if "forkserver" in mp.get_all_start_methods() else "spawn"
 
     @classmethod
-    def init_client(cls, host, distance, connection_params: dict, search_params: dict):
-        init_params = {
+    def _get_init_params(cls, connection_params: dict) -> dict:
+        return {
             **{
                 "verify_certs": False,
                 "request_timeout": 90,
@@ -39,19 +42,41 @@ class OpenSearchSearcher(BaseSearcher):
             },
             **connection_params,
         }
+
+    @classmethod
+    def init_client(cls, host, distance, connection_params: dict, search_params: dict):
         cls.client: OpenSearch = OpenSearch(
             f"http://{host}:{OPENSEARCH_PORT}",
             basic_auth=(OPENSEARCH_USER, OPENSEARCH_PASSWORD),
-            **init_params,
+            **cls._get_init_params(connection_params),
         )
         cls.search_params = search_params
 
     @classmethod
-    def search_one(cls, query: Query, top: int) -> List[Tuple[int, float]]:
+    async def async_init_client(
+        cls, host, distance, connection_params: dict, search_params: dict
+    ):
+        # The async client is only available with aiohttp installed
+        from opensearchpy import AsyncOpenSearch
+
+        cls.async_client = AsyncOpenSearch(
+            f"http://{host}:{OPENSEARCH_PORT}",
+            basic_auth=(OPENSEARCH_USER, OPENSEARCH_PASSWORD),
+            **cls._get_init_params(connection_params),
+        )
+        cls.search_params = search_params
+
+    @classmethod
+    def prepare_query(cls, query: Query, top: int) -> str:
+        # The body is sent as is, so it is serialized only once
+        return json.dumps(cls._build_body(query, top))
+
+    @classmethod
+    def _build_body(cls, query: Query, top: int) -> dict:
         opensearch_query = {
             "knn": {
                 "vector": {
-                    "vector": query.vector,
+                    "vector": query.vector.tolist(),
                     "k": top,
                 }
             }
@@ -61,20 +86,55 @@ class OpenSearchSearcher(BaseSearcher):
         if meta_conditions:
             opensearch_query["knn"]["vector"]["filter"] = meta_conditions
 
+        return {
+            "query": opensearch_query,
+            "size": top,
+        }
+
+    @classmethod
+    def _parse_response(cls, res) -> List[Tuple[int, float]]:
+        return [
+            (uuid.UUID(hex=hit["_id"]).int, hit["_score"])
+            for hit in res["hits"]["hits"]
+        ]
+
+    @classmethod
+    def search_one(cls, query: Query, top: int) -> List[Tuple[int, float]]:
+        return cls.search_prepared(cls.prepare_query(query, top), top)
+
+    @classmethod
+    def search_prepared(cls, prepared: str, top: int) -> List[Tuple[int, float]]:
         res = cls.client.search(
             index=OPENSEARCH_INDEX,
-            body={
-                "query": opensearch_query,
-                "size": top,
+            body=prepared,
+            params={
+                "timeout": 60,
             },
+        )
+        return cls._parse_response(res)
+
+    @classmethod
+    async def async_search_one(cls, query: Query, top: int) -> List[Tuple[int, float]]:
+        return await cls.async_search_prepared(cls.prepare_query(query, top), top)
+
+    @classmethod
+    async def async_search_prepared(
+        cls, prepared: str, top: int
+    ) -> List[Tuple[int, float]]:
+        res = await cls.async_client.search(
+            index=OPENSEARCH_INDEX,
+            body=prepared,
             params={
                 "timeout": 60,
             },
         )
-        return [
-            (uuid.UUID(hex=hit["_id"]).int, hit["_score"])
-            for hit in res["hits"]["hits"]
-        ]
+        return cls._parse_response(res)
+
+    @classmethod
+    async def async_delete_client(cls):
+        if cls.async_client is not None:
+            await cls.async_client.close()
+            cls.async_client = None
 
     @classmethod
     def setup_search(cls):
@@ -20,6 +20,7 @@ class ClosableOpenSearch(OpenSearch):
 
 
 class OpenSearchUploader(BaseUploader):
+    CONCURRENT_UPLOAD_SUPPORT = True
     client: OpenSearch = None
     upload_params = {}
 
@@ -50,7 +51,9 @@ class OpenSearchUploader(BaseUploader):
         for record in batch:
             vector_id = uuid.UUID(int=record.id).hex
             operations.append({"index": {"_id": vector_id}})
-            operations.append({"vector": record.vector, **(record.metadata or {})})
+            operations.append(
+                {"vector": record.vector.tolist(), **(record.metadata or {})}
+            )
 
         cls.client.bulk(
             index=OPENSEARCH_INDEX,
@@ -62,6 +65,8 @@ class OpenSearchUploader(BaseUploader):
 
     @classmethod
     def post_upload(cls, _distance):
+        # Segments are merged into one, for the HNSW graph to cover all the data
+        cls.index_build.started()
         cls.client.indices.forcemerge(
             index=OPENSEARCH_INDEX,
             params={
@@ -1,8 +1,8 @@
+import asyncio
 from typing import List, Tuple
 
-import numpy as np
 import psycopg
-from pgvector.psycopg import register_vector
+from pgvector.psycopg import register_vector, register_vector_async
 
 from dataset_reader.base_reader import Query
 from engine.base_client.distances import Distance
@@ -17,6 +17,18 @@ class PgVectorSearcher(BaseSearcher):
     distance = None
     search_params = {}
     parser = PgVectorConditionParser()
+    # A single connection runs one query at a time, so the async mode keeps
+    # one connection per in-flight query
+    async_conns: asyncio.Queue = None
+
+    @classmethod
+    def _get_query(cls, distance) -> str:
+        if distance == Distance.COSINE:
+            return "SELECT id, embedding <=> %s AS _score FROM items ORDER BY _score LIMIT %s"
+        elif distance == Distance.L2:
+            return "SELECT id, embedding <-> %s AS _score FROM items ORDER BY _score LIMIT %s"
+        else:
+            raise NotImplementedError(f"Unsupported distance metric {distance}")
 
     @classmethod
     def init_client(cls, host, distance, connection_params: dict, search_params: dict):
@@ -24,21 +36,51 @@ class PgVectorSearcher(BaseSearcher):
         register_vector(cls.conn)
         cls.cur = cls.conn.cursor()
         cls.cur.execute(f"SET hnsw.ef_search = {search_params['config']['hnsw_ef']}")
-        if distance == Distance.COSINE:
-            cls.query = "SELECT id, embedding <=> %s AS _score FROM items ORDER BY _score LIMIT %s"
-        elif distance == Distance.L2:
-            cls.query = "SELECT id, embedding <-> %s AS _score FROM items ORDER BY _score LIMIT %s"
-        else:
-            raise NotImplementedError(f"Unsupported distance metric {cls.distance}")
+        cls.query = cls._get_query(distance)
+
+    @classmethod
+    async def async_init_client(
+        cls, host, distance, connection_params: dict, search_params: dict
+    ):
+        cls.query = cls._get_query(distance)
+        cls.search_params = search_params
+        cls.async_conns = asyncio.Queue()
+        for _ in range(search_params.get("concurrency", 1)):
+            conn = await psycopg.AsyncConnection.connect(
+                **get_db_config(host, connection_params)
+            )
+            await register_vector_async(conn)
+            await conn.execute(
+                f"SET hnsw.ef_search = {search_params['config']['hnsw_ef']}"
+            )
+            cls.async_conns.put_nowait(conn)
 
     @classmethod
     def search_one(cls, query: Query, top) -> List[Tuple[int, float]]:
         # TODO: Use query.metaconditions for datasets with filtering
-        cls.cur.execute(
-            cls.query, (np.array(query.vector), top), binary=True, prepare=True
-        )
+        cls.cur.execute(cls.query, (query.vector, top), binary=True, prepare=True)
         return cls.cur.fetchall()
 
+    @classmethod
+    async def async_search_one(cls, query: Query, top) -> List[Tuple[int, float]]:
+        conn = await cls.async_conns.get()
+        try:
+            async with conn.cursor() as cur:
+                await cur.execute(
+                    cls.query, (query.vector, top), binary=True, prepare=True
+                )
+                return await cur.fetchall()
+        finally:
+            cls.async_conns.put_nowait(conn)
+
+    @classmethod
+    async def async_delete_client(cls):
+        if cls.async_conns is not None:
+            while not cls.async_conns.empty():
+                conn = cls.async_conns.get_nowait()
+                await conn.close()
+            cls.async_conns = None
+
     @classmethod
     def delete_client(cls):
         if cls.cur:
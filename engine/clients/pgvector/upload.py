@@ -1,10 +1,7 @@
-from typing import List
-
-import numpy as np
 import psycopg
 from pgvector.psycopg import register_vector
 
-from dataset_reader.base_reader import Record
+from dataset_reader.base_reader import RecordBatch
 from engine.base_client import IncompatibilityError
 from engine.base_client.distances import Distance
 from engine.base_client.upload import BaseUploader
@@ -12,6 +9,7 @@ from engine.clients.pgvector.config import get_db_config
 
 
 class PgVectorUploader(BaseUploader):
+    COLUMNAR_BATCH_SUPPORT = True
     DISTANCE_MAPPING = {
         Distance.L2: "vector_l2_ops",
         Distance.COSINE: "vector_cosine_ops",
@@ -28,19 +26,13 @@ class PgVectorUploader(BaseUploader):
         cls.upload_params = upload_params
 
     @classmethod
-    def upload_batch(cls, batch: List[Record]):
-        ids, vectors = [], []
-        for record in batch:
-            ids.append(record.id)
-            vectors.append(record.vector)
-
-        vectors = np.array(vectors)
+    def upload_record_batch(cls, batch: RecordBatch):
         # Copy is faster than insert
         with cls.cur.copy(
             "COPY items (id, embedding) FROM STDIN WITH (FORMAT BINARY)"
         ) as copy:
             copy.set_types(["integer", "vector"])
-            for i, embedding in zip(ids, vectors):
+            for i, embedding in zip(batch.ids.tolist(), batch.vectors):
                 copy.write_row((i, embedding))
 
     @classmethod
@@ -52,6 +44,7 @@ class PgVectorUploader(BaseUploader):
 
         cls.conn.execute("SET max_parallel_workers = 128")
         cls.conn.execute("SET max_parallel_maintenance_workers = 128")
+        cls.index_build.started()
         cls.conn.execute(
             f"CREATE INDEX ON items USING hnsw (embedding {hnsw_distance_type}) WITH (m = {cls.upload_params['hnsw_config']['m']}, ef_construction = {cls.upload_params['hnsw_config']['ef_construct']})"
         )
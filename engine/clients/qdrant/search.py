@@ -2,7 +2,8 @@ import os
 from typing import List, Tuple
 
 import httpx
-from qdrant_client import QdrantClient
+import numpy as np
+from qdrant_client import AsyncQdrantClient, QdrantClient
 from qdrant_client._pydantic_compat import construct
 from qdrant_client.http import models as rest
 
@@ -13,8 +14,11 @@ from engine.clients.qdrant.parser import QdrantConditionParser
 
 
 class QdrantSearcher(BaseSearcher):
+    PREPARED_QUERY_SUPPORT = True
     search_params = {}
+    search_config: rest.SearchParams = None
     client: QdrantClient = None
+    async_client: AsyncQdrantClient = None
     parser = QdrantConditionParser()
 
     @classmethod
@@ -28,37 +32,89 @@ class QdrantSearcher(BaseSearcher):
             **connection_params,
         )
         cls.search_params = search_params
+        cls.search_config = rest.SearchParams(**search_params.get("config", {}))
 
     # Uncomment for gRPC
     # @classmethod
     # def get_mp_start_method(cls):
     #     return "forkserver" if "forkserver" in mp.get_all_start_methods() else "spawn"
 
+    @classmethod
+    async def async_init_client(
+        cls, host, distance, connection_params: dict, search_params: dict
+    ):
+        cls.async_client = AsyncQdrantClient(
+            host,
+            prefer_grpc=True,
+            limits=httpx.Limits(max_connections=None, max_keepalive_connections=0),
+            **connection_params,
+        )
+        cls.search_params = search_params
+        cls.search_config = rest.SearchParams(**search_params.get("config", {}))
+
+    @classmethod
+    def _query_vector(cls, query: Query):
+        if query.sparse_vector is None:
+            return query.vector
+        return construct(
+            rest.NamedSparseVector,
+            name="sparse",
+            vector=construct(
+                rest.SparseVector,
+                # Arrays sliced from the CSR matrix, converted once when the
+                # query is prepared
+                indices=np.asarray(query.sparse_vector.indices).tolist(),
+                values=np.asarray(query.sparse_vector.values).tolist(),
+            ),
+        )
+
+    @classmethod
+    def prepare_query(cls, query: Query, top: int):
+        return cls._query_vector(query), cls.parser.parse(query.meta_conditions)
+
     @classmethod
     def search_one(cls, query: Query, top: int) -> List[Tuple[int, float]]:
+        return cls.search_prepared(cls.prepare_query(query, top), top)
+
+    @classmethod
+    def search_prepared(cls, prepared, top: int) -> List[Tuple[int, float]]:
+        query_vector, query_filter = prepared
         # Can query only one till we introduce re-ranking in the benchmarks
-        if query.sparse_vector is None:
-            query_vector = query.vector
-        else:
-            query_vector = construct(
-                rest.NamedSparseVector,
-                name="sparse",
-                vector=construct(
-                    rest.SparseVector,
-                    indices=query.sparse_vector.indices,
-                    values=query.sparse_vector.values,
-                ),
+        try:
+            res = cls.client.search(
+                collection_name=QDRANT_COLLECTION_NAME,
+                query_vector=query_vector,
+                query_filter=query_filter,
+                limit=top,
+                search_params=cls.search_config,
             )
+        except Exception as ex:
+            print(f"Something went wrong during search: {ex}")
+            raise ex
+        return [(hit.id, hit.score) for hit in res]
+
+    @classmethod
+    async def async_search_one(cls, query: Query, top: int) -> List[Tuple[int, float]]:
+        return await cls.async_search_prepared(cls.prepare_query(query, top), top)
 
+    @classmethod
+    async def async_search_prepared(cls, prepared, top: int) -> List[Tuple[int, float]]:
+        query_vector, query_filter = prepared
         try:
-            res = cls.client.search(
+            res = await cls.async_client.search(
                 collection_name=QDRANT_COLLECTION_NAME,
                 query_vector=query_vector,
-                query_filter=cls.parser.parse(query.meta_conditions),
+                query_filter=query_filter,
                 limit=top,
-                search_params=rest.SearchParams(**cls.search_params.get("config", {})),
+                search_params=cls.search_config,
             )
         except Exception as ex:
             print(f"Something went wrong during search: {ex}")
             raise ex
         return [(hit.id, hit.score) for hit in res]
+
+    @classmethod
+    async def async_delete_client(cls):
+        if cls.async_client is not None:
+            await cls.async_client.close()
+            cls.async_client = None
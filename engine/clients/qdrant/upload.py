@@ -1,7 +1,6 @@
 import os
-import time
-from typing import List
 
+import numpy as np
 from qdrant_client import QdrantClient
 from qdrant_client._pydantic_compat import construct
 from qdrant_client.http.models import (
@@ -11,12 +10,15 @@ from qdrant_client.http.models import (
     SparseVector,
 )
 
-from dataset_reader.base_reader import Record
+from dataset_reader.base_reader import RecordBatch
+from engine.base_client.index_build import MAX_POLL_INTERVAL, wait_until
 from engine.base_client.upload import BaseUploader
 from engine.clients.qdrant.config import QDRANT_COLLECTION_NAME
 
 
 class QdrantUploader(BaseUploader):
+    COLUMNAR_BATCH_SUPPORT = True
+    CONCURRENT_UPLOAD_SUPPORT = True
     client = None
     upload_params = {}
 
@@ -28,30 +30,27 @@ class QdrantUploader(BaseUploader):
         cls.upload_params = upload_params
 
     @classmethod
-    def upload_batch(cls, batch: List[Record]):
-        ids, vectors, payloads = [], [], []
-        for point in batch:
-            if point.sparse_vector is None:
-                vector = point.vector
-            else:
-                vector = {
+    def upload_record_batch(cls, batch: RecordBatch):
+        if batch.sparse_vectors is None:
+            vectors = batch.vectors.tolist()
+        else:
+            vectors = [
+                {
                     "sparse": construct(
                         SparseVector,
-                        indices=point.sparse_vector.indices,
-                        values=point.sparse_vector.values,
+                        indices=np.asarray(sparse_vector.indices).tolist(),
+                        values=np.asarray(sparse_vector.values).tolist(),
                     )
                 }
-
-            ids.append(point.id)
-            vectors.append(vector)
-            payloads.append(point.metadata or {})
+                for sparse_vector in batch.sparse_vectors
+            ]
 
         _ = cls.client.upsert(
             collection_name=QDRANT_COLLECTION_NAME,
             points=Batch.model_construct(
-                ids=ids,
+                ids=batch.ids.tolist(),
                 vectors=vectors,
-                payloads=payloads,
+                payloads=batch.payloads(),
             ),
             wait=False,
         )
@@ -66,25 +65,24 @@ class QdrantUploader(BaseUploader):
                 max_optimization_threads=100_000,
             ),
         )
+        cls.index_build.started()
 
         cls.wait_collection_green()
         return {}
 
     @classmethod
     def wait_collection_green(cls):
-        wait_time = 5.0
-        total = 0
-        while True:
-            time.sleep(wait_time)
-            total += wait_time
-            collection_info = cls.client.get_collection(QDRANT_COLLECTION_NAME)
-            if collection_info.status != CollectionStatus.GREEN:
-                continue
-            time.sleep(wait_time)
+        def is_green():
             collection_info = cls.client.get_collection(QDRANT_COLLECTION_NAME)
-            if collection_info.status == CollectionStatus.GREEN:
-                break
-        return total
+            cls.index_build.progress(
+                done=collection_info.indexed_vectors_count,
+                total=collection_info.points_count,
+                status=collection_info.status.value,
+            )
+            return collection_info.status == CollectionStatus.GREEN
+
+        # Optimizations may start with a delay, so the status has to stay green
+        return wait_until(is_green, settle=MAX_POLL_INTERVAL)
 
     @classmethod
     def delete_client(cls):
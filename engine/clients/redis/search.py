@@ -3,6 +3,7 @@ from typing import List, Tuple, Union
 
 import numpy as np
 from redis import Redis, RedisCluster
+from redis import asyncio as aioredis
 from redis.commands.search import Search as RedisSearchIndex
 from redis.commands.search.query import Query as RedisQuery
 
@@ -19,6 +20,7 @@ from engine.clients.redis.parser import RedisConditionParser
 
 
 class RedisSearcher(BaseSearcher):
+    PREPARED_QUERY_SUPPORT = True
     search_params = {}
     client: Union[RedisCluster, Redis] = None
     parser = RedisConditionParser()
@@ -27,6 +29,7 @@ class RedisSearcher(BaseSearcher):
     is_cluster: bool
     conns: List[Union[RedisCluster, Redis]]
     search_namespace: RedisSearchIndex
+    async_client: Union[aioredis.RedisCluster, aioredis.Redis] = None
 
     @classmethod
     def init_client(cls, host, distance, connection_params: dict, search_params: dict):
@@ -50,7 +53,17 @@ class RedisSearcher(BaseSearcher):
         cls.search_namespace = random.choice(cls.conns).ft()
 
     @classmethod
-    def search_one(cls, query: DatasetQuery, top: int) -> List[Tuple[int, float]]:
+    async def async_init_client(
+        cls, host, distance, connection_params: dict, search_params: dict
+    ):
+        redis_constructor = aioredis.RedisCluster if REDIS_CLUSTER else aioredis.Redis
+        cls.async_client = redis_constructor(
+            host=host, port=REDIS_PORT, password=REDIS_AUTH, username=REDIS_USER
+        )
+        cls.search_params = search_params
+
+    @classmethod
+    def prepare_query(cls, query: DatasetQuery, top: int) -> Tuple[RedisQuery, dict]:
         conditions = cls.parser.parse(query.meta_conditions)
         if conditions is None:
             prefilter_condition = "*"
@@ -71,11 +84,39 @@ class RedisSearcher(BaseSearcher):
             .timeout(REDIS_QUERY_TIMEOUT)
         )
         params_dict = {
-            "vec_param": np.array(query.vector).astype(np.float32).tobytes(),
+            "vec_param": query.vector.astype(np.float32, copy=False).tobytes(),
             "K": top,
             **cls.search_params["config"],
             **params,
         }
+        return q, params_dict
+
+    @classmethod
+    def search_one(cls, query: DatasetQuery, top: int) -> List[Tuple[int, float]]:
+        return cls.search_prepared(cls.prepare_query(query, top), top)
+
+    @classmethod
+    def search_prepared(cls, prepared, top: int) -> List[Tuple[int, float]]:
+        q, params_dict = prepared
         results = cls.search_namespace.search(q, query_params=params_dict)
 
         return [(int(result.id), float(result.vector_score)) for result in results.docs]
+
+    @classmethod
+    async def async_search_one(
+        cls, query: DatasetQuery, top: int
+    ) -> List[Tuple[int, float]]:
+        return await cls.async_search_prepared(cls.prepare_query(query, top), top)
+
+    @classmethod
+    async def async_search_prepared(cls, prepared, top: int) -> List[Tuple[int, float]]:
+        q, params_dict = prepared
+        results = await cls.async_client.ft().search(q, query_params=params_dict)
+
+        return [(int(result.id), float(result.vector_score)) for result in results.docs]
+
+    @classmethod
+    async def async_delete_client(cls):
+        if cls.async_client is not None:
+            await cls.async_client.aclose()
+            cls.async_client = None
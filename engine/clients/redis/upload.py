@@ -1,9 +1,6 @@
-from typing import List
-
-import numpy as np
 from redis import Redis, RedisCluster
 
-from dataset_reader.base_reader import Record
+from dataset_reader.base_reader import RecordBatch
 from engine.base_client.upload import BaseUploader
 from engine.clients.redis.config import (
     REDIS_AUTH,
@@ -15,6 +12,7 @@ from engine.clients.redis.helper import convert_to_redis_coords
 
 
 class RedisUploader(BaseUploader):
+    COLUMNAR_BATCH_SUPPORT = True
     client = None
     upload_params = {}
 
@@ -27,37 +25,32 @@ class RedisUploader(BaseUploader):
         cls.upload_params = upload_params
 
     @classmethod
-    def upload_batch(cls, batch: List[Record]):
+    def upload_record_batch(cls, batch: RecordBatch):
         p = cls.client.pipeline(transaction=False)
-        for record in batch:
-            idx = record.id
-            vec = record.vector
-            meta = record.metadata or {}
-            geopoints = {}
+        for idx, vec, meta in zip(batch.ids.tolist(), batch.vectors, batch.payloads()):
             payload = {}
-            if meta is not None:
-                for k, v in meta.items():
-                    # This is a patch for arxiv-titles dataset where we have a list of "labels", and
-                    # we want to index all of them under the same TAG field (whose separator is ';').
-                    if k == "labels":
-                        payload[k] = ";".join(v)
-                    if (
-                        v is not None
-                        and not isinstance(v, dict)
-                        and not isinstance(v, list)
-                    ):
-                        payload[k] = v
-                # Redis treats geopoints differently and requires putting them as
-                # a comma-separated string with lat and lon coordinates
-                geopoints = {
-                    k: ",".join(map(str, convert_to_redis_coords(v["lon"], v["lat"])))
-                    for k, v in meta.items()
-                    if isinstance(v, dict)
-                }
-            cls.client.hset(
+            for k, v in meta.items():
+                # This is a patch for arxiv-titles dataset where we have a list of "labels", and
+                # we want to index all of them under the same TAG field (whose separator is ';').
+                if k == "labels":
+                    payload[k] = ";".join(v)
+                if (
+                    v is not None
+                    and not isinstance(v, dict)
+                    and not isinstance(v, list)
+                ):
+                    payload[k] = v
+            # Redis treats geopoints differently and requires putting them as
+            # a comma-separated string with lat and lon coordinates
+            geopoints = {
+                k: ",".join(map(str, convert_to_redis_coords(v["lon"], v["lat"])))
+                for k, v in meta.items()
+                if isinstance(v, dict)
+            }
+            p.hset(
                 str(idx),
                 mapping={
-                    "vector": np.array(vec).astype(np.float32).tobytes(),
+                    "vector": vec.tobytes(),
                     **payload,
                     **geopoints,
                 },
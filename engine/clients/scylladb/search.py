@@ -87,7 +87,7 @@ class ScyllaDbSearcher(BaseSearcher):
         #    return []
         #return zip(result.result_keys, result.result_scores)
 
-        request = json.dumps({'embeddings': query.vector, 'limit': top})
+        request = json.dumps({'embeddings': query.vector.tolist(), 'limit': top})
         try:
             cls.conn.execute(cls.proxy_query.bind([cls.usearch_host, 6080, '/indexes/1/ann', request]))
             response = None
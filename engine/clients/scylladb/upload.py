@@ -8,11 +8,10 @@ from cassandra.query import BatchStatement, ConsistencyLevel
 from dataset_reader.base_reader import Record
 from engine.base_client import IncompatibilityError
 from engine.base_client.distances import Distance
+from engine.base_client.index_build import wait_until
 from engine.base_client.upload import BaseUploader
 from engine.clients.scylladb.config import get_db_config
 
-from time import sleep
-
 
 class ScyllaDbUploader(BaseUploader):
     DISTANCE_MAPPING = {
@@ -65,7 +64,7 @@ class ScyllaDbUploader(BaseUploader):
         try:
             batch_statement = BatchStatement(consistency_level=ConsistencyLevel.ANY)
             for record in batch:
-                batch_statement.add(cls.insert_query, (record.id, record.vector))
+                batch_statement.add(cls.insert_query, (record.id, record.vector.tolist()))
             cls.conn.execute(batch_statement)
             cls.conn.execute(cls.update_requested_count_query, [len(batch)])
 
@@ -104,14 +103,17 @@ class ScyllaDbUploader(BaseUploader):
                     (id, indexed_elements_count, param_m, param_ef_construct, param_ef_search, dimension, canceled)
                 VALUES (1, 0, {cls.param_m}, {cls.param_ef_construct}, {cls.default_ef_search}, {cls.dimensions}, false);
             """)
-            requested = cls.conn.execute(cls.get_requested_count_query).one().requested_elements_count
-            processed = cls.conn.execute(cls.get_processed_count_query).one().indexed_elements_count
-            while requested != processed:
-                sleep(1)
+            cls.index_build.started()
+
+            def is_indexed():
                 requested = cls.conn.execute(cls.get_requested_count_query).one().requested_elements_count
                 processed = cls.conn.execute(cls.get_processed_count_query).one().indexed_elements_count
+                cls.index_build.progress(done=processed, total=requested)
                 print(f"\rdbg: requested {requested}, processed {processed}", end="")
-            print(f"\rdbg: requested {requested}, processed {processed}")
+                return requested == processed
+
+            wait_until(is_indexed)
+            print()
         except Exception as e:
             print(e)
         # TODO: Schedule creating the index
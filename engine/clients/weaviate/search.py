@@ -1,4 +1,4 @@
-from typing import List, Tuple
+from typing import Any, List, Tuple
 
 from weaviate import WeaviateClient
 from weaviate.classes.config import Reconfigure
@@ -13,6 +13,7 @@ from engine.clients.weaviate.parser import WeaviateConditionParser
 
 
 class WeaviateSearcher(BaseSearcher):
+    PREPARED_QUERY_SUPPORT = True
     search_params = {}
     parser = WeaviateConditionParser()
     collection: Collection
@@ -31,11 +32,20 @@ class WeaviateSearcher(BaseSearcher):
         cls.search_params = search_params
         cls.client = client
 
+    @classmethod
+    def prepare_query(cls, query: Query, top: int) -> Tuple[list, Any]:
+        return query.vector.tolist(), cls.parser.parse(query.meta_conditions)
+
     @classmethod
     def search_one(cls, query: Query, top: int) -> List[Tuple[int, float]]:
+        return cls.search_prepared(cls.prepare_query(query, top), top)
+
+    @classmethod
+    def search_prepared(cls, prepared, top: int) -> List[Tuple[int, float]]:
+        vector, filters = prepared
         res = cls.collection.query.near_vector(
-            near_vector=query.vector,
-            filters=cls.parser.parse(query.meta_conditions),
+            near_vector=vector,
+            filters=filters,
             limit=top,
             return_metadata=MetadataQuery(distance=True),
             return_properties=[],
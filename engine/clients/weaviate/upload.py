@@ -11,6 +11,7 @@ from engine.clients.weaviate.config import WEAVIATE_CLASS_NAME, WEAVIATE_DEFAULT
 
 
 class WeaviateUploader(BaseUploader):
+    CONCURRENT_UPLOAD_SUPPORT = True
     client: WeaviateClient = None
     upload_params = {}
     collection = None
@@ -35,7 +36,9 @@ class WeaviateUploader(BaseUploader):
             _id = uuid.UUID(int=record.id)
             _property = record.metadata or {}
             objects.append(
-                DataObject(properties=_property, vector=record.vector, uuid=_id)
+                DataObject(
+                    properties=_property, vector=record.vector.tolist(), uuid=_id
+                )
             )
         if len(objects) > 0:
             cls.collection.data.insert_many(objects)
@@ -0,0 +1,47 @@
+import fnmatch
+import os
+from typing import List
+
+import typer
+
+from benchmark.config_read import read_dataset_config
+from benchmark.dataset import Dataset
+from benchmark.ground_truth import build_ground_truth
+
+app = typer.Typer()
+
+
+@app.command()
+def build(
+    datasets: List[str] = typer.Option(["*"]),
+    top: int = 100,
+    parallel: int = os.cpu_count() or 1,
+):
+    """
+    Compute the exact neighbours of the queries of the datasets, taking their
+    conditions into account, and store them in the dataset directory. The
+    benchmark uses them instead of the neighbours shipped with the dataset.
+
+    Example:
+        python3 ground_truth.py --datasets "random-100" --top 10
+    """
+    all_datasets = read_dataset_config()
+    selected_datasets = {
+        name: config
+        for name, config in all_datasets.items()
+        if any(fnmatch.fnmatch(name, dataset) for dataset in datasets)
+    }
+
+    for dataset_name, dataset_config in selected_datasets.items():
+        dataset = Dataset(dataset_config)
+        if dataset.config.type == "sparse":
+            print(f"Skipping {dataset_name}, sparse datasets are not supported")
+            continue
+        print(f"Building ground truth: {dataset_name}")
+        dataset.download()
+        path = build_ground_truth(dataset, top, parallel)
+        print(f"Saved {path}")
+
+
+if __name__ == "__main__":
+    app()
@@ -24,10 +24,14 @@ def run(
     exit_on_error: bool = True,
     timeout: float = 86400.0,
     skip_configure: Optional[bool] = False,
+    resume_upload: bool = False,
 ):
     """
     Example:
         python3 run.py --engines "*-m-16-*" --engines "qdrant-*" --datasets "glove-*"
+
+    With --resume-upload, an interrupted upload continues from its checkpoint
+    into the existing collection, which is not recreated.
     """
     all_engines = read_engine_configs()
     all_datasets = read_dataset_config()
@@ -63,6 +67,7 @@ def run(
                         skip_search,
                         skip_if_exists,
                         skip_configure,
+                        resume_upload=resume_upload,
                     )
                 client.delete_client()
 
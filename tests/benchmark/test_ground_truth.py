@@ -0,0 +1,101 @@
+import numpy as np
+import pytest
+
+from benchmark import ground_truth
+from benchmark.ground_truth import compute_ground_truth
+from dataset_reader.base_reader import BaseReader, Query, RecordBatch
+from dataset_reader.ground_truth_reader import (
+    GroundTruthReader,
+    ground_truth_path,
+    load_ground_truth,
+    save_ground_truth,
+)
+from engine.base_client.distances import Distance
+
+rng = np.random.default_rng(0)
+VECTORS = rng.random((500, 8), dtype=np.float32) - 0.5
+QUERIES = rng.random((6, 8), dtype=np.float32) - 0.5
+LABELS = np.arange(500) % 4
+CONDITIONS = [
+    None,
+    {"and": [{"label": {"match": {"value": 1}}}]},
+    {"or": [{"label": {"match": {"value": 2}}}, {"label": {"match": {"value": 3}}}]},
+    {"and": [{"label": {"range": {"gte": 3}}}]},
+    {"and": [{"label": {"match": {"value": 7}}}]},
+    None,
+]
+
+
+class ArrayReader(BaseReader):
+    def read_data_batches(self, batch_size, offset=0):
+        for start in range(offset, len(VECTORS), batch_size):
+            end = min(start + batch_size, len(VECTORS))
+            yield RecordBatch(
+                ids=np.arange(start, end),
+                vectors=VECTORS[start:end],
+                sparse_vectors=None,
+                metadata={"label": LABELS[start:end].tolist()},
+            )
+
+    def read_queries(self):
+        for vector, conditions in zip(QUERIES, CONDITIONS):
+            yield Query(
+                vector=vector,
+                sparse_vector=None,
+                meta_conditions=conditions,
+                expected_result=None,
+            )
+
+
+def brute_force(distance: Distance, top: int):
+    vectors, queries = VECTORS, QUERIES
+    if distance == Distance.COSINE:
+        vectors = vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+        queries = queries / np.linalg.norm(queries, axis=1, keepdims=True)
+    masks = [
+        np.ones(500, dtype=bool),
+        LABELS == 1,
+        LABELS >= 2,
+        LABELS >= 3,
+        np.zeros(500, dtype=bool),
+        np.ones(500, dtype=bool),
+    ]
+    expected = []
+    for query, mask in zip(queries, masks):
+        if distance == Distance.L2:
+            scores = -np.linalg.norm(vectors - query, axis=1)
+        else:
+            scores = vectors @ query
+        order = np.argsort(-np.where(mask, scores, -np.inf))[:top]
+        expected.append([i for i in order if mask[i]])
+    return expected
+
+
+@pytest.mark.parametrize("distance", list(Distance))
+@pytest.mark.parametrize("parallel", [1, 2])
+def test_blocked_search_matches_brute_force(monkeypatch, distance, parallel):
+    # Blocks of a few dozen records, so the partial results are merged
+    monkeypatch.setattr(ground_truth, "GROUND_TRUTH_MEMORY", 16 * 6 * 40 * parallel)
+    ids, scores = compute_ground_truth(ArrayReader(), distance, 10, parallel)
+
+    assert ids.dtype == np.int32 and ids.shape == (6, 10)
+    for row, expected in zip(ids, brute_force(distance, 10)):
+        assert row[row >= 0].tolist() == expected
+    assert np.isnan(scores[4]).all()
+    if distance == Distance.L2:
+        assert np.allclose(
+            scores[0, 0], np.linalg.norm(VECTORS[ids[0, 0]] - QUERIES[0])
+        )
+
+
+def test_reader_uses_the_saved_ground_truth(tmp_path):
+    ids = np.array([[3, 1, -1], [0, 2, 4]], dtype=np.int32)
+    scores = np.array([[0.9, 0.5, np.nan], [0.8, 0.7, 0.1]], dtype=np.float32)
+    path = ground_truth_path(tmp_path, "cosine")
+    save_ground_truth(path, ids, scores, "cosine")
+
+    assert load_ground_truth(path, "dot") is None
+    reader = GroundTruthReader(ArrayReader(), *load_ground_truth(path, "Cosine"))
+    queries = list(reader.read_queries())
+    assert [query.expected_result for query in queries] == [[3, 1], [0, 2, 4]]
+    assert queries[0].expected_scores == pytest.approx([0.9, 0.5])
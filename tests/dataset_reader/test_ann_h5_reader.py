@@ -0,0 +1,37 @@
+import h5py
+import numpy as np
+import pytest
+
+from dataset_reader import ann_h5_reader
+from dataset_reader.ann_h5_reader import AnnH5Reader
+
+VECTORS = np.random.rand(1003, 8).astype(np.float32)
+
+
+@pytest.fixture(params=[{}, {"chunks": (50, 8), "compression": "gzip"}])
+def h5_dataset(request, tmp_path, monkeypatch):
+    # Blocks of 120 rows, or 100 rows aligned to the chunks
+    monkeypatch.setattr(ann_h5_reader, "READ_BLOCK_BYTES", 120 * 8 * 4)
+    path = tmp_path / "dataset.hdf5"
+    with h5py.File(path, "w") as data:
+        data.create_dataset("train", data=VECTORS, **request.param)
+    return path
+
+
+@pytest.mark.parametrize("read_workers", [1, 2])
+def test_batches_are_cut_from_blocks(h5_dataset, read_workers):
+    reader = AnnH5Reader(h5_dataset, normalize=True, read_workers=read_workers)
+    batches = list(reader.read_data_batches(batch_size=64, offset=10))
+
+    assert [len(batch) for batch in batches[:-1]] == [64] * (len(batches) - 1)
+    assert np.array_equal(
+        np.concatenate([batch.ids for batch in batches]), np.arange(10, 1003)
+    )
+    expected = VECTORS / np.linalg.norm(VECTORS, axis=1, keepdims=True)
+    assert np.allclose(np.concatenate([b.vectors for b in batches]), expected[10:])
+
+
+def test_records_match_the_dataset(h5_dataset):
+    records = list(AnnH5Reader(h5_dataset).read_data())
+    assert [record.id for record in records] == list(range(1003))
+    assert np.array_equal(np.stack([record.vector for record in records]), VECTORS)
@@ -0,0 +1,76 @@
+import json
+
+import numpy as np
+import pytest
+
+from dataset_reader.ann_compound_reader import AnnCompoundReader
+from dataset_reader.binary_cache import (
+    BinaryCacheReader,
+    build_cache,
+    get_cache_path,
+    is_cache_valid,
+)
+
+
+@pytest.fixture
+def compound_dataset(tmp_path):
+    path = tmp_path / "dataset"
+    path.mkdir()
+    np.save(path / "vectors.npy", np.random.rand(10, 4))
+    with open(path / "payloads.jsonl", "w") as fp:
+        for i in range(10):
+            fp.write(json.dumps({"a": i} if i % 2 else {"b": "x"}) + "\n")
+    with open(path / "tests.jsonl", "w") as fp:
+        for i in range(3):
+            row = {
+                "query": np.random.rand(4).tolist(),
+                "conditions": {"and": [{"a": {"match": {"value": i}}}]},
+                "closest_ids": list(range(i + 1)),
+                "closest_scores": [0.5] * (i + 1),
+            }
+            fp.write(json.dumps(row) + "\n")
+    return path
+
+
+def test_cache_matches_source_reader(compound_dataset):
+    cache_path = get_cache_path(compound_dataset)
+    build_cache(AnnCompoundReader(compound_dataset), compound_dataset, cache_path)
+    assert is_cache_valid(compound_dataset, cache_path)
+
+    source = AnnCompoundReader(compound_dataset, normalize=True)
+    cached = BinaryCacheReader(cache_path, normalize=True)
+
+    for expected, actual in zip(source.read_data(), cached.read_data()):
+        assert expected.id == actual.id
+        assert np.allclose(expected.vector, actual.vector)
+        assert expected.metadata == actual.metadata
+
+    for expected, actual in zip(source.read_queries(), cached.read_queries()):
+        assert np.allclose(expected.vector, actual.vector)
+        assert expected.meta_conditions == actual.meta_conditions
+        assert expected.expected_result == actual.expected_result
+        assert expected.expected_scores == actual.expected_scores
+
+
+def test_cache_is_invalidated_by_content_change(compound_dataset):
+    cache_path = get_cache_path(compound_dataset)
+    build_cache(AnnCompoundReader(compound_dataset), compound_dataset, cache_path)
+
+    (compound_dataset / "payloads.jsonl").touch()
+    assert is_cache_valid(compound_dataset, cache_path)
+
+    np.save(compound_dataset / "vectors.npy", np.random.rand(10, 4))
+    assert not is_cache_valid(compound_dataset, cache_path)
+
+
+def test_normalized_vectors_are_cached(compound_dataset):
+    cache_path = get_cache_path(compound_dataset)
+    build_cache(AnnCompoundReader(compound_dataset), compound_dataset, cache_path)
+    assert not (cache_path / "vectors.normalized.f32").exists()
+
+    reader = BinaryCacheReader(cache_path, normalize=True)
+    (batch,) = reader.read_data_batches(batch_size=100)
+    assert (cache_path / "vectors.normalized.f32").exists()
+    assert batch.vectors.dtype == np.float32
+    assert np.allclose(np.linalg.norm(batch.vectors, axis=1), 1.0)
+    assert np.array_equal(reader.read_vectors_matrix(), batch.vectors)
@@ -0,0 +1,67 @@
+import pickle
+
+import numpy as np
+import pytest
+
+from dataset_reader.base_reader import RecordBatch
+from dataset_reader.sparse_reader import CsrRows, SparseReader
+
+INDEX_POINTER = np.array([0, 2, 3, 3, 5, 7], dtype=np.int64)
+COLUMNS = np.array([0, 2, 2, 1, 3, 0, 2], dtype=np.int32)
+VALUES = np.array([1, 3, 2, 3, 6, 4, 5], dtype=np.float32)
+GROUND_TRUTH = np.array([[4, 0], [1, 3]], dtype=np.int32)
+
+
+def write_csr(path, index_pointer, columns, values):
+    with open(path, "wb") as f:
+        sizes = [len(index_pointer) - 1, 4, len(columns)]
+        np.array(sizes, dtype=np.int64).tofile(f)
+        index_pointer.tofile(f)
+        columns.tofile(f)
+        values.tofile(f)
+
+
+@pytest.fixture
+def sparse_dataset(tmp_path):
+    write_csr(tmp_path / "data.csr", INDEX_POINTER, COLUMNS, VALUES)
+    write_csr(tmp_path / "queries.csr", INDEX_POINTER[:3], COLUMNS[:3], VALUES[:3])
+    with open(tmp_path / "results.gt", "wb") as f:
+        np.array(GROUND_TRUTH.shape, dtype=np.uint32).tofile(f)
+        GROUND_TRUTH.tofile(f)
+        np.ones(GROUND_TRUTH.shape, dtype=np.float32).tofile(f)
+    return tmp_path
+
+
+def test_batches_are_memmap_views(sparse_dataset):
+    batches = list(SparseReader(sparse_dataset).read_data_batches(2, offset=1))
+
+    assert [batch.ids.tolist() for batch in batches] == [[1, 2], [3, 4]]
+    vectors = [vector for batch in batches for vector in batch.sparse_vectors]
+    assert [vector.indices.tolist() for vector in vectors] == [[2], [], [1, 3], [0, 2]]
+    assert [vector.values.tolist() for vector in vectors] == [[2], [], [3, 6], [4, 5]]
+    # Empty slices of a memmap are plain arrays
+    assert all(
+        isinstance(vector.values, np.memmap) for vector in vectors if vector.values.size
+    )
+
+
+def test_ground_truth_stays_int32(sparse_dataset):
+    queries = list(SparseReader(sparse_dataset).read_queries())
+
+    assert [query.sparse_vector.indices.tolist() for query in queries] == [[0, 2], [2]]
+    assert all(query.expected_result.dtype == np.int32 for query in queries)
+    assert np.array_equal(
+        np.stack([query.expected_result for query in queries]), GROUND_TRUTH
+    )
+
+
+def test_shards_reference_the_same_rows(sparse_dataset):
+    reader = SparseReader(sparse_dataset)
+    shards = list(reader.read_data_shards(2, offset=1))
+    joined = RecordBatch.concat(shards).slice(1, 4)
+
+    assert isinstance(joined.sparse_vectors, CsrRows)
+    assert np.array_equal(joined.ids, [2, 3, 4])
+    resolved = pickle.loads(pickle.dumps(joined.sparse_vectors)).resolve()
+    assert [vector.indices.tolist() for vector in resolved] == [[], [1, 3], [0, 2]]
+    assert joined.sparse_vectors[-1].values.tolist() == [4, 5]
@@ -0,0 +1,54 @@
+import numpy as np
+
+from dataset_reader.base_reader import RecordBatch
+from engine.base_client.batching import BatchSizeController, iter_adaptive_batches
+
+
+def test_controller_grows_until_batches_get_slow():
+    controller = BatchSizeController(batch_size=100, target_latency=1.0)
+
+    controller.update(100, 0.1)
+    controller.update(200, 0.2)
+    assert controller.size == 400
+    # Results of batches read before the resize are ignored
+    controller.update(200, 2.0)
+    assert controller.size == 400
+
+    controller.update(400, 2.0)
+    controller.update(200, 0.5)
+    assert controller.size == 300
+    assert [size for _, size in controller.trajectory] == [100, 200, 400, 200, 300]
+
+
+def test_stale_slow_batches_halve_the_size_once():
+    controller = BatchSizeController(batch_size=1024, target_latency=1.0)
+
+    # Batches read ahead before the first slow one completed
+    for _ in range(8):
+        controller.update(1024, 2.0)
+    assert controller.size == 512
+
+    controller.update(512, 2.0)
+    assert controller.size == 256
+
+
+def test_batches_are_resliced_to_the_current_size():
+    batches = [
+        RecordBatch(
+            ids=np.arange(start, start + 10),
+            vectors=np.zeros((10, 2), dtype=np.float32),
+            sparse_vectors=None,
+            metadata={"a": list(range(start, start + 10))} if start else None,
+        )
+        for start in range(0, 50, 10)
+    ]
+    controller = BatchSizeController(batch_size=16, min_size=1)
+
+    resliced = []
+    for batch in iter_adaptive_batches(batches, controller):
+        resliced.append(batch)
+        controller.update(len(batch), 0.0)
+
+    assert [len(batch) for batch in resliced] == [16, 32, 2]
+    assert np.array_equal(np.concatenate([b.ids for b in resliced]), np.arange(50))
+    assert resliced[0].metadata["a"] == [None] * 10 + list(range(10, 16))
@@ -0,0 +1,35 @@
+from engine.base_client.checkpoint import UploadCheckpoint
+
+
+def test_checkpoint_stores_the_contiguous_acknowledged_range(tmp_path):
+    path = tmp_path / "upload.checkpoint"
+    checkpoint = UploadCheckpoint(path)
+    callbacks = []
+
+    def submit(batch, callback, error_callback):
+        callbacks.append(callback)
+
+    submit = checkpoint.track(submit)
+    for size in (10, 20, 5):
+        submit([None] * size, lambda result: None, None)
+
+    callbacks[1](None)
+    assert checkpoint.offset == 0
+    callbacks[0](None)
+    assert checkpoint.offset == 30
+    checkpoint.save()
+
+    resumed = UploadCheckpoint.load(path)
+    assert resumed.offset == resumed.submitted == 30
+    assert UploadCheckpoint.load(tmp_path / "missing").offset == 0
+
+
+def test_finished_checkpoint_is_complete(tmp_path):
+    path = tmp_path / "upload.checkpoint"
+    checkpoint = UploadCheckpoint(path, offset=30)
+    checkpoint.save()
+    assert not UploadCheckpoint.load(path).complete
+
+    checkpoint.finish()
+    resumed = UploadCheckpoint.load(path)
+    assert resumed.complete and resumed.offset == 30
@@ -0,0 +1,71 @@
+from types import SimpleNamespace
+
+from engine.base_client import client as client_module
+from engine.base_client.checkpoint import UploadCheckpoint
+from engine.base_client.client import BaseClient
+
+
+class FakeConfigurator:
+    collection_params = {}
+
+    def __init__(self):
+        self.configured = 0
+
+    def execution_params(self, distance, vector_size):
+        return {}
+
+    def configure(self, dataset):
+        self.configured += 1
+
+
+class FakeUploader:
+    upload_params = {}
+
+    def __init__(self):
+        self.offsets = []
+
+    def upload(self, distance, reader, checkpoint):
+        self.offsets.append(checkpoint.offset)
+        return {}
+
+
+def make_client():
+    return BaseClient(
+        name="fake",
+        engine="fake",
+        configurator=FakeConfigurator(),
+        uploader=FakeUploader(),
+        searchers=[],
+    )
+
+
+DATASET = SimpleNamespace(
+    config=SimpleNamespace(name="dataset", distance="cosine", vector_size=2),
+    get_reader=lambda normalize: None,
+)
+
+
+def test_resume_without_checkpoint_configures_the_collection(tmp_path, monkeypatch):
+    monkeypatch.setattr(client_module, "RESULTS_DIR", tmp_path)
+    client = make_client()
+
+    client.run_experiment(
+        DATASET, skip_search=True, skip_if_exists=False, resume_upload=True
+    )
+
+    assert client.configurator.configured == 1
+    assert client.uploader.offsets == [0]
+    assert UploadCheckpoint.load(tmp_path / "fake-dataset-upload.checkpoint").complete
+
+
+def test_resume_continues_from_the_checkpoint(tmp_path, monkeypatch):
+    monkeypatch.setattr(client_module, "RESULTS_DIR", tmp_path)
+    UploadCheckpoint(tmp_path / "fake-dataset-upload.checkpoint", offset=30).save()
+    client = make_client()
+
+    client.run_experiment(
+        DATASET, skip_search=True, skip_if_exists=False, resume_upload=True
+    )
+
+    assert client.configurator.configured == 0
+    assert client.uploader.offsets == [30]
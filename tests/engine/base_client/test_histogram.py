@@ -0,0 +1,43 @@
+import numpy as np
+import pytest
+
+from engine.base_client.histogram import LatencyHistogram
+
+
+def record_all(values) -> LatencyHistogram:
+    histogram = LatencyHistogram()
+    for value in values:
+        histogram.record(value)
+    return histogram
+
+
+def test_percentiles_are_within_precision():
+    latencies = np.random.default_rng(42).lognormal(-5, 1, 100_000)
+    histogram = record_all(latencies)
+
+    for q in (50, 90, 99, 99.9, 99.99):
+        expected = np.percentile(latencies, q, method="inverted_cdf")
+        assert histogram.percentile(q) == pytest.approx(expected, rel=2e-3, abs=2e-6)
+    assert histogram.mean == pytest.approx(latencies.mean())
+    assert histogram.std == pytest.approx(latencies.std())
+    assert histogram.max == latencies.max()
+
+
+def test_merged_histograms_match_single_one():
+    latencies = np.random.default_rng(7).exponential(0.01, 10_000)
+    merged = record_all(latencies[:3000]).merge(record_all(latencies[3000:]))
+    single = record_all(latencies)
+
+    assert merged.count == single.count
+    assert np.array_equal(merged.counts, single.counts)
+    assert merged.percentile(99) == single.percentile(99)
+
+
+def test_serialization_round_trip():
+    histogram = record_all([0.001, 0.002, 0.5, 12.0])
+    restored = LatencyHistogram.from_dict(histogram.to_dict())
+
+    assert np.array_equal(restored.counts, histogram.counts)
+    assert restored.percentile(50) == histogram.percentile(50)
+    assert restored.min == 0.001 and restored.max == 12.0
+    assert LatencyHistogram.from_dict(LatencyHistogram().to_dict()).count == 0
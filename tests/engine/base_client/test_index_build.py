@@ -0,0 +1,47 @@
+import time
+
+import pytest
+
+from engine.base_client.index_build import MAX_PROGRESS_SAMPLES, IndexBuild, wait_until
+
+
+def test_wait_until_polls_with_short_intervals():
+    deadline = time.perf_counter() + 0.2
+    waited = wait_until(lambda: time.perf_counter() >= deadline)
+    assert 0.2 <= waited < 0.5
+
+    with pytest.raises(TimeoutError):
+        wait_until(lambda: False, timeout=0.1)
+
+    # Probes which load the engine are polled less often
+    polls = []
+    waited = wait_until(lambda: polls.append(None) or len(polls) > 2, min_interval=0.1)
+    assert len(polls) == 3 and waited >= 0.25
+
+
+def test_index_build_reports_progress():
+    build = IndexBuild()
+    build.started()
+    build.progress(done=5, total=10, status="yellow")
+    build.finished()
+
+    stats = build.to_dict()
+    assert stats["start"] <= stats["samples"][0]["time"] <= stats["end"]
+    assert stats["build_time"] == stats["end"] - stats["start"]
+    assert stats["samples"][0]["done"] == 5
+
+
+def test_index_build_keeps_a_bounded_number_of_samples():
+    build = IndexBuild()
+    for done in range(1000):
+        build.progress(done=done, total=1000)
+
+    stats = build.to_dict()
+    assert len(stats["samples"]) <= MAX_PROGRESS_SAMPLES
+    # Samples are spread evenly over the whole build
+    steps = {
+        b["done"] - a["done"] for a, b in zip(stats["samples"], stats["samples"][1:])
+    }
+    assert len(steps) == 1 and stats["samples"][-1]["done"] > 900
+    assert stats["sample_count"] == 1000
+    assert stats["last_sample"]["done"] == 999
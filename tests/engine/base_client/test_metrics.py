@@ -0,0 +1,60 @@
+import numpy as np
+import pytest
+
+from engine.base_client.metrics import compute_metrics, pad_rows
+
+
+def test_precision_matches_set_intersection():
+    rng = np.random.default_rng(42)
+    candidates = [rng.choice(1000, 30, replace=False).tolist() for _ in range(50)]
+    expected = [row[:20] for row in candidates]
+    returned = [row[:5] + row[20:25] for row in candidates]
+
+    metrics = compute_metrics(
+        ids=pad_rows(returned, np.int64, -1),
+        tops=np.full(50, 10),
+        expected_ids=pad_rows(expected, np.int64, -1),
+        expected_scores=None,
+    )
+
+    precisions = [
+        len(set(row).intersection(truth[:10])) / 10
+        for row, truth in zip(returned, expected)
+    ]
+    assert metrics["precisions"].tolist() == pytest.approx(precisions)
+    assert metrics["mean_recall@1"] == 1.0
+    assert metrics["mrr"] == 1.0
+
+
+def test_ties_with_the_last_neighbour_are_relevant():
+    metrics = compute_metrics(
+        ids=np.array([[1, 2, 4]]),
+        tops=np.array([3]),
+        expected_ids=np.array([[1, 2, 3, 4, 5]]),
+        expected_scores=np.array([[0.1, 0.2, 0.3, 0.3, 0.5]]),
+    )
+    assert metrics["precisions"].tolist() == [1.0]
+    assert metrics["mean_ndcg"] == pytest.approx(1.0)
+    assert metrics["mean_distance_ratio"] == pytest.approx(1.0)
+
+
+def test_rank_metrics():
+    metrics = compute_metrics(
+        ids=np.array([[7, 1, -1], [2, 9, 8]]),
+        tops=np.array([3, 3]),
+        expected_ids=np.array([[1, 2, 3], [1, 2, 3]]),
+        expected_scores=None,
+    )
+    assert metrics["precisions"].tolist() == pytest.approx([1 / 3, 1 / 3])
+    assert metrics["mrr"] == pytest.approx(0.25)
+    assert metrics["mean_recall@1"] == 0.0
+
+
+def test_queries_without_ground_truth():
+    metrics = compute_metrics(
+        ids=np.array([[1, 2]]),
+        tops=np.array([2]),
+        expected_ids=pad_rows([None], np.int64, -1, width=0),
+        expected_scores=None,
+    )
+    assert metrics == {"precisions": pytest.approx(np.array([1.0]))}
@@ -0,0 +1,16 @@
+from engine.clients.redis.parser import RedisConditionParser
+
+
+def test_repeated_conditions_are_translated_once():
+    parser = RedisConditionParser()
+    condition = {"and": [{"a": {"range": {"gt": 1, "lt": 5}}}]}
+    reordered = {"and": [{"a": {"range": {"lt": 5, "gt": 1}}}]}
+
+    first = parser.parse(condition)
+    assert parser.parse(reordered) is first
+    assert parser.parse({"and": [{"a": {"match": {"value": 2}}}]}) != first
+
+    stats = parser.translation_stats()
+    assert stats["translated"] == 2
+    assert stats["cache_hits"] == 1
+    assert stats["translation_time"] > 0
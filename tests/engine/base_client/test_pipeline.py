@@ -0,0 +1,61 @@
+import threading
+
+import pytest
+
+from engine.base_client.pipeline import UploadPipeline
+
+
+def test_pipeline_bounds_batches_in_flight():
+    batches = [[i] * 10 for i in range(21)]
+    pipeline = UploadPipeline(batches, prefetch=2, max_in_flight=3, upload_workers=3)
+    pending, results = [], []
+
+    def submit(batch, callback, error_callback):
+        # Complete the batches in the background, in bursts of three
+        pending.append((batch, callback))
+        if len(pending) == 3:
+            for batch, callback in pending:
+                threading.Thread(
+                    target=callback, args=((len(batch), 0.0, 0.1),)
+                ).start()
+            pending.clear()
+
+    pipeline.run(submit, results.append)
+    stats = pipeline.stats()
+
+    assert len(results) == 21
+    assert stats["read"]["records"] == stats["upload"]["records"] == 210
+    assert stats["in_flight"]["max"] <= 3
+    assert stats["read_queue"]["max"] <= 2
+
+
+def test_pipeline_raises_upload_errors():
+    def submit(batch, callback, error_callback):
+        if batch[0] == 5:
+            error_callback(ValueError("failed batch"))
+        else:
+            callback((len(batch), 0.0, 0.1))
+
+    pipeline = UploadPipeline(
+        ([i] for i in range(100)), prefetch=1, max_in_flight=1, upload_workers=1
+    )
+    with pytest.raises(ValueError):
+        pipeline.run(submit, lambda result: None)
+
+
+def test_pipeline_reports_the_first_failed_batch():
+    pending = []
+
+    def submit(batch, callback, error_callback):
+        # Batches fail in the reverse order of their submission
+        pending.append((batch, error_callback))
+        if len(pending) == 3:
+            for batch, error_callback in reversed(pending):
+                error_callback(ValueError(f"failed batch {batch[0]}"))
+
+    pipeline = UploadPipeline(
+        ([i] for i in range(3)), prefetch=3, max_in_flight=3, upload_workers=3
+    )
+    with pytest.raises(ValueError, match="failed batch 0"):
+        pipeline.run(submit, lambda result: None)
+    assert pipeline.stats()["failed_batches"] == 3
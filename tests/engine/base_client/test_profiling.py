@@ -0,0 +1,42 @@
+import time
+
+import pytest
+
+from engine.base_client.profiling import ClientProfile, PhaseTimer
+
+
+def test_engine_call_is_split_into_cpu_and_network_wait():
+    timer = PhaseTimer()
+    sum(range(100000))
+    timer.lap("prepare")
+    time.sleep(0.05)
+    timer.lap("engine_call")
+
+    profile = timer.to_dict()
+
+    assert set(profile["phases"]) == {"prepare", "engine_call_cpu", "network_wait"}
+    assert profile["phases"]["prepare"]["cpu"] > 0
+    assert profile["phases"]["network_wait"]["wall"] >= 0.04
+    assert profile["phases"]["engine_call_cpu"]["cpu"] < 0.04
+
+
+def test_profiles_are_aggregated_per_worker():
+    profile = ClientProfile()
+    for worker, process_cpu in ((1, 1.0), (1, 3.0), (2, 5.0)):
+        phases = {
+            "ipc": {"wall": 0.1, "cpu": 0.1},
+            "network_wait": {"wall": 0.4, "cpu": 0.0},
+        }
+        profile.record(
+            {"worker": worker, "process_cpu": process_cpu, "phases": phases}, 0.5
+        )
+
+    stats = profile.to_dict()
+
+    assert stats["calls"] == 3
+    assert stats["cpu_time"] == pytest.approx(0.3)
+    assert stats["phases"]["network_wait"]["mean_wall"] == pytest.approx(0.4)
+    assert stats["workers"]["1"]["calls"] == 2
+    assert stats["workers"]["1"]["process_cpu_time"] == pytest.approx(2.0)
+    assert stats["workers"]["2"]["wall_time"] == pytest.approx(0.5)
+    assert ClientProfile().to_dict() is None
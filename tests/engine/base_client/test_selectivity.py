@@ -0,0 +1,107 @@
+import numpy as np
+import pytest
+
+from dataset_reader.base_reader import BaseReader, Query, RecordBatch
+from engine.base_client.search import SearchRecorder, SearchResult
+from engine.base_client.selectivity import (
+    MaskConditionParser,
+    compute_selectivity,
+    selectivity_buckets,
+    selectivity_report,
+)
+
+LABELS = np.arange(100) % 4
+CONDITIONS = [
+    None,
+    {"and": [{"label": {"match": {"value": 1}}}]},
+    {"or": [{"label": {"match": {"value": 2}}}, {"label": {"match": {"value": 3}}}]},
+    {"and": [{"label": {"match": {"value": 7}}}]},
+]
+
+
+class LabelReader(BaseReader):
+    def read_data_batches(self, batch_size, offset=0):
+        for start in range(offset, len(LABELS), batch_size):
+            end = min(start + batch_size, len(LABELS))
+            yield RecordBatch(
+                ids=np.arange(start, end),
+                vectors=np.zeros((end - start, 2), dtype=np.float32),
+                sparse_vectors=None,
+                metadata={"label": LABELS[start:end].tolist()},
+            )
+
+    def read_queries(self):
+        for conditions in CONDITIONS:
+            yield Query(
+                vector=np.zeros(2, dtype=np.float32),
+                sparse_vector=None,
+                meta_conditions=conditions,
+                expected_result=None,
+            )
+
+
+def test_selectivity_of_the_conditions():
+    selectivity = compute_selectivity(LabelReader())
+    assert np.isnan(selectivity[0])
+    assert selectivity[1:].tolist() == [0.25, 0.5, 0.0]
+
+
+def test_geo_condition_mask():
+    columns = {"city": np.array([[13.40, 52.52], [2.35, 48.86], [np.nan, np.nan]])}
+    mask = MaskConditionParser(columns, 3).parse(
+        {"and": [{"city": {"geo": {"lon": 13.38, "lat": 52.51, "radius": 5000}}}]}
+    )
+    assert mask.tolist() == [True, False, False]
+
+
+def test_queries_are_recorded_by_selectivity_bucket():
+    selectivity = np.array([np.nan, 0.005, 0.01, 0.3, 0.002])
+    buckets = (0.001, 0.01, 1.0)
+    positions = selectivity_buckets(selectivity, buckets)
+    assert positions.tolist() == [-1, 1, 1, 2, 1]
+
+    # Queries of the same bucket recorded by two workers
+    first, second = SearchRecorder(0.0, positions), SearchRecorder(0.0, positions)
+    for index, queue_delay, service_time, error in (
+        (0, 0.0, 0.01, False),
+        (1, 0.5, 0.1, False),
+        (2, 0.0, 0.3, True),
+        (3, 0.0, 0.02, False),
+        (4, 0.0, 0.2, False),
+    ):
+        recorder = first if index % 2 == 0 else second
+        recorder.record(
+            SearchResult(
+                index=index,
+                ids=np.array([index]),
+                latency=queue_delay + service_time,
+                queue_delay=queue_delay,
+                service_time=service_time,
+                started_at=0.0,
+                error=error,
+            )
+        )
+    recorder = first.merge(second)
+
+    report = selectivity_report(
+        selectivity,
+        positions,
+        recorder.bucket_histograms,
+        recorder.bucket_errors,
+        precisions=np.array([1.0, 0.5, 0.7, 1.0, 0.3]),
+        workers=2,
+        buckets=buckets,
+        open_loop=True,
+    )
+
+    assert [bucket["max_selectivity"] for bucket in report] == [None, 0.01, 1.0]
+    assert [bucket["queries"] for bucket in report] == [1, 3, 1]
+    assert report[0]["min_selectivity"] is None
+    low = report[1]
+    assert low["min_selectivity"] == 0.001
+    assert low["errors"] == 1
+    assert low["mean_precisions"] == pytest.approx(0.5)
+    # Throughput is estimated from the service time, without the queue delay
+    assert low["rps"] == pytest.approx(2 * 3 / 0.6)
+    assert low["p50_time"] == pytest.approx(0.3, rel=1e-2)
+    assert low["mean_queue_time"] == pytest.approx(0.5 / 3)
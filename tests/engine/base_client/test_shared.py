@@ -0,0 +1,30 @@
+import pickle
+
+import numpy as np
+
+from engine.base_client.shared import SharedMatrix
+
+
+def test_shared_memory_matrix_is_attached_by_name():
+    array = np.arange(12, dtype=np.float32).reshape(4, 3)
+    matrix = SharedMatrix.share(array)
+    try:
+        attached = pickle.loads(pickle.dumps(matrix))
+        assert attached.path is None
+        assert np.array_equal(attached.array(), array)
+        assert np.array_equal(matrix.rows(1, 3).resolve(), array[1:3])
+    finally:
+        matrix.release()
+
+
+def test_memmap_matrix_is_shared_by_file(tmp_path):
+    array = np.memmap(tmp_path / "vectors", dtype=np.float32, mode="w+", shape=(3, 2))
+    array[:] = [[3, 4], [1, 0], [0, 2]]
+    array.flush()
+
+    matrix = pickle.loads(pickle.dumps(SharedMatrix.share(array)))
+
+    assert matrix.shm_name is None
+    rows = matrix.rows(1, 3).resolve()
+    assert rows.dtype == np.float32
+    assert np.array_equal(rows, [[1, 0], [0, 2]])
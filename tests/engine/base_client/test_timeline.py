@@ -0,0 +1,30 @@
+import pytest
+
+from engine.base_client.timeline import Timeline
+
+
+def test_windows_track_throughput_and_in_flight_requests():
+    timeline = Timeline(origin=100.0, window=1.0)
+    timeline.record(100.1, 100.2)
+    timeline.record(100.5, 101.5, error=True)
+    timeline.record(102.2, 102.3, items=10)
+
+    windows = timeline.to_list()
+
+    assert [window["time"] for window in windows] == [0.0, 1.0, 2.0]
+    assert [window["completed"] for window in windows] == [1, 1, 1]
+    assert [window["in_flight"] for window in windows] == [1, 0, 0]
+    assert [window["errors"] for window in windows] == [0, 1, 0]
+    assert windows[2]["rps"] == 10.0
+    assert windows[1]["p50_time"] == pytest.approx(1.0, rel=1e-3)
+
+
+def test_merged_timelines_share_windows():
+    first, second = Timeline(origin=0.0), Timeline(origin=0.0)
+    first.record(0.1, 0.2)
+    second.record(0.3, 0.4)
+    second.record(1.3, 1.4)
+
+    windows = first.merge(second).to_list()
+
+    assert [window["completed"] for window in windows] == [2, 1]
@@ -0,0 +1,23 @@
+import itertools
+
+import pytest
+
+from engine.base_client.utils import iter_arrival_offsets
+
+
+def test_constant_arrival_offsets_are_evenly_spaced():
+    offsets = list(itertools.islice(iter_arrival_offsets(100, "constant"), 5))
+    assert offsets == pytest.approx([0.0, 0.01, 0.02, 0.03, 0.04])
+
+
+def test_poisson_arrival_offsets_match_target_rate():
+    offsets = list(itertools.islice(iter_arrival_offsets(1000, "poisson"), 10_000))
+    assert all(a <= b for a, b in zip(offsets, offsets[1:]))
+    assert len(offsets) / offsets[-1] == pytest.approx(1000, rel=0.1)
+
+
+def test_arrival_offsets_reject_invalid_params():
+    with pytest.raises(ValueError):
+        next(iter_arrival_offsets(0))
+    with pytest.raises(ValueError):
+        next(iter_arrival_offsets(100, "bursty"))
@@ -0,0 +1,28 @@
+from engine.base_client.warmup import SteadyStateDetector, WarmUp
+
+
+def test_steady_state_requires_stable_windows():
+    detector = SteadyStateDetector(windows=3, tolerance=0.05)
+    assert not detector.add(100.0)
+    assert not detector.add(300.0)
+    assert not detector.add(1000.0)
+    assert not detector.add(1010.0)
+    assert detector.add(1005.0)
+
+
+def test_warmup_by_query_count_cycles_queries():
+    warmup = WarmUp([1, 2, 3], {"warmup_queries": 7}, workers=2)
+
+    warmup_tasks = warmup.next_round()
+    warmup.finish_round(len(warmup_tasks), 0.1)
+
+    assert warmup_tasks == [1, 2, 3, 1, 2, 3, 1]
+    assert warmup.next_round() is None
+    assert warmup.stats()["queries"] == 7
+
+
+def test_warmup_is_disabled_by_default():
+    assert not WarmUp.is_enabled({})
+    warmup = WarmUp(iter([1, 2]), {}, workers=1)
+    assert warmup.next_round() is None
+    assert warmup.stats() is None
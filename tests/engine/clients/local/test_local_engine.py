@@ -0,0 +1,68 @@
+import numpy as np
+import pytest
+
+from dataset_reader.base_reader import Query, RecordBatch
+from engine.base_client.index_build import IndexBuild
+from engine.clients.local.collection import LocalCollection
+from engine.clients.local.config import get_collection_path
+from engine.clients.local.search import LocalSearcher
+from engine.clients.local.upload import LocalUploader
+
+rng = np.random.default_rng(0)
+VECTORS = rng.random((300, 8), dtype=np.float32)
+QUERY = rng.random(8, dtype=np.float32)
+
+
+def upload(tmp_path, distance, **meta):
+    connection_params = {"path": str(tmp_path)}
+    LocalCollection.create(
+        get_collection_path(connection_params), 8, distance, capacity=16, **meta
+    )
+    LocalUploader.init_client(None, distance, connection_params, {})
+    # Out of order batches, growing the arena
+    for start in (200, 0, 100):
+        ids = np.arange(start, start + 100)
+        LocalUploader.upload_record_batch(
+            RecordBatch(
+                ids=ids, vectors=VECTORS[ids], sparse_vectors=None, metadata=None
+            )
+        )
+    LocalUploader.index_build = IndexBuild()
+    LocalUploader.post_upload(distance)
+    return connection_params
+
+
+def search(connection_params, distance, top=5, **search_params):
+    LocalSearcher.init_client(None, distance, connection_params, search_params)
+    query = Query(
+        vector=QUERY, sparse_vector=None, meta_conditions=None, expected_result=None
+    )
+    return LocalSearcher.search_one(query, top)
+
+
+@pytest.mark.parametrize("distance", ["dot", "l2"])
+def test_exact_search(tmp_path, distance):
+    connection_params = upload(tmp_path, distance)
+
+    collection = LocalCollection(get_collection_path(connection_params))
+    vectors, ids = collection.read()
+    assert collection.capacity >= 300 and ids is None
+    assert np.array_equal(vectors, VECTORS)
+
+    results = search(connection_params, distance)
+    if distance == "l2":
+        scores = np.linalg.norm(VECTORS - QUERY, axis=1)
+        expected = np.argsort(scores)[:5]
+    else:
+        scores = VECTORS @ QUERY
+        expected = np.argsort(-scores)[:5]
+    assert [i for i, _ in results] == expected.tolist()
+    assert np.allclose([score for _, score in results], scores[expected], rtol=1e-4)
+
+
+def test_hnsw_search(tmp_path):
+    pytest.importorskip("hnswlib")
+    connection_params = upload(tmp_path, "l2", hnsw_config={"m": 8, "ef_construct": 64})
+    results = search(connection_params, "l2", config={"hnsw_ef": 64})
+    expected = np.argsort(np.linalg.norm(VECTORS - QUERY, axis=1))[:5]
+    assert [i for i, _ in results] == expected.tolist()